@@ -17,7 +17,7 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from typing import Optional, Sequence, Tuple
+from typing import FrozenSet, Optional, Sequence
 
 from fastapi import HTTPException, status
 from starlette.requests import Request
@@ -32,9 +32,13 @@ class APIKeyPrincipal:
     key_id: str
     user_id: str
     workspace_id: Optional[str]
-    scopes: Tuple[str, ...]
+    scopes: FrozenSet[str]
     description: Optional[str] = None
 
+    def __post_init__(self) -> None:
+        # Scope checks run on every authenticated request; keep them O(1).
+        object.__setattr__(self, "scopes", frozenset(self.scopes))
+
 
 _api_key_service: Optional[ApiKeyService] = None
 _logger = logging.getLogger(__name__)
@@ -111,7 +115,7 @@ async def get_api_key_principal(
             detail="Invalid or revoked API key.",
         )
 
-    granted_scopes = tuple(record.get("scopes") or [])
+    granted_scopes = frozenset(record.get("scopes") or ())
     missing_scopes = [scope for scope in scopes if scope not in granted_scopes]
     if missing_scopes:
         raise HTTPException(
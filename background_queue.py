@@ -9,6 +9,7 @@ from typing import Any, Awaitable, Callable, Dict, List, Optional
 from prometheus_client import Counter, Histogram
 
 JobCallable = Callable[[], Awaitable[Any]]
+CancelCallback = Callable[[], None]
 
 BACKGROUND_JOBS_SUBMITTED = Counter(
     "background_jobs_submitted_total",
@@ -60,6 +61,7 @@ class BackgroundTaskQueue:
     def __init__(self) -> None:
         self._queue: asyncio.Queue[tuple[str, JobCallable]] = asyncio.Queue()
         self._jobs: Dict[str, BackgroundJob] = {}
+        self._on_cancel: Dict[str, CancelCallback] = {}
         self._worker_task: Optional[asyncio.Task[None]] = None
         self._running = False
 
@@ -80,8 +82,28 @@ class BackgroundTaskQueue:
             except asyncio.CancelledError:
                 pass
             self._worker_task = None
-
-    def submit(self, name: str, job_factory: JobCallable, *, metadata: Optional[Dict[str, Any]] = None) -> BackgroundJob:
+        # Jobs still waiting will never run; let their owners release what they hold.
+        while not self._queue.empty():
+            job_id, _ = self._queue.get_nowait()
+            job = self._jobs.get(job_id)
+            if job:
+                job.status = "cancelled"
+                job.finished_at = time.time()
+                BACKGROUND_JOBS_COMPLETED.labels(name=job.name, status="cancelled").inc()
+            on_cancel = self._on_cancel.pop(job_id, None)
+            if on_cancel:
+                on_cancel()
+            self._queue.task_done()
+
+    def submit(
+        self,
+        name: str,
+        job_factory: JobCallable,
+        *,
+        metadata: Optional[Dict[str, Any]] = None,
+        on_cancel: Optional[CancelCallback] = None,
+    ) -> BackgroundJob:
+        """Queue ``job_factory``; ``on_cancel`` runs if the queue stops before the job starts."""
         job_id = str(uuid.uuid4())
         job = BackgroundJob(
             id=job_id,
@@ -91,6 +113,8 @@ class BackgroundTaskQueue:
             metadata=metadata or {},
         )
         self._jobs[job_id] = job
+        if on_cancel is not None:
+            self._on_cancel[job_id] = on_cancel
         BACKGROUND_JOBS_SUBMITTED.labels(name=name).inc()
         self._queue.put_nowait((job_id, job_factory))
         return job
@@ -109,6 +133,7 @@ class BackgroundTaskQueue:
         while True:
             job_id, job_factory = await self._queue.get()
             job = self._jobs.get(job_id)
+            self._on_cancel.pop(job_id, None)
             if not job:
                 self._queue.task_done()
                 continue
@@ -118,6 +143,10 @@ class BackgroundTaskQueue:
             try:
                 result = await job_factory()
                 job.result = result
+            except asyncio.CancelledError:
+                job.status = "cancelled"
+                BACKGROUND_JOBS_COMPLETED.labels(name=job.name, status="cancelled").inc()
+                raise
             except Exception as exc:  # pragma: no cover - error path tested separately
                 job.status = "failed"
                 job.error = str(exc)
@@ -9,6 +9,11 @@ try:  # pragma: no cover
 except ImportError:  # pragma: no cover
     trace = None  # type: ignore
 
+try:  # pragma: no cover
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
 try:
     from correlation import (
         get_organization_id,
@@ -38,6 +43,15 @@ _AUDIT_DEFAULT = os.path.join(_LOG_DIR_DEFAULT, "audit.log")
 AUDIT_LOG_PATH = os.getenv(AUDIT_LOG_PATH_ENV, _AUDIT_DEFAULT)
 
 
+# Standard LogRecord attributes that are not copied into the JSON body as extras.
+_RESERVED_RECORD_ATTRS = frozenset({
+    "args", "asctime", "created", "exc_text", "filename", "funcName",
+    "levelname", "levelno", "lineno", "message", "module", "msecs",
+    "msg", "name", "pathname", "process", "processName", "relativeCreated",
+    "stack_info", "thread", "threadName", "exc_info",
+})
+
+
 class JsonFormatter(logging.Formatter):
     """Structured log formatter producing JSON records."""
 
@@ -79,15 +93,13 @@ class JsonFormatter(logging.Formatter):
                 log_record["span_id"] = f"{span_ctx.span_id:016x}"
 
         # Merge extra attributes
-        record_dict = record.__dict__
-        for key, value in record_dict.items():
-            if key in ("args", "asctime", "created", "exc_text", "filename", "funcName",
-                        "levelname", "levelno", "lineno", "message", "module", "msecs",
-                        "msg", "name", "pathname", "process", "processName", "relativeCreated",
-                        "stack_info", "thread", "threadName", "exc_info"):
-                continue
-            log_record[key] = value
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_RECORD_ATTRS:
+                log_record[key] = value
 
+        if orjson is not None:
+            # default=str keeps one non-serialisable extra from dropping the whole record.
+            return orjson.dumps(log_record, default=str).decode("utf-8")
         return json.dumps(log_record, ensure_ascii=False)
 
 
@@ -135,5 +147,8 @@ def configure_logging() -> logging.Logger:
     audit_logger.setLevel(logging.INFO)
     audit_logger.handlers.clear()
     audit_logger.addHandler(audit_handler)
+    # Audit events are already logged on "rag" by the caller; propagating would
+    # format and write every event to the console and rag.log a second time.
+    audit_logger.propagate = False
 
     return logger
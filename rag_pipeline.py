@@ -244,7 +244,7 @@ class RAGPipeline:
                 logger.error(f"Error embedding batch {batch_index + 1}: {e}")
                 error_count += len(batch_chunks)
 
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         self._embedding_tasks = []
         for i in range(0, len(self.chunks), batch_size):
             batch = self.chunks[i:i + batch_size]
@@ -297,8 +297,56 @@ def _extract_video_id(url: str):
     m = re.search(r"(?:v=|youtu\.be/)([A-Za-z0-9_-]{6,})", url)
     return m.group(1) if m else None
 
-@lru_cache(maxsize=128)
+# Persistent transcript cache so repeat ingests of a video skip the YouTube round-trip.
+# diskcache is optional; without it fetches fall back to a per-process lru_cache.
+YT_CACHE_DIR = os.environ.get("YT_CACHE_DIR", ".cache/yt_ingest")
+try:
+    YT_CACHE_TTL = int(os.environ.get("YT_CACHE_TTL", "86400"))
+except ValueError:
+    YT_CACHE_TTL = 86400
+try:
+    from diskcache import Cache as _DiskCache
+except ImportError:
+    _DiskCache = None
+_yt_cache = None
+
+def _get_yt_cache():
+    global _yt_cache
+    if _yt_cache is None and _DiskCache is not None:
+        _yt_cache = _DiskCache(YT_CACHE_DIR)
+    return _yt_cache
+
+def _yt_cache_key(video_id: str, lang: str) -> str:
+    return hashlib.sha1(f"{video_id}|{lang}".encode("utf-8")).hexdigest()
+
+def clear_youtube_cache() -> int:
+    """Drop cached YouTube transcripts; returns the number of on-disk entries removed."""
+    _fetch_youtube_transcript_memo.cache_clear()
+    cache = _get_yt_cache()
+    return cache.clear() if cache is not None else 0
+
 def fetch_youtube_transcript(video_id: str, lang="en"):
+    cache = _get_yt_cache()
+    if cache is None:
+        return _fetch_youtube_transcript_memo(video_id, lang)
+    # The disk cache is shared with the ingest pool workers, so it is the only
+    # layer here; an in-process memo on top would outlive an admin purge.
+    key = _yt_cache_key(video_id, lang)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    items = _fetch_youtube_transcript_remote(video_id, lang)
+    # Never cache misses: captions may be published later
+    if items:
+        items = list(items)
+        cache.set(key, items, expire=YT_CACHE_TTL)
+    return items
+
+@lru_cache(maxsize=128)
+def _fetch_youtube_transcript_memo(video_id: str, lang="en"):
+    return _fetch_youtube_transcript_remote(video_id, lang)
+
+def _fetch_youtube_transcript_remote(video_id: str, lang="en"):
     try:
         from youtube_transcript_api import YouTubeTranscriptApi
         from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
@@ -5,6 +5,7 @@ Modified versions of raglite.py functions that store chunks directly to PostgreS
 instead of JSONL files.
 """
 
+import asyncio
 import os
 import hashlib
 import json
@@ -30,6 +31,29 @@ from chunk_db import store_chunks_to_db, generate_chunk_id
 logger = logging.getLogger(__name__)
 
 
+def _parse_transcript_file(path: str, ext: str) -> List[Tuple[float, float, str]]:
+    """Parse a transcript file into (start, end, text) parts."""
+    if ext == ".srt":
+        return parse_srt(path)
+    if ext == ".vtt":
+        return parse_vtt(path)
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        txt = f.read().strip()
+    return [(0.0, 0.0, txt)]
+
+
+def _read_document_file(path: str, ext: str) -> str:
+    """Extract plain text from a document based on its extension."""
+    if ext == ".pdf":
+        return read_pdf(path)
+    if ext == ".docx":
+        return read_docx(path)
+    if ext in {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tiff", ".webp"}:
+        return read_image(path)
+    # Treat everything else as text (markdown, txt, etc.)
+    return read_text(path)
+
+
 async def ingest_transcript_db(
     path: str,
     vector_store,
@@ -54,15 +78,8 @@ async def ingest_transcript_db(
     """
     ext = os.path.splitext(path)[1].lower()
     
-    # Parse transcript based on format
-    if ext == ".srt":
-        parts = parse_srt(path)
-    elif ext == ".vtt":
-        parts = parse_vtt(path)
-    else:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            txt = f.read().strip()
-        parts = [(0.0, 0.0, txt)]
+    # Parse transcript off the event loop so concurrent uploads keep progressing
+    parts = await asyncio.to_thread(_parse_transcript_file, path, ext)
     
     # Create chunks
     chunks = chunk_timecoded(parts, 1200, 150)
@@ -131,16 +148,8 @@ async def ingest_docs_db(
     """
     ext = os.path.splitext(path)[1].lower()
     
-    # Read document based on format
-    if ext == ".pdf":
-        text = read_pdf(path)
-    elif ext == ".docx":
-        text = read_docx(path)
-    elif ext in {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tiff", ".webp"}:
-        text = read_image(path)
-    else:
-        # Treat everything else as text (markdown, txt, etc.)
-        text = read_text(path)
+    # PDF/DOCX/OCR parsing is CPU-bound; run it off the event loop
+    text = await asyncio.to_thread(_read_document_file, path, ext)
     
     # Simple chunking for documents
     rows = []
@@ -1,6 +1,7 @@
 
 import json, os, re, hashlib
 from typing import List, Dict, Any
+import numpy as np
 from rank_bm25 import BM25Okapi
 
 from chunk_backup import ChunkBackupError, create_chunk_backup
@@ -15,30 +16,100 @@ def load_chunks(path):
             try: items.append(json.loads(ln))
             except json.JSONDecodeError: pass
     return items
+def _bm25_from_counts(template,doc_freqs,doc_len):
+    """A BM25Okapi over already-counted documents, with ``template``'s k1/b/epsilon.
+
+    rank_bm25 has no public constructor for this, so this is the one place that
+    relies on its attribute layout and ``_calc_idf`` (pinned in requirements.txt;
+    test_bm25_from_counts_matches_a_fresh_build guards upgrades).
+    """
+    bm25=BM25Okapi.__new__(BM25Okapi)
+    bm25.k1, bm25.b, bm25.epsilon, bm25.tokenizer = template.k1, template.b, template.epsilon, None
+    bm25.doc_freqs=doc_freqs
+    bm25.doc_len=doc_len
+    bm25.corpus_size=len(doc_len)
+    bm25.avgdl=sum(doc_len)/bm25.corpus_size
+    nd={}
+    for freqs in doc_freqs:
+        for word in freqs:
+            nd[word]=nd.get(word,0)+1
+    bm25.idf={}
+    bm25._calc_idf(nd)
+    return bm25
 class SimpleIndex:
     def __init__(self,chunks):
         self.chunks=chunks if chunks else []
         self.chunk_id_map = {c.get("id"): i for i, c in enumerate(self.chunks) if c.get("id")}
         if not self.chunks:
             self.bm25 = None
+            self.doc_len = None
             return
         docs=[c.get("content","") for c in self.chunks]
         toks=[_tok(d) for d in docs]
         self.bm25=BM25Okapi(toks)
-    def search(self,query,k=8,user_id=None,workspace_id=None):
+        self.doc_len=np.asarray(self.bm25.doc_len, dtype=float)
+    def remove_rows(self,rows):
+        """Return a new index without the chunks at ``rows``.
+
+        Reuses the per-document term counts instead of re-tokenizing the kept
+        chunks; idf and avgdl are recomputed, so scores match a fresh build.
+        """
+        drop=set(rows)
+        if not drop:
+            return self
+        keep=[i for i in range(len(self.chunks)) if i not in drop]
+        if not keep or self.bm25 is None:
+            return SimpleIndex([self.chunks[i] for i in keep])
+        old=self.bm25
+        bm25=_bm25_from_counts(old, [old.doc_freqs[i] for i in keep], [old.doc_len[i] for i in keep])
+        index=SimpleIndex.__new__(SimpleIndex)
+        index.chunks=[self.chunks[i] for i in keep]
+        index.chunk_id_map={c.get("id"): i for i, c in enumerate(index.chunks) if c.get("id")}
+        index.bm25=bm25
+        index.doc_len=self.doc_len[keep]
+        return index
+    def _row_scores(self,q,rows):
+        """BM25 scores for ``rows`` only; same formula as BM25Okapi.get_scores.
+
+        get_batch_scores would re-convert the whole corpus's doc_len list per call.
+        """
+        bm25=self.bm25
+        doc_freqs=bm25.doc_freqs
+        norm=bm25.k1*(1-bm25.b+bm25.b*self.doc_len[rows]/bm25.avgdl)
+        scores=np.zeros(len(rows))
+        for term in q:
+            idf=bm25.idf.get(term) or 0
+            if not idf:
+                continue
+            tf=np.fromiter((doc_freqs[i].get(term,0) for i in rows), dtype=float, count=len(rows))
+            scores+=idf*(tf*(bm25.k1+1)/(tf+norm))
+        return scores
+    def search(self,query,k=8,user_id=None,workspace_id=None,rows=None):
+        """Rank chunks for ``query``; ``rows`` limits scoring to those chunk positions."""
         if not self.chunks or self.bm25 is None:
             return []
         q=_tok(query or "")
-        scores=self.bm25.get_scores(q)
-        ranked = sorted(enumerate(scores), key=lambda x: x[1], reverse=True)
+        if rows is None:
+            scores=self.bm25.get_scores(q)
+            positions=None
+        else:
+            if not rows:
+                return []
+            scores=self._row_scores(q, rows)
+            positions=rows
+        # Stable descending order in C; ties keep chunk order, as sorted(..., reverse=True) did.
+        order = np.argsort(-scores, kind="stable")
         
         if not user_id and not workspace_id:
             # FIX 1: Return chunk IDs instead of indices
-            return [(self.chunks[idx].get("id"), score) for idx, score in ranked[:k]]
+            if positions is None:
+                return [(self.chunks[idx].get("id"), scores[idx]) for idx in order[:k]]
+            return [(self.chunks[positions[idx]].get("id"), scores[idx]) for idx in order[:k]]
 
         filtered = []
-        for idx, score in ranked:
-            chunk = self.chunks[idx]
+        for idx in order:
+            score = scores[idx]
+            chunk = self.chunks[idx if positions is None else positions[idx]]
 
             if workspace_id:
                 chunk_workspace = chunk.get("workspace_id")
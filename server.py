@@ -1,26 +1,31 @@
-import os, json, subprocess, hashlib, re, logging, asyncio, time, uuid
+import os, json, subprocess, hashlib, re, logging, asyncio, time, uuid, functools, multiprocessing, collections, shutil, tempfile, mmap
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any, Sequence, Tuple, Set
+from typing import List, Optional, Dict, Any, Sequence, Tuple, TYPE_CHECKING
 from pathlib import Path
-from fastapi import FastAPI, APIRouter, Form, UploadFile, File, HTTPException, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, APIRouter, Form, UploadFile, File, HTTPException, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from pydantic import BaseModel, Field, validator
+
+if TYPE_CHECKING:  # httpx is imported lazily by the few outbound-HTTP code paths
+    import httpx
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from starlette.middleware.sessions import SessionMiddleware
-from collections import deque
+from collections import OrderedDict
 
-from retrieval import load_chunks, SimpleIndex, format_citation, get_unique_sources, get_chunks_by_source, delete_source_chunks
+from retrieval import load_chunks, SimpleIndex, format_citation, get_unique_sources, delete_source_chunks, _source_id
 from score import score_answer
 # Import ingestion functions directly from raglite for user_id support
-from raglite import ingest_youtube, ingest_transcript, ingest_docs
+from raglite import ingest_youtube, ingest_transcript, ingest_docs, clear_youtube_cache
 # Import database-backed functions
-from chunk_db import load_chunks_from_db, store_chunks_to_db, delete_chunks_by_source_db, search_chunks_db, export_chunks_to_jsonl
-from raglite_db import ingest_youtube_db, ingest_transcript_db, ingest_docs_db, migrate_jsonl_to_db
+from chunk_db import load_chunks_from_db
+from raglite_db import ingest_youtube_db, ingest_transcript_db, ingest_docs_db
 from rag_pipeline import RAGPipeline
 
 from api_key_service import ApiKeyService
@@ -41,12 +46,9 @@ from correlation import (
     set_request_context,
 )
 from logging_utils import configure_logging, AUDIT_LOG_PATH
-from telemetry import setup_tracing
-from telemetry import setup_tracing
+from telemetry import is_tracing_enabled, setup_tracing
 from version import VERSION_INFO
-from prometheus_fastapi_instrumentator import Instrumentator
 from prometheus_client import Counter, Histogram, Gauge
-import httpx
 try:
     from model_service import GenerateOptions, Message
     from model_service_impl import ConcreteModelService
@@ -60,6 +62,10 @@ try:
 except ImportError:  # pragma: no cover
     trace = None  # type: ignore
 
+# Resolved once so _log_event skips span lookups entirely when tracing is off.
+_TRACE_ENABLED = trace is not None and is_tracing_enabled()
+_get_current_span = trace.get_current_span if _TRACE_ENABLED else None
+
 # Import database (optional - server works without it)
 try:
     from database import Database, init_database
@@ -102,28 +108,69 @@ except ImportError:
     VECTOR_STORE_AVAILABLE = False
     VectorStore = None  # type: ignore
 
+# Optional async file I/O for streaming uploads to disk
+try:
+    import aiofiles
+    AIOFILES_AVAILABLE = True
+except ImportError:
+    AIOFILES_AVAILABLE = False
+    aiofiles = None  # type: ignore
+
+# Optional in-process yt-dlp for the auto-caption fallback (CLI is used otherwise)
+try:
+    from yt_dlp import YoutubeDL
+    YT_DLP_AVAILABLE = True
+except ImportError:
+    YT_DLP_AVAILABLE = False
+    YoutubeDL = None  # type: ignore
+
+# Optional fast JSON parser for scanning the legacy chunks file
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None  # type: ignore
+
 # Legacy JSONL path for backward compatibility and exports
 CHUNKS_PATH = os.environ.get("CHUNKS_PATH", "out/chunks.jsonl")
 USE_DB_CHUNKS = os.getenv("USE_DB_CHUNKS", "true").lower() in {"true", "1", "yes"}
 BACKGROUND_JOBS_ENABLED = os.getenv("BACKGROUND_JOBS_ENABLED", "false").lower() in {"1", "true", "yes"}
 BACKGROUND_QUEUE: Optional[BackgroundTaskQueue] = None
+try:
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 2)))
+except ValueError:
+    INGEST_WORKERS = os.cpu_count() or 2
+INGEST_POOL: Optional[ProcessPoolExecutor] = None
 ALLOW_INSECURE_DEFAULTS = allow_insecure_defaults()
 # LOCAL_MODE: Skip authentication for local development/testing
 LOCAL_MODE = os.getenv("LOCAL_MODE", "false").lower() in {"1", "true", "yes"}
 _INLINE_CSP_WARNING_EMITTED = False
 DEFAULT_SECRET_KEY = "change-this-secret-key-in-production"
-SECRET_KEY_PLACEHOLDERS = {DEFAULT_SECRET_KEY, "changeme"}
-_METRICS_WIRED = False
+SECRET_KEY_PLACEHOLDERS = frozenset({DEFAULT_SECRET_KEY, "changeme"})
+METRICS_ENABLED = os.getenv("ENABLE_METRICS", "1").lower() in {"1", "true", "yes"}
 INDEX = None
 CHUNKS = []
 CHUNK_ID_MAP: Dict[str, Dict[str, Any]] = {}
+# Bumped by _chunks_replaced() whenever CHUNKS is reassigned. Caches derived from CHUNKS
+# remember _chunks_version() instead of the list, so a reload frees the old corpus.
+_chunks_epoch = 0
 MODEL_SERVICE = None
 RAG_PIPELINE: Optional[RAGPipeline] = None
 _chunk_count_cache: Optional[int] = None
 _chunk_count_stamp: Optional[float] = None
+# Legacy JSONL rows per workspace (quota checks), valid while CHUNKS_PATH st_mtime_ns == stamp.
+# Filled lazily per workspace (LRU-bounded) and carried forward across appends by _run_legacy_ingest.
+WORKSPACE_COUNT_CACHE_SIZE = 1024
+_workspace_chunk_counts: "OrderedDict[str, int]" = OrderedDict()
+_workspace_counts_stamp: Optional[int] = None
+# get_unique_sources results keyed by (user_id, workspace_id). Each entry remembers the
+# _chunks_version() it was built for; CHUNKS is only ever replaced, never mutated in
+# place, so a version check is enough to detect reloads and deletes.
+SOURCE_INDEX_CACHE_SIZE = 64
+_sources_cache: "OrderedDict[Tuple[Optional[str], Optional[str]], Tuple[Tuple[int, int], List[Dict[str, Any]]]]" = OrderedDict()
 # Async-safe lock for INDEX and CHUNKS updates
 # Note: asyncio.Lock() must be created after the event loop starts, so we use a lazy init pattern
-import asyncio
 _index_lock: Optional[asyncio.Lock] = None
 
 def _get_index_lock() -> asyncio.Lock:
@@ -133,8 +180,21 @@ def _get_index_lock() -> asyncio.Lock:
         _index_lock = asyncio.Lock()
     return _index_lock
 
+# Serializes legacy JSONL writers: raglite rewrites CHUNKS_PATH wholesale on every append
+_chunk_write_lock: Optional[asyncio.Lock] = None
+
+def _get_chunk_write_lock() -> asyncio.Lock:
+    """Get or create the JSONL write lock. Must be called from async context."""
+    global _chunk_write_lock
+    if _chunk_write_lock is None:
+        _chunk_write_lock = asyncio.Lock()
+    return _chunk_write_lock
+
 # Startup readiness flag - prevents requests during initialization
 _startup_complete = False
+# Set once the background index warmup finishes (created per startup; see /readyz)
+_index_warm_event: Optional[asyncio.Event] = None
+READYZ_WAIT_SECONDS = 2.0
 try:
     RAG_MAX_TOKENS = int(os.getenv("RAG_MAX_TOKENS", "512"))
 except ValueError:
@@ -155,20 +215,34 @@ BASE_DIR = Path(__file__).resolve().parent
 LEGACY_FRONTEND_DIR = BASE_DIR / "frontend"
 REACT_FRONTEND_DIR = BASE_DIR / "frontend-react" / "dist"
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run startup before serving requests and always run shutdown afterwards."""
+    try:
+        await startup_event()
+        yield
+    finally:
+        await shutdown_event()
+
+
 app = FastAPI(
     title="RAG Talking Agent (with Ingest)",
     version="1.0.0",
     description=API_DESCRIPTION,
+    lifespan=lifespan,
 )
 api_v1 = APIRouter(prefix="/api/v1", tags=["v1"])
 
-# Metrics instrumentation
-instrumentator = Instrumentator()
-instrumentator.instrument(app).expose(
-    app,
-    endpoint="/metrics",
-    include_in_schema=False,
-)
+# Metrics instrumentation (set ENABLE_METRICS=0 to skip the per-request middleware)
+if METRICS_ENABLED:
+    from prometheus_fastapi_instrumentator import Instrumentator
+
+    instrumentator = Instrumentator()
+    instrumentator.instrument(app).expose(
+        app,
+        endpoint="/metrics",
+        include_in_schema=False,
+    )
 
 
 def _get_vector_store() -> Optional["VectorStore"]:
@@ -201,70 +275,6 @@ def _is_local_mode_user(user_id: Optional[str]) -> bool:
     return LOCAL_MODE and user_id == "local-dev-user"
 
 
-async def _check_workspace_membership(
-    workspace_id: str,
-    user_id: Optional[str],
-    required_role: Optional[str] = None
-) -> Optional[Dict[str, Any]]:
-    """
-    Check if user has access to workspace.
-    
-    Args:
-        workspace_id: Workspace UUID
-        user_id: User UUID (or LOCAL_MODE placeholder)
-        required_role: Optional minimum role required
-        
-    Returns:
-        Membership dict if authorized
-        
-    Raises:
-        HTTPException if access denied
-    """
-    if DB is None:
-        raise HTTPException(status_code=503, detail="Database not configured")
-    
-    # Skip membership check for LOCAL_MODE placeholder user
-    if _is_local_mode_user(user_id):
-        logger.debug("LOCAL_MODE: Skipping membership check for local-dev-user")
-        return {"role": "admin"}  # Grant admin role in LOCAL_MODE
-    
-    # Query database for membership
-    try:
-        membership = await DB.fetch_one(
-            """
-            SELECT wm.role
-            FROM workspace_members wm
-            WHERE wm.workspace_id = $1 AND wm.user_id = $2
-            """,
-            (workspace_id, user_id)
-        )
-    except Exception as e:
-        logger.error(f"Failed to check workspace membership: {e}")
-        raise HTTPException(status_code=500, detail="Failed to verify workspace access")
-    
-    if not membership:
-        raise HTTPException(status_code=404, detail="Workspace not found or access denied")
-    
-    # Check role if required
-    if required_role:
-        role_hierarchy = {"viewer": 0, "editor": 1, "admin": 2, "owner": 3}
-        user_role_level = role_hierarchy.get(membership["role"], 0)
-        required_level = role_hierarchy.get(required_role, 0)
-        
-        if user_role_level < required_level:
-            raise HTTPException(
-                status_code=403,
-                detail=f"Insufficient permissions. Required role: {required_role}"
-            )
-    
-    return membership
-
-
-def _is_local_mode_user(user_id: Optional[str]) -> bool:
-    """Check if user_id is the LOCAL_MODE placeholder (not a real UUID)."""
-    return LOCAL_MODE and user_id == "local-dev-user"
-
-
 async def _check_workspace_membership(
     workspace_id: str,
     user_id: Optional[str],
@@ -346,6 +356,7 @@ async def _reload_chunks_from_db() -> int:
         
         async with _get_index_lock():
             CHUNKS = chunks_from_db or []
+            _chunks_replaced()
             CHUNK_ID_MAP = {c.get("id"): c for c in CHUNKS if c.get("id")}
             INDEX = SimpleIndex(CHUNKS)
         
@@ -368,6 +379,7 @@ async def _reload_chunks_from_db() -> int:
                 chunks_from_file = load_chunks(CHUNKS_PATH)
                 async with _get_index_lock():
                     CHUNKS = chunks_from_file
+                    _chunks_replaced()
                     CHUNK_ID_MAP = {c.get("id"): c for c in CHUNKS if c.get("id")}
                     INDEX = SimpleIndex(CHUNKS)
                 if RAG_PIPELINE:
@@ -378,6 +390,7 @@ async def _reload_chunks_from_db() -> int:
                 logger.error(f"✗ Fallback also failed: {fallback_error}")
         
         CHUNKS = []
+        _chunks_replaced()
         INDEX = SimpleIndex([])
         if RAG_PIPELINE:
             RAG_PIPELINE.set_chunks([])
@@ -435,6 +448,22 @@ app.add_middleware(
 )
 
 
+# Vite emits content-hashed filenames under assets/, so those can be cached
+# forever; the rest of the frontend (HTML shell, legacy UI) revalidates.
+_IMMUTABLE_ASSET_PREFIXES = ("/assets/", "/app/assets/")
+_FRONTEND_PREFIXES = ("/app", "/assets")
+_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _static_cache_control(path: str) -> Optional[str]:
+    """Cache-Control for frontend static files, or None for API/dynamic responses."""
+    if path.startswith(_IMMUTABLE_ASSET_PREFIXES):
+        return _IMMUTABLE_CACHE_CONTROL
+    if path.startswith(_FRONTEND_PREFIXES):
+        return "no-cache"
+    return None
+
+
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     """Apply common security headers to every response."""
 
@@ -477,8 +506,15 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         response.headers.setdefault("Permissions-Policy", "camera=(), microphone=(), geolocation=()")
         response.headers.setdefault("X-XSS-Protection", "1; mode=block")
         response.headers.setdefault("Content-Security-Policy", csp)
-        response.headers.setdefault("Cache-Control", "no-store")
-        response.headers.setdefault("Pragma", "no-cache")
+        static_cache_control = None
+        if response.status_code in (200, 304):
+            static_cache_control = _static_cache_control(request.url.path)
+        if static_cache_control:
+            response.headers.setdefault("Cache-Control", static_cache_control)
+        elif "Cache-Control" not in response.headers:
+            # Endpoints that opt into short client caching set their own header.
+            response.headers["Cache-Control"] = "no-store"
+            response.headers.setdefault("Pragma", "no-cache")
         return response
 
 
@@ -489,7 +525,7 @@ class StartupReadinessMiddleware(BaseHTTPMiddleware):
     """Reject requests until startup is complete to prevent race conditions."""
 
     # Paths that should work even before startup is complete
-    ALLOWED_PATHS = {"/health", "/healthz", "/ready", "/metrics", "/docs", "/redoc", "/openapi.json"}
+    ALLOWED_PATHS = {"/health", "/healthz", "/ready", "/readyz", "/livez", "/metrics", "/docs", "/redoc", "/openapi.json"}
 
     async def dispatch(self, request: Request, call_next):
         # Allow health checks and docs before startup completes
@@ -544,23 +580,22 @@ CHUNK_COUNT_GAUGE = Gauge(
     "Current number of chunk records available to the search index.",
 )
 
-WORKSPACE_QUOTA_USAGE = Gauge(
-    "workspace_quota_usage",
-    "Absolute per-workspace quota usage counters.",
-    ["workspace_id", "metric"],
-)
-
-WORKSPACE_QUOTA_RATIO = Gauge(
+WORKSPACE_QUOTA_RATIO = Histogram(
     "workspace_quota_ratio",
-    "Per-workspace quota utilization ratios (0-1).",
-    ["workspace_id", "metric"],
+    "Distribution of workspace quota utilization ratios observed on each quota check.",
+    ["metric"],
+    buckets=(0.5, 0.75, 0.9, 1.0, 1.25),
 )
 
 QUOTA_EXCEEDED_COUNTER = Counter(
     "quota_exceeded_total",
     "Total count of requests rejected due to quota exhaustion.",
-    ["workspace_id", "metric"],
+    ["metric"],
 )
+_QUOTA_RATIO_CHILDREN = {
+    metric: WORKSPACE_QUOTA_RATIO.labels(metric)
+    for metric in ("requests_per_day", "requests_per_minute", "chunk_storage")
+}
 
 EXTERNAL_REQUEST_ERRORS = Counter(
     "external_request_errors_total",
@@ -575,45 +610,54 @@ INGEST_PROCESSED_CHUNKS = Counter(
 )
 
 
+# Bound label children for the ingest hot paths; ``labels()`` hashes and looks up
+# the label tuple on every call, so resolve each combination once.
+_INGEST_LATENCY_CHILDREN = {
+    (source, outcome): INGEST_LATENCY.labels(source=source, outcome=outcome)
+    for source in ("youtube", "file")
+    for outcome in ("success", "failure")
+}
+_INGEST_PROCESSED_CHILDREN = {
+    source: INGEST_PROCESSED_CHUNKS.labels(source=source) for source in ("youtube", "file")
+}
+_INGEST_COUNTER_CHILDREN: Dict[Tuple[str, str, int], Any] = {}
+
+
+_ASK_COUNTER_CHILDREN: Dict[Tuple[str, int], Any] = {}
+_ASK_LATENCY_CHILDREN: Dict[str, Any] = {}
+
+
+def _record_ask_event(outcome: str, status_code: int, duration: float) -> None:
+    key = (outcome, status_code)
+    counter = _ASK_COUNTER_CHILDREN.get(key)
+    if counter is None:
+        counter = ASK_REQUEST_COUNTER.labels(outcome=outcome, status_code=str(status_code))
+        _ASK_COUNTER_CHILDREN[key] = counter
+    latency = _ASK_LATENCY_CHILDREN.get(outcome)
+    if latency is None:
+        latency = ASK_LATENCY.labels(outcome=outcome)
+        _ASK_LATENCY_CHILDREN[outcome] = latency
+    counter.inc()
+    latency.observe(duration)
+
+
 def _record_ingest_event(source: str, outcome: str, status_code: int) -> None:
-    INGEST_COUNTER.labels(
-        source=source,
-        outcome=outcome,
-        status_code=str(status_code),
-    ).inc()
+    key = (source, outcome, status_code)
+    child = _INGEST_COUNTER_CHILDREN.get(key)
+    if child is None:
+        child = INGEST_COUNTER.labels(
+            source=source,
+            outcome=outcome,
+            status_code=str(status_code),
+        )
+        _INGEST_COUNTER_CHILDREN[key] = child
+    child.inc()
 
 
 def _record_external_error(service: str, operation: str) -> None:
     EXTERNAL_REQUEST_ERRORS.labels(service=service, operation=operation).inc()
 
 # Session middleware (required for OAuth)
-def _ensure_not_placeholder(
-    name: str,
-    value: Optional[str],
-    placeholders: Optional[Set[str]] = None,
-    *,
-    required: bool = False,
-) -> Optional[str]:
-    placeholders = placeholders or set()
-    logger_local = logging.getLogger("rag.config")
-
-    if value is None or value == "":
-        if required and not ALLOW_INSECURE_DEFAULTS:
-            raise RuntimeError(f"{name} must be configured before starting the application.")
-        if required:
-            logger_local.warning("%s is not set; running with empty value because ALLOW_INSECURE_DEFAULTS=true", name)
-        return value
-
-    if value in placeholders:
-        if ALLOW_INSECURE_DEFAULTS:
-            logger_local.warning("%s is using a placeholder value; do not use this in production.", name)
-            return value
-        raise RuntimeError(
-            f"{name} is using a placeholder value. Provide a secure value or set ALLOW_INSECURE_DEFAULTS=true for development."
-        )
-
-    return value
-
 # Generate SECRET_KEY if not set - Railway should have real one in env vars
 import secrets as secrets_module
 if not os.getenv("SECRET_KEY") or os.getenv("SECRET_KEY") in SECRET_KEY_PLACEHOLDERS:
@@ -629,7 +673,73 @@ SECRET_KEY_VALUE = ensure_not_placeholder(
     SECRET_KEY_PLACEHOLDERS,
     required=True,
 )
-app.add_middleware(SessionMiddleware, secret_key=(SECRET_KEY_VALUE or DEFAULT_SECRET_KEY))
+
+
+class OAuthSessionMiddleware:
+    """
+    Apply SessionMiddleware only to the Google OAuth handshake routes.
+
+    authlib keeps the OAuth state in the session; every other route authenticates
+    via JWT cookie or API key, so they skip the cookie signature check and decode.
+    """
+
+    def __init__(
+        self,
+        app,
+        secret_key: str,
+        path_prefixes: Tuple[str, ...] = ("/auth/google", "/auth/callback"),
+        **session_kwargs: Any,
+    ) -> None:
+        self.app = app
+        self.session_app = SessionMiddleware(app, secret_key=secret_key, **session_kwargs)
+        # "/auth/callback" is the legacy alias of the Google callback.
+        self.path_prefixes = path_prefixes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(self.path_prefixes):
+            await self.session_app(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+class UploadSizeLimitMiddleware:
+    """Reject file uploads whose declared Content-Length exceeds MAX_UPLOAD_REQUEST_SIZE.
+
+    Form parsing spools the whole body before the route handler runs, so the
+    per-file MAX_FILE_SIZE check alone cannot stop a hostile multi-GB transfer.
+    """
+
+    UPLOAD_PATH_SUFFIXES = ("/ingest/files", "/ingest_files")
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and scope["method"] == "POST"
+            and scope["path"].endswith(self.UPLOAD_PATH_SUFFIXES)
+        ):
+            declared = None
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    try:
+                        declared = int(value)
+                    except ValueError:
+                        declared = None
+                    break
+            if declared is not None and declared > MAX_UPLOAD_REQUEST_SIZE:
+                response = JSONResponse(
+                    {"detail": f"Upload exceeds maximum request size of {MAX_UPLOAD_REQUEST_SIZE // (1024 * 1024)}MB"},
+                    status_code=413,
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(OAuthSessionMiddleware, secret_key=(SECRET_KEY_VALUE or DEFAULT_SECRET_KEY))
+app.add_middleware(UploadSizeLimitMiddleware)
 app.add_middleware(CorrelationIdMiddleware)
 
 # Rate limiting
@@ -647,14 +757,14 @@ class RequestTimer:
         self.start = None
 
     def __enter__(self):
-        self.start = asyncio.get_event_loop().time()
+        self.start = time.perf_counter_ns()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.start is None:
             return
-        duration = asyncio.get_event_loop().time() - self.start
-        payload = {"operation": self.operation, "duration_ms": round(duration * 1000, 3)}
+        duration_ns = time.perf_counter_ns() - self.start
+        payload = {"operation": self.operation, "duration_ms": round(duration_ns / 1_000_000, 3)}
         payload.update(self.extra)
         logger.info("request_duration", extra=payload)
 
@@ -703,6 +813,30 @@ else:
 
 HEALTHCHECKS_PING_URL = os.getenv("HEALTHCHECKS_PING_URL")
 HEALTHCHECKS_PING_FAIL_URL = os.getenv("HEALTHCHECKS_PING_FAIL_URL")
+try:
+    HEALTHCHECKS_PING_MIN_INTERVAL = float(os.getenv("HEALTHCHECKS_PING_MIN_INTERVAL", "10"))
+except ValueError:
+    HEALTHCHECKS_PING_MIN_INTERVAL = 10.0
+_ping_queue: Optional[asyncio.Queue] = None
+_ping_worker_task: Optional[asyncio.Task] = None
+# Shared outbound client for request-path calls (OAuth userinfo); created on first
+# use so connections and TLS sessions are reused, and closed on shutdown.
+_http_client: Optional["httpx.AsyncClient"] = None
+
+
+def _get_http_client() -> "httpx.AsyncClient":
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        import httpx
+
+        _http_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        )
+    return _http_client
+
+
+_LOG_PRIMITIVE_TYPES = (str, int, float, bool)
 
 
 def _log_event(event: str, **fields: Any) -> None:
@@ -711,9 +845,22 @@ def _log_event(event: str, **fields: Any) -> None:
 
     Non-primitive values are coerced to strings so logging never raises.
     """
+    payload = _event_payload(event, fields)
+    logger.info(event, extra=payload)
+    if AUDIT_LOGGER.handlers:
+        AUDIT_LOGGER.info(event, extra=payload)
+
+
+def _audit_event(event: str, **fields: Any) -> None:
+    """Write ``event`` to the audit log only, with the same request context as _log_event."""
+    if AUDIT_LOGGER.handlers:
+        AUDIT_LOGGER.info(event, extra=_event_payload(event, fields))
+
+
+def _event_payload(event: str, fields: Dict[str, Any]) -> Dict[str, Any]:
     payload: Dict[str, Any] = {"event": event}
     for key, value in fields.items():
-        if isinstance(value, (str, int, float, bool)) or value is None:
+        if value is None or isinstance(value, _LOG_PRIMITIVE_TYPES):
             payload[key] = value
         else:
             payload[key] = repr(value)
@@ -738,45 +885,139 @@ def _log_event(event: str, **fields: Any) -> None:
         if current_org_id:
             payload["organization_id"] = current_org_id
 
-    if trace:
-        span = trace.get_current_span()
+    if _TRACE_ENABLED:
+        span = _get_current_span()
         if span:
             span_ctx = span.get_span_context()
             if span_ctx and span_ctx.trace_id:
                 payload.setdefault("trace_id", f"{span_ctx.trace_id:032x}")
                 payload.setdefault("span_id", f"{span_ctx.span_id:016x}")
+    return payload
 
-    logger.info(event, extra=payload)
-    if AUDIT_LOGGER.handlers:
-        AUDIT_LOGGER.info(event, extra=payload)
+
+try:
+    ASK_LOG_FLUSH_INTERVAL = float(os.getenv("ASK_LOG_FLUSH_INTERVAL", "1.0"))
+except ValueError:
+    ASK_LOG_FLUSH_INTERVAL = 1.0
+
+
+class AskEventAggregator:
+    """
+    Fold successful ask completions into per-(user, workspace) windows.
+
+    Under sustained traffic one ``ask.summary`` log line per window replaces one
+    ``ask.completed`` line per request. The audit log still gets a per-request
+    ``ask.completed`` record, and errors are still logged individually.
+    """
+
+    def __init__(self) -> None:
+        self._window: Dict[Tuple[Optional[str], Optional[str]], List[float]] = {}
+        self._window_started = time.monotonic()
+        self.active = False
+
+    def record(
+        self,
+        user_id: Optional[str],
+        workspace_id: Optional[str],
+        duration_ms: float,
+        result_count: int,
+    ) -> None:
+        stats = self._window.get((user_id, workspace_id))
+        if stats is None:
+            # [requests, total_ms, max_ms, results]
+            self._window[(user_id, workspace_id)] = [1, duration_ms, duration_ms, result_count]
+            return
+        stats[0] += 1
+        stats[1] += duration_ms
+        if duration_ms > stats[2]:
+            stats[2] = duration_ms
+        stats[3] += result_count
+
+    def flush(self) -> None:
+        window, self._window = self._window, {}
+        started, self._window_started = self._window_started, time.monotonic()
+        window_s = round(self._window_started - started, 3)
+        for (user_id, workspace_id), (requests, total_ms, max_ms, results) in window.items():
+            _log_event(
+                "ask.summary",
+                user_id=user_id,
+                workspace_id=workspace_id,
+                window_s=window_s,
+                requests=requests,
+                avg_ms=round(total_ms / requests, 3),
+                max_ms=round(max_ms, 3),
+                result_count=results,
+            )
+
+    async def run(self, interval: float) -> None:
+        self.active = True
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                self.flush()
+        finally:
+            self.active = False
+            self.flush()
+
+
+ASK_EVENTS = AskEventAggregator()
+_ask_events_task: Optional[asyncio.Task] = None
+
+
+# Per-workspace quota usage is kept out of Prometheus labels (workspace ids are
+# unbounded); the most recently active workspaces are retained here instead and
+# surfaced through the admin quota debug endpoint.
+try:
+    QUOTA_DEBUG_MAX_WORKSPACES = max(1, int(os.getenv("QUOTA_DEBUG_MAX_WORKSPACES", "100")))
+except ValueError:
+    QUOTA_DEBUG_MAX_WORKSPACES = 100
+_quota_debug_snapshots: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+def _record_quota_debug(workspace_id: str, usage: Dict[str, Any], ratios: Dict[str, float]) -> None:
+    _quota_debug_snapshots[workspace_id] = {
+        "usage": usage,
+        "ratios": ratios,
+        "updated_at": time.time(),
+    }
+    _quota_debug_snapshots.move_to_end(workspace_id)
+    while len(_quota_debug_snapshots) > QUOTA_DEBUG_MAX_WORKSPACES:
+        _quota_debug_snapshots.popitem(last=False)
 
 
 def _quota_metrics_hook(workspace_id: str, settings: Dict[str, int], snapshot: Dict[str, int]) -> None:
-    """Update Prometheus gauges for workspace quota usage and emit threshold logs."""
+    """Record quota utilization histograms and emit threshold logs."""
     requests_today = snapshot.get("request_count", 0)
-    WORKSPACE_QUOTA_USAGE.labels(workspace_id, "requests_today").set(requests_today)
     daily_limit = max(settings.get("request_limit_per_day", 1), 1)
     daily_ratio = requests_today / daily_limit
-    WORKSPACE_QUOTA_RATIO.labels(workspace_id, "requests_per_day").set(min(daily_ratio, 1.5))
 
     minute_requests = snapshot.get("minute_request_count", 0)
-    WORKSPACE_QUOTA_USAGE.labels(workspace_id, "requests_current_minute").set(minute_requests)
     minute_limit = max(settings.get("request_limit_per_minute", 1), 1)
     minute_ratio = minute_requests / minute_limit
-    WORKSPACE_QUOTA_RATIO.labels(workspace_id, "requests_per_minute").set(min(minute_ratio, 1.5))
 
-    chunks_today = snapshot.get("chunk_count", 0)
-    WORKSPACE_QUOTA_USAGE.labels(workspace_id, "chunks_today").set(chunks_today)
+    usage: Dict[str, Any] = {
+        "requests_today": requests_today,
+        "requests_current_minute": minute_requests,
+        "chunks_today": snapshot.get("chunk_count", 0),
+    }
+    ratios = {
+        "requests_per_day": min(daily_ratio, 1.5),
+        "requests_per_minute": min(minute_ratio, 1.5),
+    }
 
     chunk_total = snapshot.get("current_chunk_total")
     if chunk_total is not None:
-        WORKSPACE_QUOTA_USAGE.labels(workspace_id, "chunk_total").set(chunk_total)
+        usage["chunk_total"] = chunk_total
         chunk_limit = max(settings.get("chunk_limit", 1), 1)
         storage_ratio = chunk_total / chunk_limit
-        WORKSPACE_QUOTA_RATIO.labels(workspace_id, "chunk_storage").set(min(storage_ratio, 1.5))
+        ratios["chunk_storage"] = min(storage_ratio, 1.5)
     else:
         storage_ratio = None
 
+    for metric, ratio in ratios.items():
+        _QUOTA_RATIO_CHILDREN[metric].observe(ratio)
+    _record_quota_debug(workspace_id, usage, ratios)
+
     for metric, ratio in (
         ("requests_per_day", daily_ratio),
         ("requests_per_minute", minute_ratio),
@@ -793,17 +1034,18 @@ def _quota_metrics_hook(workspace_id: str, settings: Dict[str, int], snapshot: D
             )
 
 
-async def _ping_healthchecks(success: bool, payload: Dict[str, Any]) -> None:
+async def _ping_healthchecks(success: bool, payload: Dict[str, Any], client: "httpx.AsyncClient") -> None:
     """Send uptime pings to Healthchecks or similar services when configured."""
     if not HEALTHCHECKS_PING_URL:
         return
 
+    import httpx
+
     url = HEALTHCHECKS_PING_URL if success else (HEALTHCHECKS_PING_FAIL_URL or f"{HEALTHCHECKS_PING_URL}/fail")
 
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            headers = build_observability_headers({"Content-Type": "application/json"})
-            await client.post(url, json=payload, headers=headers)
+        headers = build_observability_headers({"Content-Type": "application/json"})
+        await client.post(url, json=payload, headers=headers)
         if success:
             _log_event("healthcheck.ping_sent", url=url, status="ok")
     except (httpx.TimeoutException, httpx.ConnectError) as exc:
@@ -816,37 +1058,157 @@ async def _ping_healthchecks(success: bool, payload: Dict[str, Any]) -> None:
         _log_event("healthcheck.ping_failed", url=url, error=str(exc))
         logger.error("Failed to ping health monitor: %s", exc, exc_info=True)
 
-async def _get_primary_workspace_id_for_user(user: Optional[Dict[str, Any]]) -> Optional[str]:
-    """Resolve the user's default workspace ID, if multi-tenant support is enabled."""
+def _enqueue_healthcheck_ping(success: bool, payload: Dict[str, Any]) -> None:
+    """Hand a ping to the background worker; drop it if the queue is full or not running."""
+    if not HEALTHCHECKS_PING_URL or _ping_queue is None:
+        return
+    try:
+        _ping_queue.put_nowait((success, payload))
+    except asyncio.QueueFull:
+        pass
+
+
+async def _healthcheck_ping_worker(queue: asyncio.Queue) -> None:
+    """
+    Single consumer for health pings.
+
+    Pings queued while one is in flight collapse to the most recent one, and a
+    ping with the same status as the last one sent is skipped until
+    HEALTHCHECKS_PING_MIN_INTERVAL has elapsed.
+    """
+    import httpx
+
+    last_success: Optional[bool] = None
+    last_sent = 0.0
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        while True:
+            success, payload = await queue.get()
+            while not queue.empty():
+                success, payload = queue.get_nowait()
+            now = time.monotonic()
+            if success == last_success and now - last_sent < HEALTHCHECKS_PING_MIN_INTERVAL:
+                continue
+            await _ping_healthchecks(success, payload, client)
+            last_success, last_sent = success, now
+
+
+async def _get_primary_workspace_for_user(
+    user: Optional[Dict[str, Any]],
+) -> Tuple[Optional[str], Optional[str]]:
+    """Resolve the user's default workspace ID and its organization ID in one lookup."""
     if not user or not USER_SERVICE:
-        return None
+        return None, None
     user_id = user.get("user_id")
     if not user_id:
-        return None
+        return None, None
     # Skip workspace resolution for LOCAL_MODE placeholder user (not a valid UUID)
     if LOCAL_MODE and user_id == "local-dev-user":
-        return None
+        return None, None
     try:
         workspace = await USER_SERVICE.get_primary_workspace(user_id)
-        return workspace.get("id") if workspace else None
     except (ConnectionError, TimeoutError) as exc:
         logger.warning(f"Database connection error resolving workspace for user {user_id}: {exc}")
-        return None
+        return None, None
     except Exception as exc:
         logger.error(f"Unable to resolve primary workspace for user {user_id}: {exc}", exc_info=True)
-        return None
+        return None, None
+    if not workspace:
+        return None, None
+    workspace_id, organization_id = workspace.get("id"), workspace.get("organization_id")
+    _remember_workspace_org(workspace_id, organization_id)
+    return workspace_id, organization_id
+
+
+# A workspace never moves between organizations, so the mapping is cached on the
+# auth path; the TTL only bounds how long a deleted workspace keeps resolving.
+try:
+    WORKSPACE_ORG_CACHE_TTL = float(os.getenv("WORKSPACE_ORG_CACHE_TTL", "300"))
+except ValueError:
+    WORKSPACE_ORG_CACHE_TTL = 300.0
+WORKSPACE_ORG_CACHE_SIZE = 10000
+_workspace_org_cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+
+def _remember_workspace_org(workspace_id: Optional[str], organization_id: Optional[str]) -> None:
+    if not workspace_id or not organization_id or WORKSPACE_ORG_CACHE_TTL <= 0:
+        return
+    _workspace_org_cache[workspace_id] = (organization_id, time.monotonic() + WORKSPACE_ORG_CACHE_TTL)
+    _workspace_org_cache.move_to_end(workspace_id)
+    while len(_workspace_org_cache) > WORKSPACE_ORG_CACHE_SIZE:
+        _workspace_org_cache.popitem(last=False)
+
+
+def _forget_workspace_org(workspace_id: str) -> None:
+    _workspace_org_cache.pop(workspace_id, None)
 
 
 async def _get_organization_id_for_workspace(workspace_id: Optional[str]) -> Optional[str]:
     if not workspace_id or DB is None:
         return None
+    cached = _workspace_org_cache.get(workspace_id)
+    if cached is not None:
+        organization_id, expires_at = cached
+        if expires_at > time.monotonic():
+            _workspace_org_cache.move_to_end(workspace_id)
+            return organization_id
+        _forget_workspace_org(workspace_id)
     row = await DB.fetch_one(
         "SELECT organization_id FROM workspaces WHERE id = $1",
         (workspace_id,),
     )
     if not row:
         return None
-    return row.get("organization_id")
+    organization_id = row.get("organization_id")
+    _remember_workspace_org(workspace_id, organization_id)
+    return organization_id
+
+# Session (JWT) requests re-read the same user row and primary workspace on
+# every call; keep them for a few seconds per user. The token itself is still
+# decoded and checked on each request, and API keys are never cached so that
+# revocation and last-used tracking stay per request.
+try:
+    AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "30"))
+except ValueError:
+    AUTH_USER_CACHE_TTL = 30.0
+AUTH_USER_CACHE_SIZE = 4096
+# user_id -> (db user row, primary workspace id, organization id, expires_at)
+_auth_user_cache: "OrderedDict[str, Tuple[Optional[Dict[str, Any]], str, Optional[str], float]]" = OrderedDict()
+
+
+def _get_cached_auth_user(
+    user_id: Optional[str],
+) -> Optional[Tuple[Optional[Dict[str, Any]], str, Optional[str]]]:
+    if not user_id:
+        return None
+    cached = _auth_user_cache.get(user_id)
+    if cached is None:
+        return None
+    db_user, workspace_id, organization_id, expires_at = cached
+    if expires_at <= time.monotonic():
+        _forget_auth_user(user_id)
+        return None
+    _auth_user_cache.move_to_end(user_id)
+    return db_user, workspace_id, organization_id
+
+
+def _remember_auth_user(
+    user_id: str,
+    db_user: Optional[Dict[str, Any]],
+    workspace_id: str,
+    organization_id: Optional[str],
+) -> None:
+    if AUTH_USER_CACHE_TTL <= 0:
+        return
+    _auth_user_cache[user_id] = (db_user, workspace_id, organization_id, time.monotonic() + AUTH_USER_CACHE_TTL)
+    _auth_user_cache.move_to_end(user_id)
+    while len(_auth_user_cache) > AUTH_USER_CACHE_SIZE:
+        _auth_user_cache.popitem(last=False)
+
+
+def _forget_auth_user(user_id: Optional[str]) -> None:
+    if user_id:
+        _auth_user_cache.pop(user_id, None)
+
 
 async def _resolve_auth_context(
     request: Request,
@@ -885,9 +1247,11 @@ async def _resolve_auth_context(
                 "role": "api_key",
             }
         workspace_id = api_key_principal.workspace_id
+        organization_id: Optional[str] = None
         if workspace_id is None:
-            workspace_id = await _get_primary_workspace_id_for_user(user)
-        organization_id = await _get_organization_id_for_workspace(workspace_id)
+            workspace_id, organization_id = await _get_primary_workspace_for_user(user)
+        if organization_id is None:
+            organization_id = await _get_organization_id_for_workspace(workspace_id)
         set_request_context(
             user_id=user.get("user_id") if user else None,
             workspace_id=workspace_id,
@@ -896,24 +1260,29 @@ async def _resolve_auth_context(
         return user, workspace_id, api_key_principal
 
     user = get_current_user(request)
+    user_id = user.get("user_id") if user else None
+    cached_user = _get_cached_auth_user(user_id) if USER_SERVICE else None
+    db_user: Optional[Dict[str, Any]] = cached_user[0] if cached_user else None
+    db_user_loaded = cached_user is not None
     
     # If user has user_id from token, fetch full user record from database
-    if user and user.get("user_id") and USER_SERVICE:
+    if user_id and USER_SERVICE and not cached_user:
         try:
-            db_user = await USER_SERVICE.get_user_by_id(user["user_id"])
-            if db_user:
-                # Merge database user data with token data
-                user = {
-                    **user,
-                    "email": db_user.get("email") or user.get("email"),
-                    "username": db_user.get("username") or user.get("username"),
-                    "name": db_user.get("name") or user.get("name"),
-                    "role": db_user.get("role") or user.get("role", "reader"),
-                }
+            db_user = await USER_SERVICE.get_user_by_id(user_id)
+            db_user_loaded = True
         except (ConnectionError, TimeoutError) as e:
             logger.warning(f"Database connection error loading user: {e}")
         except Exception as e:
             logger.error(f"Failed to load user from database: {e}", exc_info=True)
+    if db_user:
+        # Merge database user data with token data
+        user = {
+            **user,
+            "email": db_user.get("email") or user.get("email"),
+            "username": db_user.get("username") or user.get("username"),
+            "name": db_user.get("name") or user.get("name"),
+            "role": db_user.get("role") or user.get("role", "reader"),
+        }
     
     if require and not user:
         # LOCAL_MODE bypass: allow unauthenticated access for development
@@ -937,8 +1306,17 @@ async def _resolve_auth_context(
                 status_code=401,
                 detail="Authentication required. Supply an API key, sign in via Google OAuth, or use username/password login.",
             )
-    workspace_id = await _get_primary_workspace_id_for_user(user)
-    organization_id = await _get_organization_id_for_workspace(workspace_id)
+    # The primary workspace row already carries organization_id, so the common
+    # path costs a single query.
+    if cached_user:
+        workspace_id, organization_id = cached_user[1], cached_user[2]
+    else:
+        workspace_id, organization_id = await _get_primary_workspace_for_user(user)
+        # Lookup failures come back as None and are retried on the next request.
+        if db_user_loaded and workspace_id:
+            _remember_auth_user(user_id, db_user, workspace_id, organization_id)
+    if organization_id is None:
+        organization_id = await _get_organization_id_for_workspace(workspace_id)
     set_request_context(
         user_id=user.get("user_id") if user else None,
         workspace_id=workspace_id,
@@ -965,46 +1343,145 @@ async def _consume_workspace_quota(
         )
     except QuotaExceededError as exc:
         metric = getattr(exc, "limit", "unknown")
-        QUOTA_EXCEEDED_COUNTER.labels(
-            workspace_id=workspace_id,
-            metric=str(metric),
-        ).inc()
+        QUOTA_EXCEEDED_COUNTER.labels(metric=str(metric)).inc()
         raise HTTPException(status_code=429, detail=str(exc)) from exc
 
 
 async def _count_workspace_chunks(workspace_id: Optional[str]) -> Optional[int]:
     if not workspace_id:
         return None
+    if USE_DB_CHUNKS and DB is not None:
+        # Served by idx_chunks_workspace_id; the JSONL file is not the source of truth here.
+        row = await DB.fetch_one(
+            "SELECT COUNT(*) AS cnt FROM chunks WHERE workspace_id = $1",
+            (workspace_id,),
+        )
+        return int(row["cnt"]) if row else 0
     if not os.path.exists(CHUNKS_PATH):
         return 0
 
+    if not _workspace_counts_are_current():
+        _workspace_chunk_counts.clear()
+    cached = _workspace_chunk_counts.get(workspace_id)
+    if cached is not None:
+        _workspace_chunk_counts.move_to_end(workspace_id)
+        return cached
+
+    try:
+        stamp = os.stat(CHUNKS_PATH).st_mtime_ns
+    except OSError:
+        return 0
     loop = asyncio.get_running_loop()
+    count = await loop.run_in_executor(None, _scan_workspace_chunks, CHUNKS_PATH, workspace_id)
+    _store_workspace_count(workspace_id, count, stamp)
+    return count
 
-    def _count() -> int:
-        count = 0
-        try:
-            with open(CHUNKS_PATH, "r", encoding="utf-8") as handle:
-                for line in handle:
-                    try:
-                        payload = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-                    if payload.get("workspace_id") == workspace_id:
-                        count += 1
-        except FileNotFoundError:
-            return 0
-        return count
 
-    return await loop.run_in_executor(None, _count)
+def _workspace_counts_are_current() -> bool:
+    """True when the per-workspace counts were taken from the chunks file as it is now."""
+    if _workspace_counts_stamp is None:
+        return False
+    try:
+        return _workspace_counts_stamp == os.stat(CHUNKS_PATH).st_mtime_ns
+    except OSError:
+        return False
 
 
-async def _require_billing_active(workspace_id: Optional[str]) -> None:
-    """Block ingestion when billing is inactive for the associated organization."""
-    # LOCAL_MODE bypass: skip billing check for development
-    if LOCAL_MODE:
+def _store_workspace_count(workspace_id: str, count: int, stamp: int) -> None:
+    """Remember a scanned count, unless the file changed while it was being scanned."""
+    global _workspace_counts_stamp
+    try:
+        if os.stat(CHUNKS_PATH).st_mtime_ns != stamp:
+            return
+    except OSError:
         return
-    if not workspace_id or DB is None:
+    if _workspace_counts_stamp != stamp:
+        _workspace_chunk_counts.clear()
+        _workspace_counts_stamp = stamp
+    _workspace_chunk_counts[workspace_id] = count
+    _workspace_chunk_counts.move_to_end(workspace_id)
+    while len(_workspace_chunk_counts) > WORKSPACE_COUNT_CACHE_SIZE:
+        _workspace_chunk_counts.popitem(last=False)
+
+
+def _bump_workspace_count(workspace_id: Optional[str], written: int) -> None:
+    """Carry the per-workspace counts across an append of ``written`` rows to ``workspace_id``."""
+    global _workspace_counts_stamp
+    try:
+        _workspace_counts_stamp = os.stat(CHUNKS_PATH).st_mtime_ns
+    except OSError:
+        _workspace_chunk_counts.clear()
+        _workspace_counts_stamp = None
         return
+    if workspace_id and workspace_id in _workspace_chunk_counts:
+        _workspace_chunk_counts[workspace_id] += written
+
+
+_WORKSPACE_KEY = b'"workspace_id"'
+
+
+def _scan_workspace_chunks(path: str, workspace_id: str) -> int:
+    """Count JSONL rows whose top-level ``workspace_id`` equals ``workspace_id``.
+
+    Searches the memory-mapped file for the serialized key/value pair instead of
+    parsing every line. JSON escapes quotes inside strings, so a match is always a
+    real key. The ingest writers append ``workspace_id`` last, so when only the
+    root object's closing brace follows the match it is the top-level key; any
+    other matching line is parsed to rule out a nested ``workspace_id``.
+    """
+    value = json.dumps(workspace_id, ensure_ascii=False).encode("utf-8")
+    needle = re.compile(re.escape(_WORKSPACE_KEY) + rb"\s*:\s*" + re.escape(value))
+    count = 0
+    try:
+        with open(path, "rb") as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                return 0
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = 0
+                while True:
+                    match = needle.search(mm, pos)
+                    if match is None:
+                        break
+                    line_start = mm.rfind(b"\n", 0, match.start()) + 1
+                    line_end = mm.find(b"\n", match.end())
+                    if line_end == -1:
+                        line_end = len(mm)
+                    if mm[match.end():line_end].strip() == b"}":
+                        count += 1
+                    else:
+                        line = mm[line_start:line_end]
+                        try:
+                            payload = orjson.loads(line) if ORJSON_AVAILABLE else json.loads(line)
+                        except ValueError:
+                            payload = None
+                        if isinstance(payload, dict) and payload.get("workspace_id") == workspace_id:
+                            count += 1
+                    pos = line_end + 1
+    except FileNotFoundError:
+        return 0
+    return count
+
+
+# Billing rows per workspace, reused for BILLING_CACHE_TTL seconds. Expiry dates are
+# still compared against the current time on every check; the cache is dropped
+# whenever this process applies a billing change (admin PATCH, Stripe webhook).
+try:
+    BILLING_CACHE_TTL = float(os.getenv("BILLING_CACHE_TTL", "30"))
+except ValueError:
+    BILLING_CACHE_TTL = 30.0
+BILLING_CACHE_SIZE = 10000
+_billing_state_cache: "OrderedDict[str, Tuple[Optional[Dict[str, Any]], float]]" = OrderedDict()
+
+
+def _invalidate_billing_cache() -> None:
+    _billing_state_cache.clear()
+
+
+async def _get_workspace_billing_state(workspace_id: str) -> Optional[Dict[str, Any]]:
+    cached = _billing_state_cache.get(workspace_id)
+    if cached is not None and cached[1] > time.monotonic():
+        _billing_state_cache.move_to_end(workspace_id)
+        return cached[0]
     row = await DB.fetch_one(
         """
         SELECT
@@ -1017,6 +1494,22 @@ async def _require_billing_active(workspace_id: Optional[str]) -> None:
         """,
         (workspace_id,),
     )
+    if BILLING_CACHE_TTL > 0:
+        _billing_state_cache[workspace_id] = (row, time.monotonic() + BILLING_CACHE_TTL)
+        _billing_state_cache.move_to_end(workspace_id)
+        while len(_billing_state_cache) > BILLING_CACHE_SIZE:
+            _billing_state_cache.popitem(last=False)
+    return row
+
+
+async def _require_billing_active(workspace_id: Optional[str]) -> None:
+    """Block ingestion when billing is inactive for the associated organization."""
+    # LOCAL_MODE bypass: skip billing check for development
+    if LOCAL_MODE:
+        return
+    if not workspace_id or DB is None:
+        return
+    row = await _get_workspace_billing_state(workspace_id)
     if not row:
         return
     status = (row.get("billing_status") or "trialing").lower()
@@ -1112,7 +1605,11 @@ async def _record_query_baseline() -> None:
 
 
 async def _warm_and_measure() -> None:
-    await _warm_search_index()
+    try:
+        await _warm_search_index()
+    finally:
+        if _index_warm_event is not None:
+            _index_warm_event.set()
     await _record_query_baseline()
 
 # Custom exceptions
@@ -1185,7 +1682,6 @@ class IngestURLRequest(BaseModel):
     
     @validator('urls')
     def validate_urls(cls, v):
-        import re
         lines = [u.strip() for u in v.splitlines() if u.strip()]
         if len(lines) > 100:
             raise ValueError('Maximum 100 URLs per request')
@@ -1212,36 +1708,52 @@ class BillingPortalRequest(BaseModel):
 
 # Security configuration
 MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
-ALLOWED_EXTENSIONS = {
+# Whole-request ceiling for multipart uploads, checked against Content-Length
+# before the body is read (a request may carry several files).
+try:
+    MAX_UPLOAD_REQUEST_SIZE = int(os.getenv("MAX_UPLOAD_REQUEST_SIZE", str(10 * MAX_FILE_SIZE)))
+except ValueError:
+    MAX_UPLOAD_REQUEST_SIZE = 10 * MAX_FILE_SIZE
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB read size when streaming uploads to disk
+ALLOWED_EXTENSIONS = frozenset({
     '.pdf', '.docx', '.md', '.markdown', '.txt', '.vtt', '.srt',
     '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.webp'  # Images (OCR)
-}
-BLOCKED_EXTENSIONS = {
+})
+BLOCKED_EXTENSIONS = frozenset({
     '.exe', '.dll', '.bat', '.cmd', '.sh', '.msi', '.js', '.jar', '.com', '.scr', '.pkg', '.ps1', '.vbs'
-}
+})
 UPLOAD_DIR = Path("uploads")
+CAPTIONS_DIR = UPLOAD_DIR / "captions"
+
+# \w is exactly str.isalnum() plus "_", so this keeps the same character set.
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w.-]")
+
 
 def sanitize_filename(filename: str) -> str:
     """Remove path components and dangerous characters."""
-    name = os.path.basename(filename)
-    name = name.replace('/', '').replace('\\', '')
-    name = ''.join(c for c in name if c.isalnum() or c in '.-_')
-    if len(name) > 255:
-        name = name[:255]
-    return name
+    return _UNSAFE_FILENAME_CHARS.sub("", os.path.basename(filename))[:255]
+
+def _file_extension(filename: str) -> str:
+    """Lower-cased suffix with Path.suffix semantics, without building a Path."""
+    name = filename[filename.rfind("/") + 1:]
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        return name[i:].lower()
+    return ""
 
 def validate_file_type(filename: str) -> bool:
     """Check if file extension is allowed."""
-    ext = Path(filename).suffix.lower()
-    if ext in BLOCKED_EXTENSIONS:
-        return False
-    return True
+    return _file_extension(filename) not in BLOCKED_EXTENSIONS
 
 def generate_safe_filename(original_filename: str) -> str:
-    """Generate a safe, unique filename."""
+    """Generate a safe, unique filename.
+
+    The prefix is random rather than derived from the name so that same-named
+    uploads (in one request, concurrent requests or queued jobs) never share a
+    staged path.
+    """
     sanitized = sanitize_filename(original_filename)
-    name_hash = hashlib.md5(sanitized.encode()).hexdigest()[:8]
-    return f"{name_hash}_{sanitized}"
+    return f"{uuid.uuid4().hex}_{sanitized}"
 
 # Database and user service globals
 DB: Optional[Database] = None
@@ -1251,33 +1763,32 @@ QUOTA_SERVICE: Optional[QuotaService] = None
 BILLING_SERVICE: Optional[BillingService] = None
 VECTOR_STORE_INSTANCE: Optional["VectorStore"] = None
 
-STRIPE_API_KEY = ensure_not_placeholder(
-    "STRIPE_API_KEY",
-    os.getenv("STRIPE_API_KEY"),
-    {"sk_test_placeholder"},
-    required=False,
-)
-STRIPE_WEBHOOK_SECRET = ensure_not_placeholder(
-    "STRIPE_WEBHOOK_SECRET",
-    os.getenv("STRIPE_WEBHOOK_SECRET"),
-    {"whsec_placeholder"},
-    required=False,
-)
-STRIPE_PRICE_ID = ensure_not_placeholder(
-    "STRIPE_PRICE_ID",
-    os.getenv("STRIPE_PRICE_ID"),
-    {"price_123"},
-    required=False,
+# Optional Stripe settings and the sample values that must not reach production.
+_STRIPE_PLACEHOLDERS = {
+    "STRIPE_API_KEY": frozenset({"sk_test_placeholder"}),
+    "STRIPE_WEBHOOK_SECRET": frozenset({"whsec_placeholder"}),
+    "STRIPE_PRICE_ID": frozenset({"price_123"}),
+}
+STRIPE_API_KEY, STRIPE_WEBHOOK_SECRET, STRIPE_PRICE_ID = (
+    ensure_not_placeholder(name, os.getenv(name), placeholders)
+    for name, placeholders in _STRIPE_PLACEHOLDERS.items()
 )
 STRIPE_SUCCESS_URL = os.getenv("STRIPE_SUCCESS_URL", "http://localhost:8000/app/billing/success")
 STRIPE_CANCEL_URL = os.getenv("STRIPE_CANCEL_URL", "http://localhost:8000/app/billing/cancel")
 STRIPE_PORTAL_RETURN_URL = os.getenv("STRIPE_PORTAL_RETURN_URL", "http://localhost:8000/app/settings/billing")
 
-@app.on_event("startup")
 async def startup_event():
     """Initialize database connection and cache on startup (if configured)."""
-    global DB, USER_SERVICE, API_KEY_SERVICE, QUOTA_SERVICE, BILLING_SERVICE, BACKGROUND_QUEUE, MODEL_SERVICE, RAG_PIPELINE
-    
+    global DB, USER_SERVICE, API_KEY_SERVICE, QUOTA_SERVICE, BILLING_SERVICE, BACKGROUND_QUEUE, MODEL_SERVICE, RAG_PIPELINE, INGEST_POOL
+    global _ask_events_task, _ping_queue, _ping_worker_task
+
+    # Legacy mode reads the whole chunks file and builds the BM25 index; start that
+    # in a worker thread now so it overlaps the Redis and database connects below.
+    legacy_index_load: Optional[asyncio.Task] = None
+    if not USE_DB_CHUNKS and os.path.exists(CHUNKS_PATH):
+        logger.info("Loading chunks from file (USE_DB_CHUNKS=false)")
+        legacy_index_load = asyncio.create_task(asyncio.to_thread(ensure_index, False))
+
     # Initialize Redis cache if available
     from redis_cache import init_cache_service
     cache_service = await init_cache_service()
@@ -1337,28 +1848,32 @@ async def startup_event():
                     global INDEX, CHUNKS, CHUNK_ID_MAP
                     async with _get_index_lock():
                         CHUNKS = chunks_from_db
+                        _chunks_replaced()
                         CHUNK_ID_MAP = {c.get("id"): c for c in CHUNKS if c.get("id")}
                         INDEX = SimpleIndex(CHUNKS)
                     logger.info(f"Loaded {len(CHUNKS)} chunks from database")
                 else:
                     logger.info("No chunks in database yet")
                     CHUNKS = []
+                    _chunks_replaced()
                     INDEX = SimpleIndex([])
         except Exception as e:
             logger.warning(f"Failed to load from database: {e}")
             # Fall back to file if database fails
             if os.path.exists(CHUNKS_PATH):
                 logger.info("Falling back to file-based chunks")
-                ensure_index(require=False)
-    elif not USE_DB_CHUNKS and os.path.exists(CHUNKS_PATH):
+                await asyncio.to_thread(ensure_index, False)
+    elif legacy_index_load is not None:
         # Legacy file-based mode
-        logger.info("Loading chunks from file (USE_DB_CHUNKS=false)")
-        ensure_index(require=False)
+        await legacy_index_load
     elif not USE_DB_CHUNKS and not os.path.exists(CHUNKS_PATH):
         logger.info("No chunks file found, starting with empty index")
         CHUNKS = []
+        _chunks_replaced()
         INDEX = SimpleIndex([])
 
+    global _index_warm_event
+    _index_warm_event = asyncio.Event()
     asyncio.create_task(_warm_and_measure())
 
     if MODEL_SERVICE is None:
@@ -1373,8 +1888,25 @@ async def startup_event():
     else:
         BACKGROUND_QUEUE = None
 
+    if not USE_DB_CHUNKS and INGEST_WORKERS > 0 and INGEST_POOL is None:
+        INGEST_POOL = ProcessPoolExecutor(
+            max_workers=INGEST_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        # Pay interpreter start-up now rather than on the first ingest request
+        for _ in range(INGEST_WORKERS):
+            INGEST_POOL.submit(os.getpid)
+        logger.info("Ingest worker pool started (%d workers)", INGEST_WORKERS)
+
     configure_logging()
     setup_tracing(app)
+
+    if ASK_LOG_FLUSH_INTERVAL > 0 and _ask_events_task is None:
+        _ask_events_task = asyncio.create_task(ASK_EVENTS.run(ASK_LOG_FLUSH_INTERVAL))
+
+    if HEALTHCHECKS_PING_URL and _ping_worker_task is None:
+        _ping_queue = asyncio.Queue(maxsize=64)
+        _ping_worker_task = asyncio.create_task(_healthcheck_ping_worker(_ping_queue))
     
     # Load engine configuration for Second Brain Phase I
     if ENGINE_CONFIG_AVAILABLE and load_engines_config:
@@ -1389,10 +1921,22 @@ async def startup_event():
     _startup_complete = True
     logger.info("Startup complete - server ready to accept requests")
 
-@app.on_event("shutdown")
 async def shutdown_event():
     """Close database connection on shutdown."""
-    global DB, BACKGROUND_QUEUE
+    global DB, BACKGROUND_QUEUE, INGEST_POOL, _ask_events_task, _ping_queue, _ping_worker_task, _http_client
+    for task in (_ask_events_task, _ping_worker_task):
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    _ask_events_task = None
+    _ping_worker_task = None
+    _ping_queue = None
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
     if DB:
         # Database cleanup if needed
         try:
@@ -1406,6 +1950,155 @@ async def shutdown_event():
         except Exception:
             logger.warning("Failed to stop background queue", exc_info=True)
         BACKGROUND_QUEUE = None
+    if INGEST_POOL:
+        INGEST_POOL.shutdown(wait=False, cancel_futures=True)
+        INGEST_POOL = None
+
+async def _run_legacy_ingest(func, *args, out_jsonl: str, **kwargs) -> Dict[str, Any]:
+    """Run a raglite JSONL ingest function on the worker pool (or a thread if no pool).
+
+    The worker parses and chunks into a private staging file, so several ingests run
+    in parallel; only the append to ``out_jsonl`` happens under the chunk write lock.
+    """
+    loop = asyncio.get_running_loop()
+    out_dir = os.path.dirname(out_jsonl) or "."
+    os.makedirs(out_dir, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(prefix=".ingest-", dir=out_dir)
+    try:
+        staged = os.path.join(staging_dir, "chunks.jsonl")
+        result = await loop.run_in_executor(
+            INGEST_POOL, functools.partial(func, *args, out_jsonl=staged, **kwargs)
+        )
+        written = int(result.get("written", 0) or 0)
+        if written and os.path.exists(staged):
+            async with _get_chunk_write_lock():
+                count_was_current = _chunk_count_is_current()
+                workspace_counts_were_current = _workspace_counts_are_current()
+                await asyncio.to_thread(_append_staged_chunks, staged, out_jsonl)
+                if count_was_current:
+                    _set_chunk_count(_chunk_count_cache + written)
+                if workspace_counts_were_current:
+                    _bump_workspace_count(kwargs.get("workspace_id"), written)
+        if "path" in result and result["path"] == staged:
+            result["path"] = out_jsonl
+        return result
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def _append_staged_chunks(staged: str, out_jsonl: str) -> None:
+    """Append a worker's staged rows to ``out_jsonl`` the way raglite.write_jsonl does.
+
+    The live file is backed up, copied with the new rows into a sibling file and
+    swapped in atomically, so a failed append leaves the original untouched.
+    """
+    os.makedirs(os.path.dirname(out_jsonl) or ".", exist_ok=True)
+    try:
+        create_chunk_backup(out_jsonl)
+    except ChunkBackupError as err:
+        raise IOError(f"Unable to create backup for {out_jsonl}: {err}") from err
+    tmp_path = f"{out_jsonl}.staged"
+    try:
+        with open(tmp_path, "wb") as out:
+            if os.path.exists(out_jsonl):
+                with open(out_jsonl, "rb") as current:
+                    shutil.copyfileobj(current, out)
+            with open(staged, "rb") as rows:
+                shutil.copyfileobj(rows, out)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, out_jsonl)
+    except OSError as err:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise IOError(f"Failed to stage chunks to {out_jsonl}: {err}") from err
+
+
+def _chunk_count_is_current() -> bool:
+    """True when the cached legacy line count still matches the chunks file on disk."""
+    if _chunk_count_cache is None:
+        return False
+    try:
+        return _chunk_count_stamp == os.path.getmtime(CHUNKS_PATH)
+    except OSError:
+        return False
+
+
+def _set_chunk_count(count: int) -> None:
+    """Record a known line count for the chunks file as it is on disk right now.
+
+    Writers that know exactly how many lines they appended or kept use this to
+    keep ``_count_lines`` from rescanning the whole file on the next response.
+    """
+    global _chunk_count_cache, _chunk_count_stamp
+    try:
+        st = os.stat(CHUNKS_PATH)
+    except OSError:
+        _chunk_count_cache = None
+        _chunk_count_stamp = None
+        return
+    _chunk_count_stamp = st.st_mtime
+    _chunk_count_cache = count
+    CHUNK_COUNT_GAUGE.set(count)
+    _write_chunk_count_sidecar(CHUNKS_PATH, count, st.st_mtime_ns)
+
+
+def _chunk_count_sidecar(path: str) -> str:
+    return f"{path}.count"
+
+
+def _write_chunk_count_sidecar(path: str, count: int, mtime_ns: int) -> None:
+    """Persist a known line count next to the chunks file so restarts skip the rescan."""
+    sidecar = _chunk_count_sidecar(path)
+    tmp_path = f"{sidecar}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"count": count, "mtime_ns": mtime_ns}, f)
+        os.replace(tmp_path, sidecar)
+    except OSError as exc:
+        logger.debug("Could not write chunk count sidecar %s: %s", sidecar, exc)
+
+
+def _read_chunk_count_sidecar(path: str, mtime_ns: int) -> Optional[int]:
+    """Return the persisted line count if it was recorded for this exact version of the file."""
+    try:
+        with open(_chunk_count_sidecar(path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("mtime_ns") != mtime_ns:
+        return None
+    count = data.get("count")
+    return count if isinstance(count, int) and count >= 0 else None
+
+_LINE_COUNT_BLOCK = 1 << 20
+
+
+def _count_newlines(path: str) -> int:
+    """Count lines by scanning raw bytes in large blocks (``bytes.count`` runs in C)."""
+    count = 0
+    last = b""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(_LINE_COUNT_BLOCK)
+            if not block:
+                break
+            count += block.count(b"\n")
+            last = block[-1:]
+    # Match text-mode iteration, which also counts a final line without a newline.
+    if last and last != b"\n":
+        count += 1
+    return count
+
+
+async def _count_chunk_lines() -> int:
+    """``_count_lines(CHUNKS_PATH)`` for async handlers; full-file rescans run in a worker thread."""
+    if USE_DB_CHUNKS or _chunk_count_is_current():
+        return _count_lines(CHUNKS_PATH)
+    return await asyncio.to_thread(_count_lines, CHUNKS_PATH)
+
 
 def _count_lines(path):
     """Count lines in file or chunks in database."""
@@ -1424,21 +2117,25 @@ def _count_lines(path):
     
     # Fallback to file counting
     try:
-        modified = os.path.getmtime(path)
+        st = os.stat(path)
     except OSError:
         _chunk_count_cache = 0
         _chunk_count_stamp = None
         CHUNK_COUNT_GAUGE.set(0)
         return 0
 
+    modified = st.st_mtime
     if _chunk_count_cache is not None and _chunk_count_stamp == modified:
         return _chunk_count_cache
 
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            count = sum(1 for _ in f)
-    except FileNotFoundError:
-        count = 0
+    count = _read_chunk_count_sidecar(path, st.st_mtime_ns)
+    if count is None:
+        try:
+            count = _count_newlines(path)
+        except FileNotFoundError:
+            count = 0
+        else:
+            _write_chunk_count_sidecar(path, count, st.st_mtime_ns)
 
     _chunk_count_cache = count
     _chunk_count_stamp = modified
@@ -1466,6 +2163,20 @@ def require_admin(user: Optional[Dict[str, Any]], api_key: Optional[APIKeyPrinci
             detail="Admin privileges required."
         )
 
+def _chunks_replaced() -> None:
+    """Call after every assignment to CHUNKS; invalidates the caches derived from it."""
+    global _chunks_epoch
+    _chunks_epoch += 1
+
+
+def _chunks_version(chunks: Optional[List[Dict[str, Any]]] = None) -> Tuple[int, int]:
+    """Cache key for ``chunks`` (default CHUNKS) that does not keep the list alive.
+
+    The identity half also catches a replacement that skipped _chunks_replaced().
+    """
+    return _chunks_epoch, id(CHUNKS if chunks is None else chunks)
+
+
 def ensure_index(require: bool = True):
     """Load or build the search index (sync version for legacy/file-based mode).
 
@@ -1482,7 +2193,10 @@ def ensure_index(require: bool = True):
     # uses async locking in startup_event and ingestion endpoints
     if INDEX is None:
         # Check if we should load from database or file
-        if USE_DB_CHUNKS:
+        if not USE_DB_CHUNKS and CHUNKS and _chunks_version() == _unindexed_chunks_version:
+            # Already read by ensure_chunks_loaded(); only the index is missing.
+            pass
+        elif USE_DB_CHUNKS:
             # Load from database - this is handled async in startup_event
             # For sync context, we'll skip and let startup handle it
             if require:
@@ -1491,6 +2205,7 @@ def ensure_index(require: bool = True):
             else:
                 logger.info("Database chunks will be loaded asynchronously during startup")
                 CHUNKS = []
+                _chunks_replaced()
                 INDEX = SimpleIndex([])
                 return
         else:
@@ -1502,10 +2217,12 @@ def ensure_index(require: bool = True):
                 else:
                     logger.warning(f"No chunks file at {CHUNKS_PATH} - starting with empty index")
                     CHUNKS = []
+                    _chunks_replaced()
                     INDEX = SimpleIndex([])
                     return
             try:
                 CHUNKS = load_chunks(CHUNKS_PATH)
+                _chunks_replaced()
                 CHUNK_ID_MAP = {
                     chunk.get("id"): chunk for chunk in CHUNKS if chunk.get("id")
                 }
@@ -1515,6 +2232,7 @@ def ensure_index(require: bool = True):
                     raise IndexNotFoundError("Failed to load index. Please try rebuilding.")
                 else:
                     CHUNKS = []
+                    _chunks_replaced()
                     INDEX = SimpleIndex([])
                     return
 
@@ -1538,6 +2256,37 @@ def ensure_index(require: bool = True):
                 INDEX = SimpleIndex([])
 
 
+# _chunks_version() of the CHUNKS read by ensure_chunks_loaded() before any index was
+# built. Resets replace CHUNKS, so the check in ensure_index() goes stale on its own.
+_unindexed_chunks_version: Optional[Tuple[int, int]] = None
+
+
+def ensure_chunks_loaded(require: bool = True) -> None:
+    """Make CHUNKS available without building the search index.
+
+    Source listings, chunk lists and previews only read chunk metadata, so in
+    file mode they skip tokenizing the corpus until something actually searches.
+    Database mode and every error path defer to ensure_index().
+    """
+    global CHUNKS, CHUNK_ID_MAP, _unindexed_chunks_version
+    if INDEX is not None or USE_DB_CHUNKS or not os.path.exists(CHUNKS_PATH):
+        ensure_index(require=require)
+        return
+    if CHUNKS and _chunks_version() == _unindexed_chunks_version:
+        return
+    try:
+        chunks = load_chunks(CHUNKS_PATH)
+    except Exception:
+        chunks = []
+    if not chunks:
+        ensure_index(require=require)
+        return
+    CHUNKS = chunks
+    _chunks_replaced()
+    CHUNK_ID_MAP = {chunk.get("id"): chunk for chunk in chunks if chunk.get("id")}
+    _unindexed_chunks_version = _chunks_version()
+
+
 def _init_model_service():
     if not MODEL_SERVICE_AVAILABLE or not ConcreteModelService:
         logger.info("Model service implementation not available")
@@ -1583,6 +2332,56 @@ def _refresh_rag_pipeline_index():
 @app.get("/")
 def root(): return HTMLResponse('<meta http-equiv="refresh" content="0; url=/app/">')
 
+@app.get("/livez", include_in_schema=False)
+async def livez():
+    """Liveness probe: the process is up and the event loop is responsive."""
+    return {"status": "alive"}
+
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness probe: startup finished and the search index warmup has completed."""
+    event = _index_warm_event
+    if _startup_complete and event is not None and not event.is_set():
+        try:
+            await asyncio.wait_for(event.wait(), timeout=READYZ_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+    if not _startup_complete or event is None or not event.is_set():
+        return JSONResponse(
+            status_code=503,
+            content={"status": "starting"},
+            headers={"Retry-After": "5"},
+        )
+    return {"status": "ready", "chunks": len(CHUNKS)}
+
+
+# /health must answer quickly even when Postgres is stalled, and must not turn
+# every probe into a COUNT(*) over the chunks table.
+try:
+    HEALTH_DB_TIMEOUT = float(os.getenv("HEALTH_DB_TIMEOUT", "1.0"))
+except ValueError:
+    HEALTH_DB_TIMEOUT = 1.0
+try:
+    HEALTH_DB_COUNT_TTL = float(os.getenv("HEALTH_DB_COUNT_TTL", "5.0"))
+except ValueError:
+    HEALTH_DB_COUNT_TTL = 5.0
+_health_db_chunks: Optional[Tuple[int, float]] = None
+
+
+async def _health_db_chunk_count() -> int:
+    global _health_db_chunks
+    now = time.monotonic()
+    if _health_db_chunks is not None and _health_db_chunks[1] > now:
+        return _health_db_chunks[0]
+    count_row = await asyncio.wait_for(
+        DB.fetch_one("SELECT COUNT(*) as cnt FROM chunks"), timeout=HEALTH_DB_TIMEOUT
+    )
+    count = count_row["cnt"] if count_row else 0
+    _health_db_chunks = (count, now + HEALTH_DB_COUNT_TTL)
+    return count
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring (public)."""
@@ -1592,11 +2391,12 @@ async def health_check():
         db_chunks_count = 0
         if DB:
             try:
-                await DB.fetch_one("SELECT 1")
+                await asyncio.wait_for(DB.fetch_one("SELECT 1"), timeout=HEALTH_DB_TIMEOUT)
                 db_status = "healthy"
-                # Get actual chunk count from database
-                count_row = await DB.fetch_one("SELECT COUNT(*) as cnt FROM chunks")
-                db_chunks_count = count_row["cnt"] if count_row else 0
+                db_chunks_count = await _health_db_chunk_count()
+            except asyncio.TimeoutError:
+                logger.warning("Database health check timed out after %.1fs", HEALTH_DB_TIMEOUT)
+                db_status = "degraded"
             except (ConnectionError, TimeoutError) as e:
                 logger.warning(f"Database health check failed (connection error): {e}")
                 db_status = "unhealthy"
@@ -1607,7 +2407,7 @@ async def health_check():
         # Check in-memory index (fallback for file-based mode)
         file_chunks_count = 0
         if os.path.exists(CHUNKS_PATH):
-            file_chunks_count = _count_lines(CHUNKS_PATH)
+            file_chunks_count = await _count_chunk_lines()
         
         # Use database count if available, otherwise file count
         chunks_count = db_chunks_count if db_chunks_count > 0 else file_chunks_count
@@ -1619,8 +2419,15 @@ async def health_check():
         cohere_configured = bool(os.environ.get("COHERE_API_KEY"))
         llm_available = openai_configured or anthropic_configured
         
+        if db_status == "unhealthy":
+            overall_status = "unhealthy"
+        elif db_status == "degraded":
+            overall_status = "degraded"
+        else:
+            overall_status = "healthy"
+
         response = {
-            "status": "healthy",
+            "status": overall_status,
             "database": db_status,
             "index": index_status,
             "chunks_count": chunks_count,
@@ -1632,7 +2439,9 @@ async def health_check():
             "anthropic_configured": anthropic_configured,
             "cohere_configured": cohere_configured,
         }
-        asyncio.create_task(_ping_healthchecks(True, response))
+        _enqueue_healthcheck_ping(overall_status != "unhealthy", response)
+        if overall_status == "unhealthy":
+            return JSONResponse(status_code=503, content=response)
         return response
     except Exception as e:
         logger.error(f"Health check failed: {e}", exc_info=True)
@@ -1640,8 +2449,8 @@ async def health_check():
             "status": "unhealthy",
             "error": str(e)
         }
-        asyncio.create_task(_ping_healthchecks(False, failure_payload))
-        return failure_payload
+        _enqueue_healthcheck_ping(False, failure_payload)
+        return JSONResponse(status_code=503, content=failure_payload)
 
 
 @app.get("/version")
@@ -1756,7 +2565,6 @@ def _render_markdown_page(md_path: str, title: str) -> HTMLResponse:
         with open(md_path, 'r') as f:
             content = f.read()
         # Simple markdown to HTML (basic conversion)
-        import re
         html_content = content
         # Headers
         html_content = re.sub(r'^### (.+)$', r'<h3>\1</h3>', html_content, flags=re.MULTILINE)
@@ -1843,8 +2651,6 @@ async def google_auth(request: Request):
         return await oauth.google.authorize_redirect(request, redirect_uri)
     except Exception as e:
         logger.error(f"OAuth redirect error: {e}", exc_info=True)
-        import traceback
-        logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"OAuth error: {str(e)}")
 
 @app.get("/auth/google/callback")
@@ -1867,21 +2673,17 @@ async def google_callback(request: Request):
         # Fetch user info from Google API using access token
         if access_token and not user_info:
             try:
-                import httpx
-                async with httpx.AsyncClient() as client:
-                    headers = build_observability_headers({"Authorization": f"Bearer {access_token}"})
-                    resp = await client.get(
-                        "https://www.googleapis.com/oauth2/v2/userinfo",
-                        headers=headers,
-                        timeout=10.0
-                    )
-                    resp.raise_for_status()
-                    user_info = resp.json()
-                    logger.info("Successfully fetched user info from Google API")
+                headers = build_observability_headers({"Authorization": f"Bearer {access_token}"})
+                resp = await _get_http_client().get(
+                    "https://www.googleapis.com/oauth2/v2/userinfo",
+                    headers=headers,
+                    timeout=10.0
+                )
+                resp.raise_for_status()
+                user_info = resp.json()
+                logger.info("Successfully fetched user info from Google API")
             except Exception as fetch_error:
-                logger.error(f"Failed to fetch user info: {fetch_error}")
-                import traceback
-                logger.error(traceback.format_exc())
+                logger.error(f"Failed to fetch user info: {fetch_error}", exc_info=True)
                 user_info = None
         
         if not user_info:
@@ -1912,6 +2714,7 @@ async def google_callback(request: Request):
                 if db_user:
                     user_id = str(db_user['id'])
                     user_role = db_user['role']
+                    _forget_auth_user(user_id)
                     logger.info(f"User {email} saved to database with role: {user_role}")
             except Exception as e:
                 logger.error(f"Failed to save user to database: {e}", exc_info=True)
@@ -1944,8 +2747,6 @@ async def google_callback(request: Request):
         return response
     except Exception as e:
         logger.error(f"OAuth callback error: {e}", exc_info=True)
-        import traceback
-        logger.error(traceback.format_exc())
         raise HTTPException(status_code=400, detail="OAuth callback failed")
 
 
@@ -1955,8 +2756,10 @@ async def legacy_google_callback(request: Request):
     return await google_callback(request)
 
 @app.get("/auth/logout")
-async def logout():
+async def logout(request: Request):
     """Logout user by clearing cookie."""
+    user = get_current_user(request)
+    _forget_auth_user(user.get("user_id") if user else None)
     response = RedirectResponse(url="/app/")
     response.delete_cookie("access_token")
     return response
@@ -2043,9 +2846,15 @@ async def login(request: Request, username: str = Form(...), password: str = For
     )
     return response
 
+# The SPA polls /auth/me; let the browser absorb bursts. Vary on the credentials
+# so a login or logout (new cookie) never reuses the other identity's answer.
+AUTH_ME_CACHE_HEADERS = {"Cache-Control": "private, max-age=5", "Vary": "Authorization, Cookie"}
+
+
 @app.get("/auth/me")
-async def get_me(request: Request):
+async def get_me(request: Request, response: Response):
     """Get current user information."""
+    response.headers.update(AUTH_ME_CACHE_HEADERS)
     # LOCAL_MODE bypass: return authenticated admin user
     if LOCAL_MODE:
         return {
@@ -2095,8 +2904,7 @@ async def ask(request: Request, query: str = Form(...), k: int = Form(8), comman
     await _consume_workspace_quota(workspace_id, request_delta=1)
 
     # Add timeout for query processing
-    import asyncio
-    start_time = asyncio.get_event_loop().time()
+    start_time = time.perf_counter()
     outcome = "success"
     status_code = 200
     try:
@@ -2142,15 +2950,25 @@ async def ask(request: Request, query: str = Form(...), k: int = Form(8), comman
                 )
             except Exception as e:
                 logger.warning(f"Failed to store history: {e}")
-        _log_event(
-            "ask.completed",
-            user_id=user_id,
-            workspace_id=workspace_id,
-            api_key=bool(api_key_principal),
-            query=ask_req.query[:200],
-            k=ask_req.k,
-            result_count=len(result.get("chunks", [])),
-        )
+        completed = {
+            "user_id": user_id,
+            "workspace_id": workspace_id,
+            "api_key": bool(api_key_principal),
+            "query": ask_req.query[:200],
+            "k": ask_req.k,
+            "result_count": len(result.get("chunks", [])),
+        }
+        if ASK_EVENTS.active:
+            ASK_EVENTS.record(
+                user_id,
+                workspace_id,
+                (time.perf_counter() - start_time) * 1000,
+                completed["result_count"],
+            )
+            # Only the operational log is aggregated; the audit trail stays per request.
+            _audit_event("ask.completed", **completed)
+        else:
+            _log_event("ask.completed", **completed)
         return result
     except asyncio.TimeoutError:
         outcome = "timeout"
@@ -2168,9 +2986,8 @@ async def ask(request: Request, query: str = Form(...), k: int = Form(8), comman
         status_code = 500
         raise
     finally:
-        duration = asyncio.get_event_loop().time() - start_time
-        ASK_REQUEST_COUNTER.labels(outcome=outcome, status_code=str(status_code)).inc()
-        ASK_LATENCY.labels(outcome=outcome).observe(duration)
+        duration = time.perf_counter() - start_time
+        _record_ask_event(outcome, status_code, duration)
 
 
 # Expose ask endpoint under API v1 namespace for backwards compatibility
@@ -2402,7 +3219,7 @@ async def _process_query_with_llm(
         "answer": answer,
         "citations": citations,
         "score": score,
-        "count": _count_lines(CHUNKS_PATH),
+        "count": await _count_chunk_lines(),
         "chunks": chunk_details,
     }
 
@@ -2412,37 +3229,53 @@ def _process_query_legacy(query: str, k: int, user: Dict[str, Any], workspace_id
     ensure_index()
     user_id = user.get("user_id") if user else None
     ranked = INDEX.search(query, k=k, user_id=user_id, workspace_id=workspace_id)
-    # FIX 1: ranked now returns (chunk_id, score) instead of (idx, score)
-    top = [CHUNK_ID_MAP.get(chunk_id) for chunk_id, _ in ranked if chunk_id in CHUNK_ID_MAP]
-    snippets = [c.get("content", "").strip() for c in top[:3]]
-    cites = [format_citation(c) for c in top[:3]]
-    text = " ".join(snippets)
-    if len(text) > 900:
-        text = text[:900].rsplit(" ", 1)[0] + "…"
-    ans = f"{text}\n\nSources:\n" + "\n".join(f"- {u}" for u in cites)
-    sc = score_answer(query, ans, top)
-    
+    if not ranked:
+        return {
+            "answer": "No relevant chunks found.",
+            "citations": [],
+            "score": 0.0,
+            "count": _count_lines(CHUNKS_PATH),
+            "chunks": [],
+        }
+    # FIX 1: ranked returns (chunk_id, score); resolve each hit once and build
+    # the answer snippets, citations and chunk details in the same pass.
+    top = []
+    snippets = []
+    cites = []
     chunk_details = []
-    for idx, (i, score) in enumerate(ranked):
-        chunk = CHUNKS[i]
+    for chunk_id, score in ranked:
+        chunk = CHUNK_ID_MAP.get(chunk_id)
+        if chunk is None:
+            continue
+        content = chunk.get("content", "").strip()
+        citation = format_citation(chunk)
+        if len(top) < 3:
+            snippets.append(content)
+            cites.append(citation)
+        top.append(chunk)
         meta = chunk.get("metadata", {})
         chunk_details.append(
             {
-            "index": idx + 1,
-            "content": chunk.get("content", "").strip(),
-            "score": float(score),
-            "citation": format_citation(chunk),
-            "source": chunk.get("source", {}),
-            "metadata": {
-                "chunk_index": meta.get("chunk_index"),
-                "chunk_count": meta.get("chunk_count"),
-                "start_sec": meta.get("start_sec"),
-                "end_sec": meta.get("end_sec"),
+                "index": len(chunk_details) + 1,
+                "content": content,
+                "score": float(score),
+                "citation": citation,
+                "source": chunk.get("source", {}),
+                "metadata": {
+                    "chunk_index": meta.get("chunk_index"),
+                    "chunk_count": meta.get("chunk_count"),
+                    "start_sec": meta.get("start_sec"),
+                    "end_sec": meta.get("end_sec"),
                     "language": meta.get("language", "en"),
                 },
             }
         )
-    
+    text = " ".join(snippets)
+    if len(text) > 900:
+        text = text[:900].rsplit(" ", 1)[0] + "…"
+    ans = f"{text}\n\nSources:\n" + "\n".join(f"- {u}" for u in cites)
+    sc = score_answer(query, ans, top)
+
     return {
         "answer": ans,
         "citations": cites,
@@ -2470,8 +3303,14 @@ def _get_chunk_by_id(chunk_id: Optional[str]) -> Optional[Dict[str, Any]]:
     description="Returns basic system stats including total chunk count. Useful for dashboard widgets.",
     tags=["System"]
 )
-def stats():
-    return {"count": _count_lines(CHUNKS_PATH)}
+def stats(request: Request, response: Response):
+    count = _count_lines(CHUNKS_PATH)
+    # The chunk count is the whole payload, so it doubles as a weak validator.
+    headers = {"Cache-Control": "public, max-age=30", "ETag": f'W/"{count}"'}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return {"count": count}
 
 # Also expose on v1
 api_v1.get(
@@ -2494,14 +3333,18 @@ async def list_jobs(request: Request, limit: int = 50):
     return {"jobs": BACKGROUND_QUEUE.list_jobs(limit=limit)}
 
 
+_YOUTUBE_URL_RE = re.compile(
+    r'^https?://(?:'
+    r'(?:www\.)?youtube\.com/watch\?v=[\w-]+'
+    r'|(?:www\.)?youtube\.com/embed/[\w-]+'
+    r'|youtu\.be/[\w-]+'
+    r')'
+)
+
+
 def validate_youtube_url(url: str) -> bool:
     """Validate YouTube URL format."""
-    youtube_patterns = [
-        r'^https?://(www\.)?youtube\.com/watch\?v=[\w-]+',
-        r'^https?://(www\.)?youtube\.com/embed/[\w-]+',
-        r'^https?://youtu\.be/[\w-]+',
-    ]
-    return any(re.match(pattern, url) for pattern in youtube_patterns)
+    return _YOUTUBE_URL_RE.match(url) is not None
 
 @app.post("/api/ingest_urls")
 @app.post("/ingest/urls")
@@ -2556,46 +3399,224 @@ async def ingest_urls(request: Request, urls: str = Form(...), language: str = F
 api_v1.post("/ingest/urls")(ingest_urls)
 
 
-async def _ingest_urls_core(
-    user: Optional[Dict[str, Any]],
+try:
+    YT_INGEST_CONCURRENCY = max(1, int(os.getenv("YT_INGEST_CONCURRENCY", "4")))
+except ValueError:
+    YT_INGEST_CONCURRENCY = 4
+
+
+# yt_dlp calls cannot be interrupted, so they get their own bounded pool instead of
+# the default executor that asyncio.to_thread (and /ask) share.
+_YT_DLP_EXECUTOR = ThreadPoolExecutor(max_workers=YT_INGEST_CONCURRENCY, thread_name_prefix="yt-dlp")
+
+
+def _fetch_auto_captions_in_process(url: str, language: str, outdir: str, timeout: float) -> str:
+    """Write auto-captions for ``url`` into ``outdir`` with the yt_dlp library; returns the video id."""
+    opts = {
+        "skip_download": True,
+        "writeautomaticsub": True,
+        "subtitleslangs": [language],
+        "subtitlesformat": "vtt",
+        "quiet": True,
+        "no_warnings": True,
+        "socket_timeout": timeout,
+        "outtmpl": os.path.join(outdir, "%(id)s.%(ext)s"),
+    }
+    with YoutubeDL(opts) as ydl:
+        info = ydl.extract_info(url, download=True)
+    return str((info or {}).get("id") or "")
+
+
+async def _fetch_auto_captions(url: str, language: str, outdir: str, timeout: float) -> str:
+    """Fetch auto-captions for ``url`` into ``outdir`` and return the video id ("" if unknown).
+
+    Uses yt_dlp in-process when installed, which skips a fork/exec and a cold
+    interpreter start per fallback; otherwise shells out to the yt-dlp CLI.
+    """
+    if YT_DLP_AVAILABLE:
+        future = asyncio.get_running_loop().run_in_executor(
+            _YT_DLP_EXECUTOR, _fetch_auto_captions_in_process, url, language, outdir, timeout
+        )
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            # The call keeps running until socket_timeout trips; clean up whatever it
+            # still writes into outdir once it returns.
+            future.add_done_callback(functools.partial(_discard_late_captions, outdir))
+            raise
+    # One yt-dlp run both writes the captions and reports the video id
+    # ("after_move:" printing does not imply --simulate).
+    stdout = await _run_yt_dlp(
+        ["--skip-download", "--write-auto-sub",
+         "--sub-lang", language, "--sub-format", "vtt",
+         "--print", "after_move:id",
+         "-o", os.path.join(outdir, "%(id)s.%(ext)s"), url],
+        timeout=timeout,
+    )
+    lines = stdout.decode(errors="replace").strip().splitlines()
+    return lines[-1].strip() if lines else ""
+
+
+def _discard_late_captions(outdir: str, future: "asyncio.Future[str]") -> None:
+    if not future.cancelled():
+        future.exception()  # retrieved, so a late failure is not reported as unhandled
+    shutil.rmtree(outdir, ignore_errors=True)
+
+
+async def _run_yt_dlp(args: List[str], timeout: float) -> bytes:
+    """Run yt-dlp without blocking the event loop; returns stdout or raises on failure/timeout."""
+    proc = await asyncio.create_subprocess_exec(
+        "yt-dlp",
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    try:
+        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, ["yt-dlp", *args])
+    return stdout
+
+
+async def _ingest_youtube_url(
+    url: str,
+    user_id: Optional[str],
     workspace_id: Optional[str],
     api_key_principal: Optional[APIKeyPrincipal],
     url_req: IngestURLRequest,
-    urls_list: List[str],
 ) -> Dict[str, Any]:
-    user_id = user.get("user_id") if user else None
-    results: List[Dict[str, Any]] = []
-    total = 0
-    await _consume_workspace_quota(workspace_id, request_delta=1)
-    current_chunk_total = await _count_workspace_chunks(workspace_id)
-
-    for url in urls_list:
-        # Validate YouTube URL format
-        if not validate_youtube_url(url):
-            results.append({"url": url, "error": "Invalid YouTube URL format", "written": 0})
+    """Ingest a single YouTube URL (transcript first, yt-dlp auto-captions as fallback)."""
+    # Shared by every log line and timer for this URL.
+    log_ctx = {"url": url, "user_id": user_id, "workspace_id": workspace_id, "api_key": bool(api_key_principal)}
+    # Validate YouTube URL format
+    if not validate_youtube_url(url):
+        _log_event(
+            "ingest.youtube.skipped",
+            **log_ctx,
+            reason="invalid_format",
+        )
+        _record_ingest_event("youtube", "skipped", 400)
+        return {"url": url, "error": "Invalid YouTube URL format", "written": 0}
+    start_time = time.perf_counter()
+    primary_outcome = "success"
+    try:
+        with RequestTimer("ingest_youtube", log_ctx):
+            if USE_DB_CHUNKS:
+                # Use database storage
+                store = _get_vector_store()
+                if store:
+                    r = await ingest_youtube_db(
+                        url,
+                        store,
+                        language=url_req.language,
+                        user_id=user_id,
+                        workspace_id=workspace_id
+                    )
+                else:
+                    raise RuntimeError("Database not available for chunk storage")
+            else:
+                # Legacy file storage
+                r = await _run_legacy_ingest(
+                    ingest_youtube,
+                    url,
+                    out_jsonl=CHUNKS_PATH,
+                    language=url_req.language,
+                    user_id=user_id,
+                    workspace_id=workspace_id
+                )
+        written = r.get("written", 0)
+        if written == 0 and r.get("stderr"):
+            error_msg = r.get("stderr", "Unknown error")
+            logger.warning(f"YouTube ingestion failed for {url}: {error_msg}")
             _log_event(
-                "ingest.youtube.skipped",
-                url=url,
-                reason="invalid_format",
-                user_id=user_id,
-                workspace_id=workspace_id,
-                api_key=bool(api_key_principal),
+                "ingest.youtube.failed",
+                **log_ctx,
+                error=error_msg,
+                stage="primary",
             )
-            _record_ingest_event("youtube", "skipped", 400)
-            continue
-        start_time = time.perf_counter()
-        primary_outcome = "success"
+            _record_ingest_event("youtube", "failure", 500)
+            primary_outcome = "failure"
+            return {"url": url, "written": 0, "mode": "transcript", "error": error_msg}
+        _log_event(
+            "ingest.youtube.completed",
+            **log_ctx,
+            written=written,
+            language=url_req.language,
+            mode="transcript",
+        )
+        _record_ingest_event("youtube", "success", 200)
+        if written:
+            _INGEST_PROCESSED_CHILDREN["youtube"].inc(written)
+        return {"url": url, "written": written, "mode": "transcript"}
+    except Exception as exc:
+        logger.error(f"Error ingesting YouTube URL {url}: {exc}", exc_info=True)
+        _log_event(
+            "ingest.youtube.failed",
+            **log_ctx,
+            error=str(exc),
+            stage="primary_exception",
+        )
+        _record_ingest_event("youtube", "failure", 500)
+        # fallback: fetch auto-captions via yt-dlp, then ingest .vtt
+        primary_outcome = "failure"
+        vtt = ""
+        # yt-dlp writes into a private directory so concurrent fallbacks never see
+        # each other's partial files; the finished caption is then moved to a
+        # stable path (which becomes the chunk source path).
+        CAPTIONS_DIR.mkdir(parents=True, exist_ok=True)
+        tmpdir = tempfile.mkdtemp(prefix="yt_fallback_", dir=CAPTIONS_DIR)
+        try:
+            vid = await _fetch_auto_captions(url, url_req.language, tmpdir, timeout=60)
+            if vid:
+                # Only this request writes into tmpdir, so one scandir pass is
+                # enough; prefer the requested language, then English variants,
+                # then any other caption track yt-dlp produced for the video.
+                with os.scandir(tmpdir) as entries:
+                    staged_names = sorted(
+                        e.name for e in entries
+                        if e.is_file() and e.name.startswith(f"{vid}.") and e.name.endswith(".vtt")
+                    )
+                preferred = (f"{vid}.{url_req.language}.vtt", f"{vid}.en.vtt", f"{vid}.en-US.vtt")
+                candidate = next((name for name in preferred if name in staged_names), None)
+                if candidate is None and staged_names:
+                    candidate = staged_names[0]
+                if candidate:
+                    vtt = str(CAPTIONS_DIR / candidate)
+                    os.replace(os.path.join(tmpdir, candidate), vtt)
+        except asyncio.TimeoutError:
+            logger.warning(f"yt-dlp download timeout for {url}")
+            vtt = ""
+        except Exception as yt_dl_exc:
+            logger.warning(f"yt-dlp download failed for {url}: {yt_dl_exc}")
+            vtt = ""
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+        if not vtt:
+            error_msg = "No transcript or auto-captions found. Video may not have subtitles available."
+            _log_event(
+                "ingest.youtube.failed",
+                **log_ctx,
+                error=error_msg,
+                stage="fallback_unavailable",
+            )
+            _record_ingest_event("youtube", "failure", 404)
+            return {"url": url, "error": error_msg, "written": 0}
+        fallback_start = time.perf_counter()
+        fallback_outcome = "success"
         try:
             with RequestTimer(
-                "ingest_youtube",
-                {"url": url, "user_id": user_id, "workspace_id": workspace_id, "api_key": bool(api_key_principal)},
+                "ingest_transcript_retry",
+                {"file": vtt, "user_id": user_id, "workspace_id": workspace_id},
             ):
                 if USE_DB_CHUNKS:
-                    # Use database storage
                     store = _get_vector_store()
                     if store:
-                        r = await ingest_youtube_db(
-                            url,
+                        r = await ingest_transcript_db(
+                            vtt,
                             store,
                             language=url_req.language,
                             user_id=user_id,
@@ -2604,180 +3625,76 @@ async def _ingest_urls_core(
                     else:
                         raise RuntimeError("Database not available for chunk storage")
                 else:
-                    # Legacy file storage
-                    r = ingest_youtube(
-                        url,
+                    r = await _run_legacy_ingest(
+                        ingest_transcript,
+                        vtt,
                         out_jsonl=CHUNKS_PATH,
                         language=url_req.language,
                         user_id=user_id,
                         workspace_id=workspace_id
                     )
-            written = r.get("written", 0)
-            if written == 0 and r.get("stderr"):
-                error_msg = r.get("stderr", "Unknown error")
-                logger.warning(f"YouTube ingestion failed for {url}: {error_msg}")
-                results.append({"url": url, "written": 0, "mode": "transcript", "error": error_msg})
-                _log_event(
-                    "ingest.youtube.failed",
-                    url=url,
-                    user_id=user_id,
-                    workspace_id=workspace_id,
-                    api_key=bool(api_key_principal),
-                    error=error_msg,
-                    stage="primary",
-                )
-                _record_ingest_event("youtube", "failure", 500)
-                primary_outcome = "failure"
-            else:
-                results.append({"url": url, "written": written, "mode": "transcript"})
-                _log_event(
-                    "ingest.youtube.completed",
-                    url=url,
-                    user_id=user_id,
-                    workspace_id=workspace_id,
-                    api_key=bool(api_key_principal),
-                    written=written,
-                    language=url_req.language,
-                    mode="transcript",
-                )
-                _record_ingest_event("youtube", "success", 200)
-                if written:
-                    INGEST_PROCESSED_CHUNKS.labels(source="youtube").inc(written)
-            total += written
+        except (subprocess.SubprocessError, FileNotFoundError) as exc:
+            logger.error(f"YouTube transcript extraction failed: {exc}")
+            fallback_outcome = "failure"
+            raise HTTPException(status_code=500, detail=f"Failed to extract transcript: {exc}") from exc
         except Exception as exc:
-            logger.error(f"Error ingesting YouTube URL {url}: {exc}", exc_info=True)
-            _log_event(
-                "ingest.youtube.failed",
-                url=url,
-                user_id=user_id,
-                workspace_id=workspace_id,
-                api_key=bool(api_key_principal),
-                error=str(exc),
-                stage="primary_exception",
-            )
-            _record_ingest_event("youtube", "failure", 500)
-            # fallback: fetch auto-captions via yt-dlp, then ingest .vtt
-            vid = ""
-            primary_outcome = "failure"
-            try:
-                vid = subprocess.check_output(
-                    ["yt-dlp", "--print", "id", "--skip-download", url],
-                    text=True,
-                    timeout=30,
-                    stderr=subprocess.DEVNULL
-                ).strip().splitlines()[0]
-            except subprocess.TimeoutExpired:
-                logger.warning(f"yt-dlp timeout for {url}")
-                vid = ""
-            except Exception as yt_err:
-                logger.warning(f"yt-dlp failed for {url}: {yt_err}")
-                vid = ""
-            vtt = ""
-            try:
-                subprocess.check_call(
-                    ["yt-dlp", "--skip-download", "--write-auto-sub",
-                     "--sub-lang", url_req.language, "--sub-format", "vtt",
-                     "-o", "%(id)s.%(ext)s", url],
-                    timeout=60,
-                    stderr=subprocess.DEVNULL
-                )
-                candidates = []
-                if vid:
-                    candidates += [f"{vid}.{url_req.language}.vtt", f"{vid}.en.vtt", f"{vid}.en-US.vtt"]
-                candidates += [p for p in os.listdir(".") if p.endswith(".vtt")]
-                for candidate in candidates:
-                    if os.path.exists(candidate):
-                        vtt = candidate
-                        break
-            except subprocess.TimeoutExpired:
-                logger.warning(f"yt-dlp download timeout for {url}")
-                vtt = ""
-            except Exception as yt_dl_exc:
-                logger.warning(f"yt-dlp download failed for {url}: {yt_dl_exc}")
-                vtt = ""
-            if vtt:
-                fallback_start = time.perf_counter()
-                fallback_outcome = "success"
-                try:
-                    with RequestTimer(
-                        "ingest_transcript_retry",
-                        {"file": vtt, "user_id": user_id, "workspace_id": workspace_id},
-                    ):
-                        if USE_DB_CHUNKS:
-                            store = _get_vector_store()
-                            if store:
-                                r = await ingest_transcript_db(
-                                    vtt,
-                                    store,
-                                    language=url_req.language,
-                                    user_id=user_id,
-                                    workspace_id=workspace_id
-                                )
-                            else:
-                                raise RuntimeError("Database not available for chunk storage")
-                        else:
-                            r = ingest_transcript(
-                                vtt,
-                                out_jsonl=CHUNKS_PATH,
-                                language=url_req.language,
-                                user_id=user_id,
-                                workspace_id=workspace_id
-                            )
-                except (subprocess.SubprocessError, FileNotFoundError) as exc:
-                    logger.error(f"YouTube transcript extraction failed: {exc}")
-                    fallback_outcome = "failure"
-                    raise HTTPException(status_code=500, detail=f"Failed to extract transcript: {exc}") from exc
-                except Exception as exc:
-                    logger.error(f"Unexpected error during YouTube ingestion: {exc}", exc_info=True)
-                    fallback_outcome = "failure"
-                    raise HTTPException(status_code=500, detail="Failed to process YouTube video") from exc
-                finally:
-                    INGEST_LATENCY.labels(
-                        source="youtube",
-                        outcome=fallback_outcome,
-                    ).observe(max(time.perf_counter() - fallback_start, 0.0))
-                results.append({"url": url, "written": r.get("written", 0), "mode": "auto_captions", "file": vtt})
-                _log_event(
-                    "ingest.youtube.completed",
-                    url=url,
-                    user_id=user_id,
-                    workspace_id=workspace_id,
-                    api_key=bool(api_key_principal),
-                    written=r.get("written", 0),
-                    language=url_req.language,
-                    mode="auto_captions",
-                )
-                _record_ingest_event("youtube", "success", 200)
-                if r.get("written", 0):
-                    INGEST_PROCESSED_CHUNKS.labels(source="youtube").inc(r.get("written", 0))
-                total += r.get("written", 0)
-            else:
-                error_msg = "No transcript or auto-captions found. Video may not have subtitles available."
-                results.append({"url": url, "error": error_msg, "written": 0})
-                _log_event(
-                    "ingest.youtube.failed",
-                    url=url,
-                    user_id=user_id,
-                    workspace_id=workspace_id,
-                    api_key=bool(api_key_principal),
-                    error=error_msg,
-                    stage="fallback_unavailable",
-                )
-                _record_ingest_event("youtube", "failure", 404)
+            logger.error(f"Unexpected error during YouTube ingestion: {exc}", exc_info=True)
+            fallback_outcome = "failure"
+            raise HTTPException(status_code=500, detail="Failed to process YouTube video") from exc
         finally:
-            INGEST_LATENCY.labels(
-                source="youtube",
-                outcome=primary_outcome,
-            ).observe(max(time.perf_counter() - start_time, 0.0))
+            _INGEST_LATENCY_CHILDREN["youtube", fallback_outcome].observe(
+                max(time.perf_counter() - fallback_start, 0.0)
+            )
+        _log_event(
+            "ingest.youtube.completed",
+            **log_ctx,
+            written=r.get("written", 0),
+            language=url_req.language,
+            mode="auto_captions",
+        )
+        _record_ingest_event("youtube", "success", 200)
+        if r.get("written", 0):
+            _INGEST_PROCESSED_CHILDREN["youtube"].inc(r.get("written", 0))
+        return {"url": url, "written": r.get("written", 0), "mode": "auto_captions", "file": vtt}
+    finally:
+        _INGEST_LATENCY_CHILDREN["youtube", primary_outcome].observe(
+            max(time.perf_counter() - start_time, 0.0)
+        )
+
+
+async def _ingest_urls_core(
+    user: Optional[Dict[str, Any]],
+    workspace_id: Optional[str],
+    api_key_principal: Optional[APIKeyPrincipal],
+    url_req: IngestURLRequest,
+    urls_list: List[str],
+) -> Dict[str, Any]:
+    user_id = user.get("user_id") if user else None
+    # Independent round-trips: charge the request and read the chunk total together.
+    _, current_chunk_total = await asyncio.gather(
+        _consume_workspace_quota(workspace_id, request_delta=1),
+        _count_workspace_chunks(workspace_id),
+    )
+
+    semaphore = asyncio.Semaphore(YT_INGEST_CONCURRENCY)
+
+    async def _bounded(url: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await _ingest_youtube_url(url, user_id, workspace_id, api_key_principal, url_req)
+
+    outcomes = await asyncio.gather(*(_bounded(url) for url in urls_list), return_exceptions=True)
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            raise outcome
+    results: List[Dict[str, Any]] = list(outcomes)
+    total = sum(int(entry.get("written", 0) or 0) for entry in results)
+
     if total > 0:
         await _consume_workspace_quota(
             workspace_id,
             chunk_delta=total,
             current_chunk_total=current_chunk_total,
         )
-    global _chunk_count_cache, _chunk_count_stamp
-    _chunk_count_cache = None
-    _chunk_count_stamp = None
     
     # Auto-rebuild index after ingestion
     if total > 0:
@@ -2790,6 +3707,7 @@ async def _ingest_urls_core(
             global INDEX, CHUNKS
             INDEX = None
             CHUNKS = []
+            _chunks_replaced()
             try:
                 ensure_index(require=False)
                 logger.info(f"Index auto-rebuilt after ingestion ({total} chunks added)")
@@ -2819,18 +3737,23 @@ async def ingest_files(request: Request, files: List[UploadFile] = File(...), la
 
     if not prepared_files and initial_results:
         # No files to process after validation
-        return {"results": initial_results, "total_written": 0, "count": _count_lines(CHUNKS_PATH)}
+        return {"results": initial_results, "total_written": 0, "count": await _count_chunk_lines()}
 
     if BACKGROUND_JOBS_ENABLED and BACKGROUND_QUEUE and prepared_files:
         async def job_runner():
-            return await _ingest_files_core(
-                user,
-                workspace_id,
-                api_key_principal,
-                prepared_files,
-                language,
-                initial_results,
-            )
+            try:
+                return await _ingest_files_core(
+                    user,
+                    workspace_id,
+                    api_key_principal,
+                    prepared_files,
+                    language,
+                    initial_results,
+                )
+            except BaseException:
+                # Failed or cancelled mid-run: don't leave the staged uploads behind.
+                _discard_staged_uploads(prepared_files)
+                raise
 
         job = BACKGROUND_QUEUE.submit(
             "ingest_files",
@@ -2841,6 +3764,7 @@ async def ingest_files(request: Request, files: List[UploadFile] = File(...), la
                 "language": language,
                 "file_count": len(prepared_files),
             },
+            on_cancel=functools.partial(_discard_staged_uploads, prepared_files),
         )
         _log_event(
             "ingest.files.queued",
@@ -2930,8 +3854,10 @@ async def stripe_webhook(request: Request):
     payload = await request.body()
     signature = request.headers.get("Stripe-Signature")
     try:
-        event = BILLING_SERVICE.construct_event(payload, signature)
+        # Signature check and payload parse are synchronous; keep them off the event loop.
+        event = await asyncio.to_thread(BILLING_SERVICE.construct_event, payload, signature)
         await BILLING_SERVICE.handle_event(event)
+        _invalidate_billing_cache()
     except BillingServiceError as exc:
         _record_external_error("stripe", "webhook")
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -3005,39 +3931,43 @@ class BillingUpdate(BaseModel):
     subscription_expires_at: Optional[datetime] = None
 
 
+@functools.lru_cache(maxsize=16)
+def _billing_update_query(columns: Tuple[str, ...]) -> str:
+    """UPDATE statement for one combination of billing columns.
+
+    Keeping the SQL text identical per combination lets psycopg reuse its
+    prepared statement instead of planning a fresh string each call.
+    """
+    assignments = ", ".join(f"{column} = ${position}" for position, column in enumerate(columns, 1))
+    return f"""
+    UPDATE organizations
+    SET {assignments}, billing_updated_at = NOW()
+    WHERE id = ${len(columns) + 1}
+    RETURNING *
+    """
+
+
 @api_v1.patch("/admin/billing/{organization_id}")
 async def update_billing_status(organization_id: str, payload: BillingUpdate, request: Request):
     user, _, api_key_principal = await _resolve_auth_context(request, scopes=("admin",), require=True)
     _require_admin_context(user, api_key_principal)
     if DB is None:
         raise HTTPException(status_code=503, detail="Database not configured.")
-    fields = []
-    values = []
-    if payload.plan:
-        fields.append("plan = $%d" % (len(values) + 1))
-        values.append(payload.plan)
-    if payload.billing_status:
-        fields.append("billing_status = $%d" % (len(values) + 1))
-        values.append(payload.billing_status)
-    if payload.trial_ends_at is not None:
-        fields.append("trial_ends_at = $%d" % (len(values) + 1))
-        values.append(payload.trial_ends_at)
-    if payload.subscription_expires_at is not None:
-        fields.append("subscription_expires_at = $%d" % (len(values) + 1))
-        values.append(payload.subscription_expires_at)
-    if not fields:
+    updates = (
+        ("plan", payload.plan or None),
+        ("billing_status", payload.billing_status or None),
+        ("trial_ends_at", payload.trial_ends_at),
+        ("subscription_expires_at", payload.subscription_expires_at),
+    )
+    columns = tuple(column for column, value in updates if value is not None)
+    if not columns:
         raise HTTPException(status_code=400, detail="No billing fields provided.")
 
-    values.append(organization_id)
-    query = f"""
-    UPDATE organizations
-    SET {', '.join(fields)}, billing_updated_at = NOW()
-    WHERE id = ${len(values)}
-    RETURNING *
-    """
-    row = await DB.fetch_one(query, tuple(values))
+    values = tuple(value for _, value in updates if value is not None) + (organization_id,)
+    row = await DB.fetch_one(_billing_update_query(columns), values)
     if not row:
         raise HTTPException(status_code=404, detail="Organization not found.")
+    _invalidate_billing_cache()
     return {"organization": row}
 
 
@@ -3099,6 +4029,18 @@ async def _dedupe_database_chunks() -> Dict[str, Any]:
         return {"kept": 0, "total_before": 0, "removed": 0, "database": True, "error": str(e)}
 
 
+DEDUPE_WRITE_BUFFER = 1 << 20
+
+
+def _dedupe_fallback_key(obj: Dict[str, Any]) -> bytes:
+    """Content key for chunks without an id: a 16-byte digest of the canonical JSON."""
+    if ORJSON_AVAILABLE:
+        canonical = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    else:
+        canonical = json.dumps(obj, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(canonical, digest_size=16, person=b"chunk-body").digest()
+
+
 def _dedupe_chunks_sync() -> Dict[str, Any]:
     inp = CHUNKS_PATH
     tmp = CHUNKS_PATH + ".tmp"
@@ -3112,22 +4054,37 @@ def _dedupe_chunks_sync() -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Failed to backup chunks: {err}") from err
 
     try:
-        with open(inp, "r", encoding="utf-8") as f, open(tmp, "w", encoding="utf-8") as g:
-            for line in f:
-                line = line.strip()
+        # Large read buffer: fewer read syscalls when the file is far bigger than the page cache.
+        with open(inp, "rb", buffering=DEDUPE_WRITE_BUFFER) as f, open(tmp, "wb", buffering=0) as g:
+            buf = bytearray()
+            for raw in f:
+                line = raw.strip()
                 if not line:
                     continue
                 total += 1
                 try:
-                    obj = json.loads(line)
-                except json.JSONDecodeError:
+                    obj = orjson.loads(line) if ORJSON_AVAILABLE else json.loads(line)
+                except ValueError:
                     continue
-                k = obj.get("id") or json.dumps(obj, sort_keys=True)
+                k = obj.get("id")
+                if isinstance(k, str) and k:
+                    # 16-byte digests keep the seen-set small for large files without the
+                    # false positives (i.e. dropped chunks) a Bloom filter would introduce.
+                    k = hashlib.blake2b(k.encode("utf-8"), digest_size=16, person=b"chunk-id").digest()
+                elif not k:
+                    k = _dedupe_fallback_key(obj)
                 if k in seen:
                     continue
                 seen.add(k)
                 kept += 1
-                g.write(json.dumps(obj, ensure_ascii=False) + "\n")
+                # The line already parsed as valid JSON, so keep it verbatim instead of re-serialising.
+                buf += line
+                buf += b"\n"
+                if len(buf) >= DEDUPE_WRITE_BUFFER:
+                    g.write(buf)
+                    buf.clear()
+            if buf:
+                g.write(buf)
         os.replace(tmp, inp)
     except FileNotFoundError:
         pass
@@ -3139,9 +4096,8 @@ def _dedupe_chunks_sync() -> Dict[str, Any]:
             pass
         raise HTTPException(status_code=500, detail=f"Failed to dedupe chunks: {err}") from err
 
-    global _chunk_count_cache, _chunk_count_stamp
-    _chunk_count_cache = None
-    _chunk_count_stamp = None
+    # The rewritten file holds exactly the kept lines.
+    _set_chunk_count(kept)
 
     result = {"kept": kept, "total_before": total, "count": _count_lines(CHUNKS_PATH)}
     _log_event("chunks.dedupe.completed", kept=kept, total_before=total)
@@ -3157,8 +4113,9 @@ async def _run_dedupe_job() -> Dict[str, Any]:
         db_result = await _dedupe_database_chunks()
         results["database"] = db_result
     
-    # Dedupe files
-    file_result = await asyncio.to_thread(_dedupe_chunks_sync)
+    # Dedupe files; the rewrite must not interleave with an ingest append or a delete.
+    async with _get_chunk_write_lock():
+        file_result = await asyncio.to_thread(_dedupe_chunks_sync)
     results["files"] = file_result
     
     # Combine results
@@ -3202,6 +4159,91 @@ async def dedupe(request: Request):
 
 api_v1.post("/dedupe")(dedupe)
 
+_source_rows_cache: Optional[Tuple[Tuple[int, int], Dict[str, List[int]]]] = None
+
+
+def _source_rows(snapshot: Optional[List[Dict[str, Any]]] = None) -> Tuple[List[Dict[str, Any]], Dict[str, List[int]]]:
+    """(CHUNKS snapshot, source id -> row numbers), built once per snapshot."""
+    global _source_rows_cache
+    if snapshot is None:
+        snapshot = CHUNKS
+    version = _chunks_version(snapshot)
+    if _source_rows_cache is not None and _source_rows_cache[0] == version:
+        return snapshot, _source_rows_cache[1]
+    # Chunks of one document share a source dict; hash each distinct source once.
+    source_keys: Dict[Tuple[str, str], str] = {}
+    rows: Dict[str, List[int]] = {}
+    for i, chunk in enumerate(snapshot):
+        source = chunk.get("source") or {}
+        key = (source.get("type", ""), source.get("path") or source.get("url") or "")
+        source_id = source_keys.get(key)
+        if source_id is None:
+            source_id = source_keys[key] = _source_id(source)
+        rows.setdefault(source_id, []).append(i)
+    _source_rows_cache = (version, rows)
+    return snapshot, rows
+
+
+def _chunk_visible(chunk: Dict[str, Any], user_id: Optional[str], workspace_id: Optional[str]) -> bool:
+    """Same owner rule as get_chunks_by_source: unowned (legacy) chunks are visible to everyone."""
+    if user_id:
+        chunk_user_id = chunk.get("user_id")
+        if chunk_user_id is not None and chunk_user_id != user_id:
+            return False
+    if workspace_id:
+        chunk_workspace_id = chunk.get("workspace_id")
+        if chunk_workspace_id is not None and chunk_workspace_id != workspace_id:
+            return False
+    return True
+
+
+def _chunks_for_source(source_id: str, user_id: Optional[str], workspace_id: Optional[str]) -> List[Dict[str, Any]]:
+    """get_chunks_by_source(CHUNKS, ...) via the per-snapshot source map instead of a full scan."""
+    snapshot, rows = _source_rows()
+    return [snapshot[i] for i in rows.get(source_id, ()) if _chunk_visible(snapshot[i], user_id, workspace_id)]
+
+
+def _cached_unique_sources(user_id: Optional[str], workspace_id: Optional[str]) -> List[Dict[str, Any]]:
+    """get_unique_sources(CHUNKS, ...) memoized until CHUNKS is next replaced."""
+    key = (user_id, workspace_id)
+    version = _chunks_version()
+    cached = _sources_cache.get(key)
+    if cached is not None and cached[0] == version:
+        _sources_cache.move_to_end(key)
+        return cached[1]
+
+    sources = get_unique_sources(CHUNKS, user_id=user_id, workspace_id=workspace_id)
+    _sources_cache[key] = (version, sources)
+    _sources_cache.move_to_end(key)
+    while len(_sources_cache) > SOURCE_INDEX_CACHE_SIZE:
+        _sources_cache.popitem(last=False)
+    return sources
+
+
+_admin_stats_cache: Optional[Tuple[Tuple[int, int], Tuple[int, Dict[str, int], int]]] = None
+
+
+def _admin_chunk_stats() -> Tuple[int, Dict[str, int], int]:
+    """(total chunks, chunks per user, distinct sources) in one pass, memoized until CHUNKS is replaced."""
+    global _admin_stats_cache
+    snapshot = CHUNKS
+    version = _chunks_version()
+    if _admin_stats_cache is not None and _admin_stats_cache[0] == version:
+        return _admin_stats_cache[1]
+
+    user_chunks: "collections.Counter[str]" = collections.Counter()
+    # Same identity as retrieval._source_id (type + path/url) without hashing every chunk.
+    sources = set()
+    for chunk in snapshot:
+        user_chunks[chunk.get('user_id', 'legacy')] += 1
+        src = chunk.get("source")
+        if src:
+            sources.add((src.get("type", ""), src.get("path") or src.get("url") or ""))
+    stats = (len(snapshot), dict(user_chunks), len(sources))
+    _admin_stats_cache = (version, stats)
+    return stats
+
+
 @app.get(
     "/api/sources",
     summary="List ingested sources",
@@ -3210,7 +4252,7 @@ api_v1.post("/dedupe")(dedupe)
 )
 async def get_sources(request: Request):
     """List all unique sources with metadata (filtered by user)."""
-    ensure_index()
+    ensure_chunks_loaded()
     user, workspace_id, api_key_principal = await _resolve_auth_context(
         request,
         scopes=("read",),
@@ -3221,14 +4263,14 @@ async def get_sources(request: Request):
         return {"sources": [], "count": 0}
     if api_key_principal and user_id is None:
         user_id = api_key_principal.user_id
-    sources = get_unique_sources(CHUNKS, user_id=user_id, workspace_id=workspace_id)
+    sources = _cached_unique_sources(user_id, workspace_id)
     return {"sources": sources, "count": len(sources)}
 api_v1.get("/sources")(get_sources)
 
 @app.get("/api/sources/{source_id}/chunks")
 async def get_source_chunks(request: Request, source_id: str):
     """Get all chunks for a specific source (filtered by user)."""
-    ensure_index()
+    ensure_chunks_loaded()
     user, workspace_id, api_key_principal = await _resolve_auth_context(
         request,
         scopes=("read",),
@@ -3237,10 +4279,73 @@ async def get_source_chunks(request: Request, source_id: str):
     user_id = user.get("user_id") if user else None
     if api_key_principal and user_id is None:
         user_id = api_key_principal.user_id
-    chunks = get_chunks_by_source(CHUNKS, source_id, user_id=user_id, workspace_id=workspace_id)
-    return {"chunks": chunks, "count": len(chunks)}
+    # Resolve and filter the rows up front: once streaming starts the 200 is already sent.
+    snapshot, rows = _source_rows()
+    visible = [i for i in rows.get(source_id, ()) if _chunk_visible(snapshot[i], user_id, workspace_id)]
+    if not visible:
+        return {"chunks": [], "count": 0}
+    return StreamingResponse(_stream_source_chunks(snapshot, visible), media_type="application/json")
 api_v1.get("/sources/{source_id}/chunks")(get_source_chunks)
 
+SOURCE_CHUNKS_STREAM_BUFFER = 1 << 16
+
+
+def _stream_source_chunks(snapshot: List[Dict[str, Any]], rows: Sequence[int]):
+    """Yield ``{"chunks": [...], "count": n}`` piecewise so large sources never become one string.
+
+    ``rows`` must already be filtered for the caller; values JSON cannot encode
+    natively (e.g. DB timestamps) are stringified rather than aborting mid-body.
+    """
+    buf = bytearray(b'{"chunks":[')
+    for n, i in enumerate(rows):
+        if n:
+            buf += b","
+        if ORJSON_AVAILABLE:
+            buf += orjson.dumps(snapshot[i], default=str)
+        else:
+            buf += json.dumps(snapshot[i], ensure_ascii=False, default=str).encode("utf-8")
+        if len(buf) >= SOURCE_CHUNKS_STREAM_BUFFER:
+            yield bytes(buf)
+            buf.clear()
+    buf += b'],"count":%d}' % len(rows)
+    yield bytes(buf)
+
+def _drop_sources_from_index(source_ids: Sequence[str], workspace_id: Optional[str]) -> None:
+    """Remove deleted sources from the loaded CHUNKS/INDEX instead of reloading the chunks file.
+
+    Uses the same workspace rule as delete_source_chunks. Falls back to a full
+    reload on the next request when the in-memory index is not the one built
+    from CHUNKS (or nothing is loaded yet).
+    """
+    global INDEX, CHUNKS, CHUNK_ID_MAP
+    if INDEX is None or USE_DB_CHUNKS or INDEX.chunks is not CHUNKS:
+        INDEX = None
+        CHUNKS = []
+        _chunks_replaced()
+        return
+    drop = set(source_ids)
+    source_keys: Dict[Tuple[str, str], str] = {}
+    rows = []
+    for i, chunk in enumerate(CHUNKS):
+        source = chunk.get("source", {})
+        key = (source.get("type", ""), source.get("path") or source.get("url") or "")
+        source_id = source_keys.get(key)
+        if source_id is None:
+            source_id = source_keys[key] = _source_id(source)
+        if source_id not in drop:
+            continue
+        chunk_workspace_id = chunk.get("workspace_id")
+        if not workspace_id or chunk_workspace_id is None or chunk_workspace_id == workspace_id:
+            rows.append(i)
+    if not rows:
+        return
+    INDEX = INDEX.remove_rows(rows)
+    CHUNKS = INDEX.chunks
+    _chunks_replaced()
+    CHUNK_ID_MAP = {chunk.get("id"): chunk for chunk in CHUNKS if chunk.get("id")}
+    _refresh_rag_pipeline_index()
+
+
 @app.delete("/api/sources/{source_id}")
 async def delete_source(request: Request, source_id: str):
     """Delete a source and all its chunks."""
@@ -3253,16 +4358,74 @@ async def delete_source(request: Request, source_id: str):
     if api_key_principal and user_id is None:
         user_id = api_key_principal.user_id
 
-    global INDEX, CHUNKS
-    result = delete_source_chunks(CHUNKS_PATH, source_id, workspace_id=workspace_id)
-    INDEX = None
-    CHUNKS = []
-    global _chunk_count_cache, _chunk_count_stamp
-    _chunk_count_cache = None
-    _chunk_count_stamp = None
+    async with _get_chunk_write_lock():
+        result = await asyncio.to_thread(
+            delete_source_chunks, CHUNKS_PATH, source_id, workspace_id=workspace_id
+        )
+        if result.get("deleted"):
+            _drop_sources_from_index([source_id], workspace_id)
+            # The file was rewritten with exactly the kept chunks, one per line.
+            _set_chunk_count(int(result.get("kept", 0)))
     return result
 api_v1.delete("/sources/{source_id}")(delete_source)
 
+def _batch_delete_source_chunks(path: str, source_ids: Sequence[str], workspace_id: Optional[str] = None) -> Dict[str, Any]:
+    """Drop every chunk belonging to any of ``source_ids`` in one pass over the chunks file.
+
+    Mirrors ``delete_source_chunks`` (same workspace rule, backup before the
+    rewrite) but reads and rewrites the file once for the whole batch.
+    """
+    drop = set(source_ids)
+    # Chunks of one document share a source dict; hash each distinct source once.
+    source_keys: Dict[Tuple[str, str], str] = {}
+    tmp = path + ".tmp"
+    kept = 0
+    deleted = 0
+    try:
+        with open(path, "rb") as f, open(tmp, "wb", buffering=0) as g:
+            buf = bytearray()
+            for raw in f:
+                line = raw.strip()
+                if not line:
+                    continue
+                try:
+                    obj = orjson.loads(line) if ORJSON_AVAILABLE else json.loads(line)
+                except ValueError:
+                    continue
+                source = obj.get("source", {})
+                key = (source.get("type", ""), source.get("path") or source.get("url") or "")
+                source_id = source_keys.get(key)
+                if source_id is None:
+                    source_id = source_keys[key] = _source_id(source)
+                if source_id in drop:
+                    chunk_workspace_id = obj.get("workspace_id")
+                    if not workspace_id or chunk_workspace_id is None or chunk_workspace_id == workspace_id:
+                        deleted += 1
+                        continue
+                kept += 1
+                buf += line
+                buf += b"\n"
+                if len(buf) >= DEDUPE_WRITE_BUFFER:
+                    g.write(buf)
+                    buf.clear()
+            if buf:
+                g.write(buf)
+        if deleted:
+            # Snapshot current state before swapping so accidental data loss is recoverable.
+            try:
+                create_chunk_backup(path)
+            except ChunkBackupError as err:
+                raise IOError(f"Unable to create backup for {path}: {err}") from err
+            os.replace(tmp, path)
+    finally:
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        except OSError:
+            pass
+    return {"deleted": deleted, "kept": kept}
+
+
 @app.post(
     "/api/sources/batch_delete",
     summary="Batch delete multiple sources",
@@ -3277,24 +4440,28 @@ async def batch_delete_sources(request: Request, source_ids: List[str]):
         require=True,
     )
     
-    global INDEX, CHUNKS, _chunk_count_cache, _chunk_count_stamp
+    global INDEX, CHUNKS
     
     deleted_count = 0
     total_kept = 0
     
-    for source_id in source_ids:
-        try:
-            result = delete_source_chunks(CHUNKS_PATH, source_id, workspace_id=workspace_id)
-            deleted_count += 1
-            total_kept = result.get("kept", 0)
-        except Exception as e:
-            logger.error(f"Failed to delete source {source_id}: {e}")
-    
-    # Invalidate caches
-    INDEX = None
-    CHUNKS = []
-    _chunk_count_cache = None
-    _chunk_count_stamp = None
+    try:
+        async with _get_chunk_write_lock():
+            result = await asyncio.to_thread(
+                _batch_delete_source_chunks, CHUNKS_PATH, source_ids, workspace_id
+            )
+            if result["deleted"]:
+                _drop_sources_from_index(source_ids, workspace_id)
+                # The file was rewritten with exactly the kept chunks, one per line.
+                _set_chunk_count(result["kept"])
+        deleted_count = len(source_ids)
+        total_kept = result["kept"]
+    except Exception as e:
+        logger.error(f"Failed to delete sources {source_ids}: {e}")
+        # The file may or may not have been rewritten; reload it on next use.
+        INDEX = None
+        CHUNKS = []
+        _chunks_replaced()
     
     return {
         "deleted": deleted_count,
@@ -3307,7 +4474,7 @@ api_v1.post("/sources/batch_delete")(batch_delete_sources)
 @app.get("/api/sources/{source_id}/preview")
 async def get_source_preview(request: Request, source_id: str, limit: int = 3):
     """Get preview of a source (first few chunks, filtered by user)."""
-    ensure_index()
+    ensure_chunks_loaded()
     user, workspace_id, api_key_principal = await _resolve_auth_context(
         request,
         scopes=("read",),
@@ -3316,9 +4483,18 @@ async def get_source_preview(request: Request, source_id: str, limit: int = 3):
     user_id = user.get("user_id") if user else None
     if api_key_principal and user_id is None:
         user_id = api_key_principal.user_id
-    chunks = get_chunks_by_source(CHUNKS, source_id, user_id=user_id, workspace_id=workspace_id)
-    preview = chunks[:limit]
-    return {"preview": preview, "total_chunks": len(chunks)}
+    # Count visible chunks without building the full list; only the first `limit` are kept.
+    snapshot, rows = _source_rows()
+    preview: List[Dict[str, Any]] = []
+    total = 0
+    for i in rows.get(source_id, ()):
+        chunk = snapshot[i]
+        if not _chunk_visible(chunk, user_id, workspace_id):
+            continue
+        total += 1
+        if len(preview) < limit:
+            preview.append(chunk)
+    return {"preview": preview, "total_chunks": total}
 api_v1.get("/sources/{source_id}/preview")(get_source_preview)
 
 @app.get("/api/search")
@@ -3335,14 +4511,14 @@ async def search_source(request: Request, query: str, source_id: str = None, k:
         user_id = api_key_principal.user_id
     
     if source_id:
-        source_chunks = get_chunks_by_source(CHUNKS, source_id, user_id=user_id, workspace_id=workspace_id)
-        if not source_chunks:
+        # Score only this source's rows of the global index instead of indexing them again.
+        index = INDEX
+        _, source_rows = _source_rows(index.chunks)
+        rows = source_rows.get(source_id)
+        if not rows:
             return {"chunks": [], "scores": []}
-        temp_index = SimpleIndex(source_chunks)
-        ranked = temp_index.search(query, k=k, user_id=user_id, workspace_id=workspace_id)
-        # FIX 1: ranked returns (chunk_id, score), need to lookup chunks
-        chunk_id_to_chunk = {c.get("id"): c for c in source_chunks if c.get("id")}
-        results = [(chunk_id_to_chunk.get(chunk_id), score) for chunk_id, score in ranked if chunk_id in chunk_id_to_chunk]
+        ranked = index.search(query, k=k, user_id=user_id, workspace_id=workspace_id, rows=rows)
+        results = [(index.chunks[index.chunk_id_map[chunk_id]], score) for chunk_id, score in ranked if chunk_id in index.chunk_id_map]
     else:
         ranked = INDEX.search(query, k=k, user_id=user_id, workspace_id=workspace_id)
         # FIX 1: ranked returns (chunk_id, score), use CHUNK_ID_MAP
@@ -3369,6 +4545,7 @@ async def rebuild_index(request: Request):
             global INDEX, CHUNKS
             INDEX = None
             CHUNKS = []
+            _chunks_replaced()
             ensure_index()
             result = {"status": "rebuilt", "count": len(CHUNKS)}
             _log_event("index.rebuild.completed", count=result["count"], workspace_id=workspace_id)
@@ -3534,6 +4711,7 @@ async def delete_user(request: Request, user_id: str):
             "DELETE FROM users WHERE id = $1",
             (user_id,)
         )
+        _forget_auth_user(user_id)
         
         return {"message": "User deleted successfully"}
     except HTTPException:
@@ -3570,6 +4748,7 @@ async def update_user_role(request: Request, user_id: str, role: str = Form(...)
     updated_user = await USER_SERVICE.update_user_role(user_id, role)
     if not updated_user:
         raise HTTPException(status_code=404, detail="User not found")
+    _forget_auth_user(user_id)
     
     return {"user": updated_user, "message": f"User role updated to {role}"}
 api_v1.patch("/admin/users/{user_id}/role")(update_user_role)
@@ -3584,27 +4763,34 @@ async def admin_stats(request: Request):
     )
     require_admin(user, api_key_principal)
 
-    ensure_index()
+    ensure_chunks_loaded()
     
-    # Count chunks by user
-    user_chunks = {}
-    total_chunks = len(CHUNKS)
-    for chunk in CHUNKS:
-        uid = chunk.get('user_id', 'legacy')
-        user_chunks[uid] = user_chunks.get(uid, 0) + 1
-    
-    # Count sources
-    sources = get_unique_sources(CHUNKS)
+    total_chunks, user_chunks, total_sources = _admin_chunk_stats()
     
     return {
         "total_chunks": total_chunks,
         "chunks_by_user": user_chunks,
-        "total_sources": len(sources),
+        "total_sources": total_sources,
         "database_available": DB is not None,
         "auth_available": AUTH_AVAILABLE
     }
 api_v1.get("/admin/stats")(admin_stats)
 
+@app.post("/api/admin/cache/clear")
+async def clear_ingest_cache(request: Request):
+    """Purge cached YouTube transcripts so the next ingest refetches them (admin only)."""
+    user, _, api_key_principal = await _resolve_auth_context(
+        request,
+        scopes=("admin",),
+        require=True,
+    )
+    require_admin(user, api_key_principal)
+
+    removed = await asyncio.to_thread(clear_youtube_cache)
+    _log_event("admin.cache.cleared", cache="youtube_transcripts", removed=removed)
+    return {"cleared": removed}
+api_v1.post("/admin/cache/clear")(clear_ingest_cache)
+
 # ============================================================================
 # Second Brain Phase I: Workspace Management Endpoints
 # ============================================================================
@@ -3701,7 +4887,6 @@ async def create_workspace(request: Request):
         raise HTTPException(status_code=400, detail="Workspace name is required.")
     
     # Generate slug from name
-    import re
     slug = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
     
     # Create workspace
@@ -4182,6 +5367,13 @@ async def get_history_entry(request: Request, history_id: str):
 # Second Brain Phase I: Document Onboarding Endpoints
 # ============================================================================
 
+def _write_temp_text(content: str, suffix: str) -> str:
+    """Write ``content`` to a new temp file and return its path (caller deletes it)."""
+    with tempfile.NamedTemporaryFile(mode='w', suffix=suffix, delete=False, encoding='utf-8') as f:
+        f.write(content)
+        return f.name
+
+
 @api_v1.post("/workspaces/{workspace_id}/documents/paste")
 async def paste_document(request: Request, workspace_id: str):
     """Paste text content as a document for the workspace."""
@@ -4203,14 +5395,9 @@ async def paste_document(request: Request, workspace_id: str):
     if not title or not content:
         raise HTTPException(status_code=400, detail="Title and content are required.")
     
-    # Create a temporary file and ingest it using existing ingestion logic
-    import tempfile
-    import os
-    from raglite import ingest_docs
-    
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8') as f:
-        f.write(content)
-        temp_path = f.name
+    # Create a temporary file and ingest it using existing ingestion logic.
+    # The write happens in a worker thread so a large paste doesn't stall the loop.
+    temp_path = await asyncio.to_thread(_write_temp_text, content, ".txt")
     
     try:
         # Use existing synchronous ingestion function
@@ -4226,7 +5413,8 @@ async def paste_document(request: Request, workspace_id: str):
                 workspace_id=workspace_id
             )
         else:
-            result = ingest_docs(
+            result = await _run_legacy_ingest(
+                ingest_docs,
                 path=temp_path,
                 out_jsonl=CHUNKS_PATH,
                 language="en",
@@ -4335,6 +5523,17 @@ async def list_audit_events(request: Request, limit: int = 100):
     events = _read_audit_events(limit)
     return {"events": events}
 
+
+@api_v1.get("/admin/quota-debug")
+async def quota_debug(request: Request):
+    user, _, api_key_principal = await _resolve_auth_context(request, scopes=("admin",), require=True)
+    _require_admin_context(user, api_key_principal)
+    workspaces = [
+        {"workspace_id": workspace_id, **entry}
+        for workspace_id, entry in reversed(_quota_debug_snapshots.items())
+    ]
+    return {"workspaces": workspaces, "capacity": QUOTA_DEBUG_MAX_WORKSPACES}
+
 app.include_router(api_v1)
 api_v1.get("/admin/stats")(admin_stats)
 
@@ -4345,20 +5544,49 @@ def _read_audit_events(limit: int) -> List[Dict[str, Any]]:
         limit = max(1, min(limit, 500))
     except Exception:
         limit = 100
-    lines: deque[str] = deque(maxlen=limit)
-    with open(AUDIT_LOG_PATH, "r", encoding="utf-8") as f:
-        for line in f:
-            entry = line.strip()
-            if entry:
-                lines.append(entry)
     events: List[Dict[str, Any]] = []
-    for entry in lines:
+    for entry in _tail_lines(AUDIT_LOG_PATH, limit):
         try:
-            events.append(json.loads(entry))
-        except json.JSONDecodeError:
+            events.append(_parse_audit_line(entry))
+        except (json.JSONDecodeError, UnicodeDecodeError):
             continue
     return events
 
+
+AUDIT_TAIL_BLOCK = 1 << 16
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_audit_line(line: bytes) -> Dict[str, Any]:
+    """Decode one audit line; polling the tail re-reads the same lines, so remember them.
+
+    Callers only serialize the result, so sharing one dict between requests is safe.
+    """
+    return json.loads(line)
+
+
+def _tail_lines(path: str, n: int) -> List[bytes]:
+    """Return the last ``n`` non-empty lines of ``path`` (oldest first), reading backwards.
+
+    Only the blocks that hold those lines are read, so the cost tracks ``n``
+    rather than the size of the file.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        tail = b""
+        lines: List[bytes] = []
+        while pos > 0 and len(lines) < n:
+            step = min(AUDIT_TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            parts = (f.read(step) + tail).split(b"\n")
+            # Until the start of the file is reached the first piece may be a
+            # partial line; carry it into the next (earlier) block.
+            tail = parts.pop(0) if pos > 0 else b""
+            lines = [line.strip() for line in parts if line.strip()] + lines
+        return lines[-n:]
+
 async def _prepare_file_payloads(
     files: List[UploadFile],
     user: Optional[Dict[str, Any]],
@@ -4368,12 +5596,30 @@ async def _prepare_file_payloads(
     prepared: List[Dict[str, Any]] = []
     results: List[Dict[str, Any]] = []
     user_id = user.get("user_id") if user else None
+    auth_ctx = {"user_id": user_id, "workspace_id": workspace_id, "api_key": bool(api_key_principal)}
+
+    def _reject_oversize(filename: str, safe_name: str, size: int) -> None:
+        results.append(
+            {
+                "file": filename,
+                "error": f"File exceeds maximum size of {MAX_FILE_SIZE // (1024 * 1024)}MB",
+            }
+        )
+        _log_event(
+            "ingest.file.failed",
+            file=filename,
+            safe_name=safe_name,
+            reason="size_limit",
+            size=size,
+            **auth_ctx,
+        )
+        _record_ingest_event("file", "failure", 400)
 
     for upload in files:
         if upload is None or not upload.filename:
             continue
 
-        ext = Path(upload.filename).suffix.lower()
+        ext = _file_extension(upload.filename)
         if ext in BLOCKED_EXTENSIONS:
             results.append(
                 {
@@ -4386,9 +5632,7 @@ async def _prepare_file_payloads(
                 file=upload.filename,
                 reason="blocked_extension",
                 extension=ext or "",
-                user_id=user_id,
-                workspace_id=workspace_id,
-                api_key=bool(api_key_principal),
+                **auth_ctx,
             )
             _record_ingest_event("file", "skipped", 400)
             try:
@@ -4398,35 +5642,23 @@ async def _prepare_file_payloads(
             continue
 
         safe_name = generate_safe_filename(upload.filename)
+        path = UPLOAD_DIR / safe_name
         size = 0
-        content = bytearray()
+        if upload.size is not None and upload.size > MAX_FILE_SIZE:
+            # Size is already known from the multipart part; skip copying it to disk.
+            _reject_oversize(upload.filename, safe_name, upload.size)
+            try:
+                await upload.close()
+            except Exception:
+                pass
+            continue
         try:
-            while True:
-                chunk = await upload.read(8192)
-                if not chunk:
-                    break
-                size += len(chunk)
-                if size > MAX_FILE_SIZE:
-                    results.append(
-                        {
-                            "file": upload.filename,
-                            "error": f"File exceeds maximum size of {MAX_FILE_SIZE // (1024 * 1024)}MB",
-                        }
-                    )
-                    _log_event(
-                        "ingest.file.failed",
-                        file=upload.filename,
-                        safe_name=safe_name,
-                        reason="size_limit",
-                        size=size,
-                        user_id=user_id,
-                        workspace_id=workspace_id,
-                        api_key=bool(api_key_principal),
-                    )
-                    _record_ingest_event("file", "failure", 400)
-                    break
-                content.extend(chunk)
+            UPLOAD_DIR.mkdir(exist_ok=True)
+            size = await _stream_upload_to_disk(upload, path)
+            if size > MAX_FILE_SIZE:
+                _reject_oversize(upload.filename, safe_name, size)
         except Exception as exc:
+            path.unlink(missing_ok=True)
             results.append({"file": upload.filename, "error": f"Failed to read file: {exc}"})
             _log_event(
                 "ingest.file.failed",
@@ -4434,9 +5666,7 @@ async def _prepare_file_payloads(
                 safe_name=safe_name,
                 reason="read_error",
                 error=str(exc),
-                user_id=user_id,
-                workspace_id=workspace_id,
-                api_key=bool(api_key_principal),
+                **auth_ctx,
             )
             _record_ingest_event("file", "failure", 500)
             continue
@@ -4447,13 +5677,15 @@ async def _prepare_file_payloads(
                 pass
 
         if size > MAX_FILE_SIZE:
+            path.unlink(missing_ok=True)
             continue
 
         prepared.append(
             {
                 "file": upload.filename,
                 "safe_name": safe_name,
-                "content": bytes(content),
+                "path": str(path),
+                "size": size,
                 "extension": ext,
             }
         )
@@ -4461,6 +5693,53 @@ async def _prepare_file_payloads(
     return prepared, results
 
 
+try:
+    FILE_INGEST_CONCURRENCY = max(1, int(os.getenv("FILE_INGEST_CONCURRENCY", str(os.cpu_count() or 4))))
+except ValueError:
+    FILE_INGEST_CONCURRENCY = os.cpu_count() or 4
+
+
+async def _stream_upload_to_disk(upload: UploadFile, dest: Path) -> int:
+    """Copy an upload to ``dest`` in fixed-size chunks without buffering it in memory.
+
+    Stops as soon as the running total exceeds MAX_FILE_SIZE; the returned size is
+    then larger than the limit and the caller is responsible for removing ``dest``.
+    """
+    size = 0
+    if AIOFILES_AVAILABLE:
+        async with aiofiles.open(dest, "wb") as out_file:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    break
+                await out_file.write(chunk)
+        return size
+
+    out_file = await asyncio.to_thread(open, dest, "wb")
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > MAX_FILE_SIZE:
+                break
+            await asyncio.to_thread(out_file.write, chunk)
+    finally:
+        await asyncio.to_thread(out_file.close)
+    return size
+
+
+def _discard_staged_uploads(prepared_files: List[Dict[str, Any]]) -> None:
+    for payload in prepared_files:
+        staged = payload.get("path")
+        if staged:
+            Path(staged).unlink(missing_ok=True)
+
+
 async def _ingest_files_core(
     user: Optional[Dict[str, Any]],
     workspace_id: Optional[str],
@@ -4472,35 +5751,44 @@ async def _ingest_files_core(
     results: List[Dict[str, Any]] = list(initial_results or [])
     total = 0
     user_id = user.get("user_id") if user else None
+    # Request-wide log fields, shared by every per-file event and timer.
+    auth_ctx = {"user_id": user_id, "workspace_id": workspace_id, "api_key": bool(api_key_principal)}
 
-    await _consume_workspace_quota(workspace_id, request_delta=1)
-    current_chunk_total = await _count_workspace_chunks(workspace_id)
+    try:
+        _, current_chunk_total = await asyncio.gather(
+            _consume_workspace_quota(workspace_id, request_delta=1),
+            _count_workspace_chunks(workspace_id),
+        )
+    except Exception:
+        # Uploads are staged on disk before this point; don't orphan them when the
+        # request is rejected before any file is ingested.
+        _discard_staged_uploads(prepared_files)
+        raise
 
     UPLOAD_DIR.mkdir(exist_ok=True)
 
-    for payload in prepared_files:
+    semaphore = asyncio.Semaphore(FILE_INGEST_CONCURRENCY)
+
+    async def _process_file(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        async with semaphore:
+            return await _ingest_prepared_file(payload)
+
+    async def _ingest_prepared_file(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
         safe_name = payload["safe_name"]
         original = payload["file"]
-        ext = payload.get("extension") or Path(original).suffix.lower()
-        path = UPLOAD_DIR / safe_name
+        ext = payload.get("extension") or _file_extension(original)
+        path = Path(payload.get("path") or UPLOAD_DIR / safe_name)
 
-        try:
-            with open(path, "wb") as out_file:
-                out_file.write(payload["content"])
-        except Exception as exc:
-            results.append({"file": original, "error": f"Failed to save file: {exc}"})
+        if not path.exists():
             _log_event(
                 "ingest.file.failed",
                 file=original,
                 safe_name=safe_name,
-                reason="save_error",
-                error=str(exc),
-                user_id=user_id,
-                workspace_id=workspace_id,
-                api_key=bool(api_key_principal),
+                reason="missing_upload",
+                **auth_ctx,
             )
             _record_ingest_event("file", "failure", 500)
-            continue
+            return {"file": original, "error": "Uploaded file is no longer available on disk"}, 0
 
         lower = safe_name.lower()
         handler = "unknown"
@@ -4508,10 +5796,7 @@ async def _ingest_files_core(
         processing_outcome = "success"
         record: Dict[str, Any] = {}
         try:
-            with RequestTimer(
-                "ingest_file",
-                {"file": safe_name, "user_id": user_id, "workspace_id": workspace_id, "api_key": bool(api_key_principal)},
-            ):
+            with RequestTimer("ingest_file", {"file": safe_name, **auth_ctx}):
                 if USE_DB_CHUNKS:
                     # Database-backed ingestion
                     store = _get_vector_store()
@@ -4551,7 +5836,8 @@ async def _ingest_files_core(
                     # Legacy file-based ingestion
                     if lower.endswith((".vtt", ".srt")):
                         handler = "transcript"
-                        record = ingest_transcript(
+                        record = await _run_legacy_ingest(
+                            ingest_transcript,
                             str(path),
                             out_jsonl=CHUNKS_PATH,
                             language=language,
@@ -4561,7 +5847,8 @@ async def _ingest_files_core(
                     elif lower.endswith((".pdf", ".docx", ".md", ".markdown", ".txt",
                                           ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tiff", ".webp")):
                         handler = "docs"
-                        record = ingest_docs(
+                        record = await _run_legacy_ingest(
+                            ingest_docs,
                             str(path),
                             out_jsonl=CHUNKS_PATH,
                             language=language,
@@ -4571,7 +5858,8 @@ async def _ingest_files_core(
                     else:
                         # Try to ingest as text anyway (last resort)
                         handler = "text_fallback"
-                        record = ingest_docs(
+                        record = await _run_legacy_ingest(
+                            ingest_docs,
                             str(path),
                             out_jsonl=CHUNKS_PATH,
                             language=language,
@@ -4585,7 +5873,7 @@ async def _ingest_files_core(
             if record.get("error"):
                 processing_outcome = "failure"
         finally:
-            INGEST_LATENCY.labels(source="file", outcome=processing_outcome).observe(
+            _INGEST_LATENCY_CHILDREN["file", processing_outcome].observe(
                 max(time.perf_counter() - processing_start, 0.0)
             )
 
@@ -4597,8 +5885,6 @@ async def _ingest_files_core(
             result_entry.setdefault("note", "Processed with best-effort conversion. This extension is not formally supported yet.")
         if ext:
             result_entry["extension"] = ext
-        results.append(result_entry)
-        total += written_count
         status = "failed" if record.get("error") else "completed"
         _log_event(
             f"ingest.file.{status}",
@@ -4608,9 +5894,7 @@ async def _ingest_files_core(
             extension=ext,
             written=written_count,
             language=language,
-            user_id=user_id,
-            workspace_id=workspace_id,
-            api_key=bool(api_key_principal),
+            **auth_ctx,
             error=record.get("error"),
         )
         if record.get("error"):
@@ -4618,7 +5902,16 @@ async def _ingest_files_core(
         else:
             _record_ingest_event("file", "success", 200)
             if written_count:
-                INGEST_PROCESSED_CHUNKS.labels(source="file").inc(written_count)
+                _INGEST_PROCESSED_CHILDREN["file"].inc(written_count)
+        return result_entry, written_count
+
+    outcomes = await asyncio.gather(*(_process_file(payload) for payload in prepared_files), return_exceptions=True)
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            raise outcome
+    for result_entry, written_count in outcomes:
+        results.append(result_entry)
+        total += written_count
 
     if total > 0:
         await _consume_workspace_quota(
@@ -4626,9 +5919,6 @@ async def _ingest_files_core(
             chunk_delta=total,
             current_chunk_total=current_chunk_total,
         )
-    global _chunk_count_cache, _chunk_count_stamp
-    _chunk_count_cache = None
-    _chunk_count_stamp = None
     
     # Auto-rebuild index after ingestion
     if total > 0:
@@ -4641,6 +5931,7 @@ async def _ingest_files_core(
             global INDEX, CHUNKS
             INDEX = None
             CHUNKS = []
+            _chunks_replaced()
             try:
                 ensure_index(require=False)
                 logger.info(f"Index auto-rebuilt after ingestion ({total} chunks added)")
@@ -4,6 +4,7 @@ Setup database tables for workspace functionality.
 Run this to create all required tables.
 """
 import os
+import re
 import sys
 import asyncio
 
@@ -38,16 +39,25 @@ async def setup_tables():
         print(f"✓ Read schema file ({len(schema_sql)} bytes)")
         print(f"✓ Creating tables...")
         
-        # Split by statement and execute
-        statements = [s.strip() for s in schema_sql.split(';') if s.strip()]
-        
-        for i, stmt in enumerate(statements, 1):
-            if stmt.strip():
+        # Send the whole schema in one round trip (psycopg accepts several
+        # statements per execute when there are no parameters). This also keeps
+        # the plpgsql function bodies intact, which a naive split on ';' breaks.
+        try:
+            await db.execute(schema_sql)
+            for table_name in re.findall(r"CREATE TABLE(?: IF NOT EXISTS)?\s+(\w+)", schema_sql):
+                print(f"  ✓ Created table: {table_name}")
+        except Exception as e:
+            # One bad statement rolls back the whole script; fall back to applying
+            # statements individually so the rest of the schema still lands.
+            print(f"  ⚠️  Schema script failed ({str(e)[:100]}); applying statements one by one")
+            statements = [s.strip() for s in schema_sql.split(';') if s.strip()]
+            
+            for i, stmt in enumerate(statements, 1):
                 try:
                     await db.execute(stmt)
                     # Only print table creation statements
                     if 'CREATE TABLE' in stmt:
-                        table_name = stmt.split('CREATE TABLE')[1].split('(')[0].strip().split()[0]
+                        table_name = stmt.split('CREATE TABLE')[1].split('(')[0].strip().split()[-1]
                         print(f"  ✓ Created table: {table_name}")
                 except Exception as e:
                     # Ignore "already exists" errors
@@ -67,9 +77,26 @@ async def setup_tables():
             'user_organizations'
         ]
         
+        # One catalog lookup instead of a COUNT(*) scan per table; row counts are
+        # the planner's estimate (-1 until the table has been analyzed).
+        rows = await db.fetch_all(
+            """
+            SELECT relname, reltuples::bigint AS approx
+            FROM pg_class
+            WHERE relname = ANY($1::text[]) AND relkind IN ('r', 'p') AND pg_table_is_visible(oid)
+            """,
+            (required_tables,),
+        )
+        found = {row['relname']: row['approx'] for row in rows}
+        missing = [table for table in required_tables if table not in found]
         for table in required_tables:
-            count = await db.fetch_one(f"SELECT COUNT(*) as cnt FROM {table}")
-            print(f"  ✓ {table}: {count['cnt']} rows")
+            if table in found:
+                approx = found[table]
+                estimate = f"~{approx} rows (estimate)" if approx >= 0 else "not analyzed yet"
+                print(f"  ✓ {table}: {estimate}")
+        if missing:
+            print(f"\n❌ Missing tables: {', '.join(missing)}")
+            sys.exit(1)
         
         print(f"\n🎉 All done! You can now create workspaces.")
         
@@ -18,6 +18,63 @@ except:
     MODEL_SERVICE = None
     print("❌ No LLM service - will give generic responses")
 
+# Keyword fallbacks used when no LLM is available; built once, already stripped.
+_AI_OS_ANSWER = """Based on your query about AI operating systems, here are key strategic recommendations:
+
+1. **Core Operating Principles** (5-7 bullets):
+   - Focus on measurable outcomes, not just features
+   - Bias toward action over analysis 
+   - Minimize assumptions, maximize validation
+   - Build for your constraints (time, energy, money)
+
+2. **Alien Probe Report Project** - Next Actions:
+   - Define success metrics upfront
+   - Create minimum viable version first  
+   - Test core assumptions before building more
+   - Set clear boundaries on scope and timeline
+
+3. **This Week's Priority Actions**:
+   - Pick ONE core feature to validate
+   - Set 48-hour experiment to test it
+   - Get real user feedback (not hypothetical)
+
+The key is moving from planning to testing. Build the smallest version that proves or disproves your core hypothesis."""
+
+_ALIEN_ANSWER = """For the Alien Probe Report project, focus on these concrete next steps:
+
+**Immediate Actions (This Week):**
+1. Define what "success" looks like in measurable terms
+2. Build the simplest version that tests your core assumption
+3. Find 3 real potential users and get their feedback
+
+**Project Scoping:**
+- What's the ONE thing this must do well?
+- What's the minimum viable test of that thing?
+- How will you measure if it works?
+
+**Resource Management:**
+Given your time/energy constraints, aim for 80% solution that ships versus 100% solution that doesn't. 
+
+The goal is validation, not perfection. Ship something small that works rather than something perfect that never launches."""
+
+_GENERIC_ANSWER_TEMPLATE = """I understand you're asking about: {query}
+
+While I don't have access to your specific documents right now, I can provide strategic guidance:
+
+**Key Principles:**
+- Focus on measurable outcomes
+- Test assumptions quickly and cheaply  
+- Build for your actual constraints
+- Ship iteratively, improve continuously
+
+**For your current situation:**
+- Define success metrics first
+- Build minimum viable version
+- Get real user feedback early
+- Avoid perfectionism paralysis
+
+What specific aspect would you like me to elaborate on? I can provide more targeted advice on strategy, execution, or specific challenges you're facing."""
+
 app = FastAPI(title="Simple RAG - ACTUALLY WORKS")
 
 # Serve the frontend
@@ -80,72 +137,15 @@ async def ask_simple(query: str = Form(...), k: int = Form(8)):
     
     # Fallback: Give useful generic response based on keywords
     query_lower = query.lower()
-    
     if "operating system" in query_lower or "ai os" in query_lower:
-        answer = """
-Based on your query about AI operating systems, here are key strategic recommendations:
-
-1. **Core Operating Principles** (5-7 bullets):
-   - Focus on measurable outcomes, not just features
-   - Bias toward action over analysis 
-   - Minimize assumptions, maximize validation
-   - Build for your constraints (time, energy, money)
-
-2. **Alien Probe Report Project** - Next Actions:
-   - Define success metrics upfront
-   - Create minimum viable version first  
-   - Test core assumptions before building more
-   - Set clear boundaries on scope and timeline
-
-3. **This Week's Priority Actions**:
-   - Pick ONE core feature to validate
-   - Set 48-hour experiment to test it
-   - Get real user feedback (not hypothetical)
-
-The key is moving from planning to testing. Build the smallest version that proves or disproves your core hypothesis.
-        """
+        answer = _AI_OS_ANSWER
     elif "project" in query_lower and "alien" in query_lower:
-        answer = """
-For the Alien Probe Report project, focus on these concrete next steps:
-
-**Immediate Actions (This Week):**
-1. Define what "success" looks like in measurable terms
-2. Build the simplest version that tests your core assumption
-3. Find 3 real potential users and get their feedback
-
-**Project Scoping:**
-- What's the ONE thing this must do well?
-- What's the minimum viable test of that thing?
-- How will you measure if it works?
-
-**Resource Management:**
-Given your time/energy constraints, aim for 80% solution that ships versus 100% solution that doesn't. 
-
-The goal is validation, not perfection. Ship something small that works rather than something perfect that never launches.
-        """
+        answer = _ALIEN_ANSWER
     else:
-        answer = f"""
-I understand you're asking about: {query}
-
-While I don't have access to your specific documents right now, I can provide strategic guidance:
-
-**Key Principles:**
-- Focus on measurable outcomes
-- Test assumptions quickly and cheaply  
-- Build for your actual constraints
-- Ship iteratively, improve continuously
-
-**For your current situation:**
-- Define success metrics first
-- Build minimum viable version
-- Get real user feedback early
-- Avoid perfectionism paralysis
+        answer = _GENERIC_ANSWER_TEMPLATE.format(query=query)
 
-What specific aspect would you like me to elaborate on? I can provide more targeted advice on strategy, execution, or specific challenges you're facing.
-        """
-    
     return {
-        "answer": answer.strip(),
+        "answer": answer,
         "citations": [],
         "score": 75.0,
         "count": 0,
@@ -29,7 +29,8 @@ logger = logging.getLogger(__name__)
 _TRACING_CONFIGURED = False
 
 
-def _is_enabled() -> bool:
+def is_tracing_enabled() -> bool:
+    """Return True when tracing is requested via OTEL_ENABLED and OpenTelemetry is installed."""
     return _OTEL_AVAILABLE and os.getenv("OTEL_ENABLED", "").lower() in {"1", "true", "yes"}
 
 
@@ -38,7 +39,7 @@ def setup_tracing(app: FastAPI) -> None:
     Configure OpenTelemetry tracing/logging if enabled via environment.
     """
     global _TRACING_CONFIGURED
-    if _TRACING_CONFIGURED or not _is_enabled():
+    if _TRACING_CONFIGURED or not is_tracing_enabled():
         return
     if not _OTEL_AVAILABLE:
         logger.warning("OpenTelemetry packages not installed; skipping tracing setup.")
@@ -235,11 +235,15 @@ async def test_resolve_auth_context_falls_back_to_jwt(monkeypatch):
         return {"user_id": "jwt-user", "role": "admin"}
 
     async def fake_primary_workspace(user):
-        return "jwt-workspace"
+        return "jwt-workspace", "jwt-org"
+
+    async def no_org_lookup(workspace_id):
+        raise AssertionError("organization should come from the primary workspace row")
 
     monkeypatch.setattr(server, "get_api_key_principal", fake_get_api_key_principal)
     monkeypatch.setattr(server, "get_current_user", fake_get_current_user)
-    monkeypatch.setattr(server, "_get_primary_workspace_id_for_user", fake_primary_workspace)
+    monkeypatch.setattr(server, "_get_primary_workspace_for_user", fake_primary_workspace)
+    monkeypatch.setattr(server, "_get_organization_id_for_workspace", no_org_lookup)
 
     user, workspace_id, principal = await server._resolve_auth_context(build_request({}), scopes=("read",))
 
@@ -248,10 +252,60 @@ async def test_resolve_auth_context_falls_back_to_jwt(monkeypatch):
     assert workspace_id == "jwt-workspace"
 
 
+@pytest.mark.asyncio
+async def test_resolve_auth_context_caches_session_user_lookups(monkeypatch):
+    calls = {"user": 0, "workspace": 0}
+
+    async def fake_get_api_key_principal(request, scopes=("read",), required=False):
+        return None
+
+    def fake_get_current_user(request):
+        return {"user_id": "jwt-user", "role": "reader"}
+
+    class FakeUserService:
+        async def get_user_by_id(self, user_id: str):
+            calls["user"] += 1
+            return {"user_id": user_id, "role": "admin", "email": "jwt@example.com"}
+
+    async def fake_primary_workspace(user):
+        calls["workspace"] += 1
+        return "jwt-workspace", "jwt-org"
+
+    monkeypatch.setattr(server, "get_api_key_principal", fake_get_api_key_principal)
+    monkeypatch.setattr(server, "get_current_user", fake_get_current_user)
+    monkeypatch.setattr(server, "USER_SERVICE", FakeUserService())
+    monkeypatch.setattr(server, "_get_primary_workspace_for_user", fake_primary_workspace)
+    monkeypatch.setattr(server, "AUTH_USER_CACHE_TTL", 30.0)
+
+    for _ in range(3):
+        user, workspace_id, _ = await server._resolve_auth_context(build_request({}), scopes=("read",))
+        assert user["role"] == "admin"
+        assert user["email"] == "jwt@example.com"
+        assert workspace_id == "jwt-workspace"
+    assert calls == {"user": 1, "workspace": 1}
+
+    server._forget_auth_user("jwt-user")
+    await server._resolve_auth_context(build_request({}), scopes=("read",))
+    assert calls == {"user": 2, "workspace": 2}
+
+
 @pytest.fixture(autouse=True)
 def reset_service():
     # Ensure each test runs with clean configuration.
     configure_api_key_auth(None)
+    server._auth_user_cache.clear()
     yield
     configure_api_key_auth(None)
+    server._auth_user_cache.clear()
+
+
+def test_api_key_principal_normalizes_scopes_to_frozenset():
+    principal = APIKeyPrincipal(
+        key_id="key-1",
+        user_id="user-1",
+        workspace_id=None,
+        scopes=["read", "admin", "read"],
+    )
 
+    assert principal.scopes == frozenset({"read", "admin"})
+    server.require_admin(None, principal)
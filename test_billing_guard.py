@@ -9,16 +9,20 @@ import server
 class FakeDB:
     def __init__(self, row):
         self.row = row
+        self.calls = 0
 
     async def fetch_one(self, query, params):
+        self.calls += 1
         return self.row
 
 
 @pytest.fixture(autouse=True)
 def reset_db():
     original = server.DB
+    server._invalidate_billing_cache()
     yield
     server.DB = original
+    server._invalidate_billing_cache()
 
 
 @pytest.mark.asyncio
@@ -77,3 +81,18 @@ async def test_require_billing_active_rejects_expired_subscription():
         await server._require_billing_active("ws-1")
     assert exc.value.status_code == 402
 
+
+@pytest.mark.asyncio
+async def test_require_billing_active_reuses_cached_row_until_invalidated():
+    db = FakeDB({"billing_status": "active", "trial_ends_at": None, "subscription_expires_at": None})
+    server.DB = db
+    await server._require_billing_active("ws-1")
+    await server._require_billing_active("ws-1")
+    assert db.calls == 1
+
+    db.row = {"billing_status": "canceled", "trial_ends_at": None, "subscription_expires_at": None}
+    server._invalidate_billing_cache()
+    with pytest.raises(HTTPException) as exc:
+        await server._require_billing_active("ws-1")
+    assert exc.value.status_code == 402
+    assert db.calls == 2
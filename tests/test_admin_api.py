@@ -77,3 +77,43 @@ async def test_admin_billing_patch(monkeypatch, client):
     assert resp.status_code == 200
     assert resp.json()["organization"]["plan"] == "enterprise"
 
+
+def test_billing_update_query_numbers_params_per_column_set():
+    query = server._billing_update_query(("plan", "trial_ends_at"))
+
+    assert "SET plan = $1, trial_ends_at = $2, billing_updated_at = NOW()" in query
+    assert "WHERE id = $3" in query
+    assert server._billing_update_query(("plan", "trial_ends_at")) is query
+
+
+
+def test_admin_cache_clear(monkeypatch, client):
+    async def fake_resolve(request, scopes=("read",), require=True):
+        return {"user_id": "admin", "role": "admin"}, None, None
+
+    monkeypatch.setattr(server, "_resolve_auth_context", fake_resolve)
+    monkeypatch.setattr(server, "clear_youtube_cache", lambda: 3)
+
+    resp = client.post("/api/v1/admin/cache/clear")
+    assert resp.status_code == 200
+    assert resp.json() == {"cleared": 3}
+
+
+def test_admin_quota_debug_lists_recent_workspaces(monkeypatch, client):
+    async def fake_resolve(request, scopes=("read",), require=True):
+        return {"user_id": "admin", "role": "admin"}, None, None
+
+    monkeypatch.setattr(server, "_resolve_auth_context", fake_resolve)
+    monkeypatch.setattr(server, "QUOTA_DEBUG_MAX_WORKSPACES", 2)
+    monkeypatch.setattr(server, "_quota_debug_snapshots", server.OrderedDict())
+
+    settings = {"request_limit_per_day": 10, "request_limit_per_minute": 5, "chunk_limit": 100}
+    for workspace_id in ("ws-1", "ws-2", "ws-3"):
+        server._quota_metrics_hook(workspace_id, settings, {"request_count": 5, "current_chunk_total": 20})
+
+    resp = client.get("/api/v1/admin/quota-debug")
+    assert resp.status_code == 200
+    workspaces = resp.json()["workspaces"]
+    assert [entry["workspace_id"] for entry in workspaces] == ["ws-3", "ws-2"]
+    assert workspaces[0]["ratios"]["requests_per_day"] == 0.5
+    assert workspaces[0]["usage"]["chunk_total"] == 20
@@ -0,0 +1,70 @@
+import logging
+
+import server
+
+
+def test_ask_event_aggregator_emits_one_summary_per_key(monkeypatch):
+    events = []
+    monkeypatch.setattr(server, "_log_event", lambda event, **fields: events.append((event, fields)))
+
+    aggregator = server.AskEventAggregator()
+    aggregator.record("user-1", "ws-1", 10.0, 3)
+    aggregator.record("user-1", "ws-1", 30.0, 5)
+    aggregator.record("user-2", None, 5.0, 0)
+    aggregator.flush()
+
+    assert [name for name, _ in events] == ["ask.summary", "ask.summary"]
+    by_user = {fields["user_id"]: fields for _, fields in events}
+    assert by_user["user-1"]["requests"] == 2
+    assert by_user["user-1"]["avg_ms"] == 20.0
+    assert by_user["user-1"]["max_ms"] == 30.0
+    assert by_user["user-1"]["result_count"] == 8
+    assert by_user["user-2"]["requests"] == 1
+
+    events.clear()
+    aggregator.flush()
+    assert events == []
+
+
+def test_request_timer_logs_duration_outside_event_loop(caplog):
+    with caplog.at_level("INFO", logger="rag"):
+        with server.RequestTimer("unit_test", {"file": "a.txt"}):
+            pass
+
+    record = next(r for r in caplog.records if r.getMessage() == "request_duration")
+    assert record.operation == "unit_test"
+    assert record.file == "a.txt"
+    assert 0 <= record.duration_ms < 1000
+
+
+def test_record_ask_event_reuses_bound_children():
+    server._record_ask_event("success", 200, 0.05)
+    counter = server._ASK_COUNTER_CHILDREN[("success", 200)]
+    latency = server._ASK_LATENCY_CHILDREN["success"]
+    server._record_ask_event("success", 200, 0.05)
+
+    assert server._ASK_COUNTER_CHILDREN[("success", 200)] is counter
+    assert server._ASK_LATENCY_CHILDREN["success"] is latency
+    assert counter is server.ASK_REQUEST_COUNTER.labels(outcome="success", status_code="200")
+
+
+def test_audit_event_keeps_request_context_without_operational_log(monkeypatch, caplog):
+    records = []
+
+    class Capture(logging.Handler):
+        def emit(self, record):
+            records.append(record)
+
+    handler = Capture()
+    server.AUDIT_LOGGER.addHandler(handler)
+    monkeypatch.setattr(server, "get_request_id", lambda: "req-123")
+    try:
+        with caplog.at_level("INFO", logger="rag"):
+            server._audit_event("ask.completed", user_id="user-1", query="hello", k=4)
+    finally:
+        server.AUDIT_LOGGER.removeHandler(handler)
+
+    assert [r.getMessage() for r in records] == ["ask.completed"]
+    assert records[0].request_id == "req-123"
+    assert records[0].query == "hello"
+    assert not [r for r in caplog.records if r.name == "rag"]
@@ -31,3 +31,31 @@ def test_audit_endpoint_returns_events(monkeypatch):
         body = resp.json()
         events = body.get("events", [])
         assert any(event.get("event") == "test.audit" and event.get("marker") == marker for event in events)
+
+
+def test_tail_lines_reads_only_the_end_across_block_boundaries(monkeypatch, tmp_path):
+    log = tmp_path / "audit.log"
+    lines = [f'{{"event": "e{i}", "pad": "{"x" * (i % 7)}"}}' for i in range(50)]
+    log.write_text("\n".join(lines[:30]) + "\n\n" + "\n".join(lines[30:]) + "\n", encoding="utf-8")
+    monkeypatch.setattr(server, "AUDIT_TAIL_BLOCK", 16)
+
+    assert server._tail_lines(str(log), 5) == [line.encode() for line in lines[-5:]]
+    assert server._tail_lines(str(log), 500) == [line.encode() for line in lines]
+
+    monkeypatch.setattr(server, "AUDIT_LOG_PATH", str(log))
+    events = server._read_audit_events(3)
+    assert [event["event"] for event in events] == ["e47", "e48", "e49"]
+
+
+def test_read_audit_events_reuses_parsed_lines(monkeypatch, tmp_path):
+    log = tmp_path / "audit.log"
+    log.write_text('{"event": "a"}\nnot json\n{"event": "b"}\n', encoding="utf-8")
+    monkeypatch.setattr(server, "AUDIT_LOG_PATH", str(log))
+    server._parse_audit_line.cache_clear()
+
+    first = server._read_audit_events(10)
+    second = server._read_audit_events(10)
+
+    assert [event["event"] for event in first] == ["a", "b"]
+    assert second[0] is first[0]
+    assert server._parse_audit_line.cache_info().hits == 2
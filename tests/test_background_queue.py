@@ -41,3 +41,26 @@ async def test_background_queue_records_failures():
     assert stored.error == "boom"
     assert stored.result is None
     await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_background_queue_stop_cancels_jobs_that_never_ran():
+    queue = BackgroundTaskQueue()
+    await queue.start()
+    release = asyncio.Event()
+    cancelled = []
+
+    async def blocker():
+        await release.wait()
+
+    async def never_runs():
+        raise AssertionError("should not run")
+
+    running = queue.submit("demo", blocker, on_cancel=lambda: cancelled.append("running"))
+    waiting = queue.submit("demo", never_runs, on_cancel=lambda: cancelled.append("waiting"))
+    await asyncio.sleep(0)
+    await queue.stop()
+
+    assert cancelled == ["waiting"]
+    assert queue.get_job(running.id).status == "cancelled"
+    assert queue.get_job(waiting.id).status == "cancelled"
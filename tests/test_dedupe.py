@@ -0,0 +1,76 @@
+import asyncio
+import json
+
+import pytest
+
+import server
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dedupe_chunks_keeps_first_occurrence_verbatim(monkeypatch, tmp_path, use_orjson):
+    if use_orjson and not server.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    chunks_path = tmp_path / "chunks.jsonl"
+    lines = [
+        '{"id": "a", "content": "caf\\u00e9"}',
+        '{"id": "a", "content": "duplicate"}',
+        "",
+        "not json",
+        '{"content": "no id", "source": {"type": "doc"}}',
+        '{"source": {"type": "doc"}, "content": "no id"}',
+        '{"id": "b", "content": "second"}',
+    ]
+    chunks_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    monkeypatch.setattr(server, "ORJSON_AVAILABLE", use_orjson)
+    monkeypatch.setattr(server, "CHUNKS_PATH", str(chunks_path))
+    monkeypatch.setattr(server, "create_chunk_backup", lambda path: None)
+    monkeypatch.setattr(server, "_log_event", lambda *args, **kwargs: None)
+
+    result = server._dedupe_chunks_sync()
+
+    assert result["total_before"] == 6
+    assert result["kept"] == 3
+    kept = chunks_path.read_text(encoding="utf-8").splitlines()
+    assert kept == [lines[0], lines[4], lines[6]]
+    assert [json.loads(line).get("id") for line in kept] == ["a", None, "b"]
+
+
+def test_dedupe_chunks_flushes_buffer_in_blocks(monkeypatch, tmp_path):
+    chunks_path = tmp_path / "chunks.jsonl"
+    lines = [json.dumps({"id": f"chunk-{i}", "content": "x" * 50}) for i in range(200)]
+    chunks_path.write_text("\n".join(lines + lines[:20]) + "\n", encoding="utf-8")
+
+    monkeypatch.setattr(server, "DEDUPE_WRITE_BUFFER", 256)
+    monkeypatch.setattr(server, "CHUNKS_PATH", str(chunks_path))
+    monkeypatch.setattr(server, "create_chunk_backup", lambda path: None)
+    monkeypatch.setattr(server, "_log_event", lambda *args, **kwargs: None)
+
+    result = server._dedupe_chunks_sync()
+
+    assert result["kept"] == 200
+    assert chunks_path.read_text(encoding="utf-8").splitlines() == lines
+
+
+def test_dedupe_job_waits_for_the_chunk_write_lock(monkeypatch):
+    calls = []
+
+    def fake_dedupe():
+        calls.append("dedupe")
+        return {"kept": 1, "total_before": 1, "count": 1}
+
+    monkeypatch.setattr(server, "DB", None)
+    monkeypatch.setattr(server, "_dedupe_chunks_sync", fake_dedupe)
+    monkeypatch.setattr(server, "_chunk_write_lock", None)
+
+    async def run():
+        async with server._get_chunk_write_lock():
+            job = asyncio.create_task(server._run_dedupe_job())
+            await asyncio.sleep(0.05)
+            assert calls == []
+        return await job
+
+    result = asyncio.run(run())
+
+    assert calls == ["dedupe"]
+    assert result["total_kept"] == 1
@@ -0,0 +1,291 @@
+import asyncio
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+def test_ingest_files_core_discards_staged_uploads_when_quota_rejects(monkeypatch, tmp_path):
+    staged = tmp_path / "staged.txt"
+    staged.write_text("hello")
+
+    async def over_quota(*args, **kwargs):
+        raise HTTPException(status_code=429, detail="Workspace quota exceeded")
+
+    monkeypatch.setattr(server, "_consume_workspace_quota", over_quota)
+
+    prepared = [{"file": "doc.txt", "safe_name": "staged.txt", "path": str(staged), "size": 5, "extension": ".txt"}]
+    with pytest.raises(HTTPException):
+        asyncio.run(server._ingest_files_core({"user_id": "tester"}, "ws-1", None, prepared, "en"))
+
+    assert not staged.exists()
+
+
+def test_ingest_files_core_processes_files_concurrently_and_keeps_order(monkeypatch, tmp_path):
+    active = 0
+    peak = 0
+
+    async def fake_run_legacy_ingest(func, path, **kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        return {"written": 1, "path": path}
+
+    async def no_quota(*args, **kwargs):
+        return None
+
+    async def no_chunks(workspace_id):
+        return 0
+
+    monkeypatch.setattr(server, "USE_DB_CHUNKS", False)
+    monkeypatch.setattr(server, "FILE_INGEST_CONCURRENCY", 2)
+    monkeypatch.setattr(server, "_run_legacy_ingest", fake_run_legacy_ingest)
+    monkeypatch.setattr(server, "_consume_workspace_quota", no_quota)
+    monkeypatch.setattr(server, "_count_workspace_chunks", no_chunks)
+    monkeypatch.setattr(server, "ensure_index", lambda require=False: None)
+
+    prepared = []
+    for name in ("a.txt", "b.md", "c.txt"):
+        staged = tmp_path / name
+        staged.write_text("hello")
+        prepared.append({"file": name, "safe_name": name, "path": str(staged), "size": 5, "extension": staged.suffix})
+    prepared.append({"file": "gone.txt", "safe_name": "gone.txt", "path": str(tmp_path / "gone.txt"), "size": 5, "extension": ".txt"})
+
+    result = asyncio.run(server._ingest_files_core({"user_id": "tester"}, "ws-1", None, prepared, "en"))
+
+    assert [entry["file"] for entry in result["results"]] == ["a.txt", "b.md", "c.txt", "gone.txt"]
+    assert "error" in result["results"][3]
+    assert result["total_written"] == 3
+    assert peak == 2
+
+
+def test_legacy_ingest_advances_cached_chunk_count(monkeypatch, tmp_path):
+    chunks_path = tmp_path / "chunks.jsonl"
+    chunks_path.write_text('{"id": "a"}\n{"id": "b"}\n', encoding="utf-8")
+
+    def fake_ingest(path, out_jsonl, **kwargs):
+        with open(out_jsonl, "a", encoding="utf-8") as f:
+            f.write('{"id": "c"}\n{"id": "d"}\n{"id": "e"}\n')
+        return {"written": 3, "path": path}
+
+    monkeypatch.setattr(server, "USE_DB_CHUNKS", False)
+    monkeypatch.setattr(server, "INGEST_POOL", None)
+    monkeypatch.setattr(server, "CHUNKS_PATH", str(chunks_path))
+    monkeypatch.setattr(server, "_chunk_count_cache", None)
+    monkeypatch.setattr(server, "_chunk_count_stamp", None)
+    monkeypatch.setattr(server, "_chunk_write_lock", None)
+
+    assert server._count_lines(str(chunks_path)) == 2
+    asyncio.run(server._run_legacy_ingest(fake_ingest, "doc.txt", out_jsonl=str(chunks_path)))
+
+    assert server._chunk_count_cache == 5
+    assert server._chunk_count_is_current()
+    assert server._count_lines(str(chunks_path)) == 5
+
+
+def test_legacy_ingests_parse_concurrently_and_append_under_the_lock(monkeypatch, tmp_path):
+    chunks_path = tmp_path / "chunks.jsonl"
+    chunks_path.write_text('{"id": "a"}\n', encoding="utf-8")
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fake_ingest(path, out_jsonl, **kwargs):
+        nonlocal active, peak
+        assert out_jsonl != str(chunks_path)
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        with open(out_jsonl, "a", encoding="utf-8") as f:
+            f.write(f'{{"id": "{path}"}}\n')
+        return {"written": 1, "path": out_jsonl}
+
+    monkeypatch.setattr(server, "USE_DB_CHUNKS", False)
+    monkeypatch.setattr(server, "INGEST_POOL", None)
+    monkeypatch.setattr(server, "CHUNKS_PATH", str(chunks_path))
+    monkeypatch.setattr(server, "_chunk_write_lock", None)
+
+    async def run():
+        return await asyncio.gather(
+            server._run_legacy_ingest(fake_ingest, "b", out_jsonl=str(chunks_path)),
+            server._run_legacy_ingest(fake_ingest, "c", out_jsonl=str(chunks_path)),
+        )
+
+    results = asyncio.run(run())
+
+    assert peak == 2
+    assert [r["path"] for r in results] == [str(chunks_path)] * 2
+    lines = chunks_path.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == '{"id": "a"}'
+    assert sorted(lines[1:]) == ['{"id": "b"}', '{"id": "c"}']
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith(".ingest-")] == []
+
+
+def test_legacy_ingest_creates_missing_output_directory(monkeypatch, tmp_path):
+    chunks_path = tmp_path / "out" / "chunks.jsonl"
+
+    def fake_ingest(path, out_jsonl, **kwargs):
+        with open(out_jsonl, "a", encoding="utf-8") as f:
+            f.write('{"id": "a"}\n')
+        return {"written": 1, "path": out_jsonl}
+
+    monkeypatch.setattr(server, "USE_DB_CHUNKS", False)
+    monkeypatch.setattr(server, "INGEST_POOL", None)
+    monkeypatch.setattr(server, "CHUNKS_PATH", str(chunks_path))
+    monkeypatch.setattr(server, "_chunk_write_lock", None)
+
+    result = asyncio.run(server._run_legacy_ingest(fake_ingest, "doc.txt", out_jsonl=str(chunks_path)))
+
+    assert result["path"] == str(chunks_path)
+    assert chunks_path.read_text(encoding="utf-8") == '{"id": "a"}\n'
+
+
+def test_chunk_count_sidecar_survives_restart_and_ignores_stale_counts(monkeypatch, tmp_path):
+    chunks_path = tmp_path / "chunks.jsonl"
+    chunks_path.write_text('{"id": "a"}\n{"id": "b"}\n', encoding="utf-8")
+
+    monkeypatch.setattr(server, "USE_DB_CHUNKS", False)
+    monkeypatch.setattr(server, "CHUNKS_PATH", str(chunks_path))
+    monkeypatch.setattr(server, "_chunk_count_cache", None)
+    monkeypatch.setattr(server, "_chunk_count_stamp", None)
+    server._set_chunk_count(2)
+
+    # A fresh process has no in-memory count but must not rescan the file.
+    monkeypatch.setattr(server, "_chunk_count_cache", None)
+    monkeypatch.setattr(server, "_chunk_count_stamp", None)
+    real_count_newlines = server._count_newlines
+
+    def no_rescan(path):
+        raise AssertionError("sidecar count should have been used")
+
+    monkeypatch.setattr(server, "_count_newlines", no_rescan)
+    assert server._count_lines(str(chunks_path)) == 2
+
+    # Rewriting the file outside the ingest path invalidates the sidecar.
+    chunks_path.write_text('{"id": "a"}\n{"id": "b"}\n{"id": "c"}\n', encoding="utf-8")
+    os.utime(chunks_path, ns=(0, 1))
+    monkeypatch.setattr(server, "_count_newlines", real_count_newlines)
+    assert server._count_lines(str(chunks_path)) == 3
+
+
+def test_count_newlines_matches_text_iteration(tmp_path):
+    for content in ("", "a\n", "a\nb", "a\n\nb\n", "x" * 10 + "\n"):
+        path = tmp_path / "chunks.jsonl"
+        path.write_text(content, encoding="utf-8")
+        with open(path, "r", encoding="utf-8") as f:
+            expected = sum(1 for _ in f)
+        assert server._count_newlines(str(path)) == expected
+
+
+def test_prepare_file_payloads_rejects_known_oversize_without_copying(monkeypatch, tmp_path):
+    from io import BytesIO
+    from starlette.datastructures import UploadFile
+
+    monkeypatch.setattr(server, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(server, "MAX_FILE_SIZE", 4)
+
+    async def fail_stream(upload, dest):
+        raise AssertionError("oversize upload should not be copied")
+
+    monkeypatch.setattr(server, "_stream_upload_to_disk", fail_stream)
+
+    upload = UploadFile(file=BytesIO(b"too large"), size=9, filename="big.txt")
+    prepared, results = asyncio.run(server._prepare_file_payloads([upload], None, "ws-1", None))
+
+    assert prepared == []
+    assert "exceeds maximum size" in results[0]["error"]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_prepare_file_payloads_stages_same_named_uploads_separately(monkeypatch, tmp_path):
+    from io import BytesIO
+    from starlette.datastructures import UploadFile
+
+    monkeypatch.setattr(server, "UPLOAD_DIR", tmp_path)
+
+    uploads = [
+        UploadFile(file=BytesIO(b"first"), filename="folder1/doc.txt"),
+        UploadFile(file=BytesIO(b"second"), filename="folder2/doc.txt"),
+    ]
+    prepared, results = asyncio.run(server._prepare_file_payloads(uploads, None, "ws-1", None))
+
+    assert results == []
+    assert len({payload["path"] for payload in prepared}) == 2
+    assert [Path(payload["path"]).read_bytes() for payload in prepared] == [b"first", b"second"]
+    assert all(payload["safe_name"].endswith("_doc.txt") for payload in prepared)
+
+    server._discard_staged_uploads(prepared[:1])
+    assert Path(prepared[1]["path"]).read_bytes() == b"second"
+
+
+def test_upload_request_over_declared_limit_is_rejected_before_parsing(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(server, "MAX_UPLOAD_REQUEST_SIZE", 16)
+
+    with TestClient(server.app) as client:
+        resp = client.post(
+            "/api/v1/ingest/files",
+            files={"files": ("doc.txt", b"x" * 64, "text/plain")},
+        )
+
+    assert resp.status_code == 413
+
+
+def test_sanitize_filename_strips_paths_and_unsafe_characters():
+    assert server.sanitize_filename("../../etc/pass wd;.txt") == "passwd.txt"
+    assert server.sanitize_filename("dir\\résumé (1).pdf") == "dirrésumé1.pdf"
+    assert len(server.sanitize_filename("a" * 300 + ".txt")) == 255
+
+
+def test_file_extension_matches_path_suffix():
+    for name in ["report.PDF", "archive.tar.gz", ".bashrc", "noext", "trailing.", "dir.d/file", "a/b.TXT", "..", "...x"]:
+        assert server._file_extension(name) == Path(name).suffix.lower()
+    assert not server.validate_file_type("setup.EXE")
+    assert server.validate_file_type("notes.md")
+
+
+def test_ingest_files_core_checks_quota_and_chunk_total_concurrently(monkeypatch, tmp_path):
+    started = []
+    both_started = None
+
+    async def tracked(name, result):
+        started.append(name)
+        if len(started) == 2:
+            both_started.set()
+        await asyncio.wait_for(both_started.wait(), timeout=1)
+        return result
+
+    async def quota(*args, **kwargs):
+        return await tracked("quota", None)
+
+    async def count(workspace_id):
+        return await tracked("count", 0)
+
+    async def fake_run_legacy_ingest(func, path, **kwargs):
+        return {"written": 1, "path": path}
+
+    monkeypatch.setattr(server, "USE_DB_CHUNKS", False)
+    monkeypatch.setattr(server, "CHUNKS_PATH", str(tmp_path / "chunks.jsonl"))
+    monkeypatch.setattr(server, "_consume_workspace_quota", quota)
+    monkeypatch.setattr(server, "_count_workspace_chunks", count)
+    monkeypatch.setattr(server, "_run_legacy_ingest", fake_run_legacy_ingest)
+    monkeypatch.setattr(server, "ensure_index", lambda require=False: None)
+
+    async def run():
+        nonlocal both_started
+        both_started = asyncio.Event()
+        return await server._ingest_files_core({"user_id": "tester"}, "ws-1", None, [], "en")
+
+    asyncio.run(run())
+    assert sorted(started) == ["count", "quota"]
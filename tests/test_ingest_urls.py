@@ -0,0 +1,179 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import server
+
+
+def test_ingest_urls_core_runs_urls_concurrently_and_keeps_order(monkeypatch, tmp_path):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fake_ingest_youtube(url, out_jsonl, language, user_id, workspace_id):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return {"written": 2, "path": out_jsonl}
+
+    async def no_quota(*args, **kwargs):
+        return None
+
+    async def no_chunks(workspace_id):
+        return 0
+
+    async def fake_run_legacy_ingest(func, *args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    monkeypatch.setattr(server, "USE_DB_CHUNKS", False)
+    monkeypatch.setattr(server, "CHUNKS_PATH", str(tmp_path / "chunks.jsonl"))
+    monkeypatch.setattr(server, "ingest_youtube", fake_ingest_youtube)
+    monkeypatch.setattr(server, "_run_legacy_ingest", fake_run_legacy_ingest)
+    monkeypatch.setattr(server, "_consume_workspace_quota", no_quota)
+    monkeypatch.setattr(server, "_count_workspace_chunks", no_chunks)
+    monkeypatch.setattr(server, "ensure_index", lambda require=False: None)
+
+    urls = [
+        "https://youtu.be/aaaaaaa",
+        "not-a-youtube-url",
+        "https://youtu.be/bbbbbbb",
+        "https://www.youtube.com/watch?v=ccccccc",
+    ]
+    url_req = server.IngestURLRequest(urls="\n".join(u for u in urls if u.startswith("https")), language="en")
+    result = asyncio.run(server._ingest_urls_core({"user_id": "tester"}, "ws-1", None, url_req, urls))
+
+    assert [entry["url"] for entry in result["results"]] == urls
+    assert result["results"][1]["error"] == "Invalid YouTube URL format"
+    assert result["total_written"] == 6
+    assert peak > 1
+
+
+def test_yt_dlp_fallback_stages_captions_in_private_dir(monkeypatch, tmp_path):
+    captions_dir = tmp_path / "captions"
+    seen_templates = []
+    ingested = []
+
+    async def fake_run_yt_dlp(args, timeout):
+        template = args[args.index("-o") + 1]
+        seen_templates.append(template)
+        Path(template.replace("%(id)s.%(ext)s", "vid123.en.vtt")).write_text("WEBVTT\n")
+        return b"vid123\n"
+
+    async def fake_run_legacy_ingest(func, path, **kwargs):
+        if func is server.ingest_youtube:
+            raise RuntimeError("transcript api unavailable")
+        ingested.append(path)
+        return {"written": 1, "path": path}
+
+    monkeypatch.setattr(server, "USE_DB_CHUNKS", False)
+    monkeypatch.setattr(server, "CAPTIONS_DIR", captions_dir)
+    monkeypatch.setattr(server, "_run_yt_dlp", fake_run_yt_dlp)
+    monkeypatch.setattr(server, "_run_legacy_ingest", fake_run_legacy_ingest)
+
+    url_req = server.IngestURLRequest(urls="https://youtu.be/vid123", language="en")
+    result = asyncio.run(server._ingest_youtube_url("https://youtu.be/vid123", "tester", "ws-1", None, url_req))
+
+    assert result["mode"] == "auto_captions"
+    assert ingested == [str(captions_dir / "vid123.en.vtt")]
+    assert Path(seen_templates[0]).parent.parent == captions_dir
+    assert [p.name for p in captions_dir.iterdir()] == ["vid123.en.vtt"]
+
+
+def test_fetch_auto_captions_uses_in_process_yt_dlp_when_available(monkeypatch, tmp_path):
+    captured = {}
+
+    class FakeYoutubeDL:
+        def __init__(self, opts):
+            captured["opts"] = opts
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url, download):
+            captured["url"] = url
+            return {"id": "vid123"}
+
+    async def no_cli(args, timeout):
+        raise AssertionError("CLI should not be used")
+
+    monkeypatch.setattr(server, "YT_DLP_AVAILABLE", True)
+    monkeypatch.setattr(server, "YoutubeDL", FakeYoutubeDL)
+    monkeypatch.setattr(server, "_run_yt_dlp", no_cli)
+
+    vid = asyncio.run(server._fetch_auto_captions("https://youtu.be/vid123", "de", str(tmp_path), timeout=5))
+
+    assert vid == "vid123"
+    assert captured["opts"]["subtitleslangs"] == ["de"]
+    assert captured["opts"]["outtmpl"].startswith(str(tmp_path))
+    assert captured["opts"]["socket_timeout"] == 5
+
+
+def test_fetch_auto_captions_timeout_cleans_up_after_the_late_thread(monkeypatch, tmp_path):
+    outdir = tmp_path / "yt_fallback"
+    outdir.mkdir()
+    release = threading.Event()
+    finished = threading.Event()
+
+    def slow_fetch(url, language, out, timeout):
+        release.wait(5)
+        Path(out, "vid789.en.vtt").write_text("WEBVTT\n")
+        finished.set()
+        return "vid789"
+
+    monkeypatch.setattr(server, "YT_DLP_AVAILABLE", True)
+    monkeypatch.setattr(server, "_fetch_auto_captions_in_process", slow_fetch)
+
+    async def run():
+        try:
+            await server._fetch_auto_captions("https://youtu.be/vid789", "en", str(outdir), timeout=0.05)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            raise AssertionError("expected a timeout")
+        assert outdir.exists()
+        release.set()
+        for _ in range(100):
+            if finished.is_set() and not outdir.exists():
+                return
+            await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert finished.is_set()
+    assert not outdir.exists()
+
+
+def test_yt_dlp_fallback_picks_up_regional_caption_variant(monkeypatch, tmp_path):
+    captions_dir = tmp_path / "captions"
+    ingested = []
+
+    async def fake_run_yt_dlp(args, timeout):
+        template = args[args.index("-o") + 1]
+        Path(template.replace("%(id)s.%(ext)s", "vid456.en-GB.vtt")).write_text("WEBVTT\n")
+        return b"vid456\n"
+
+    async def fake_run_legacy_ingest(func, path, **kwargs):
+        if func is server.ingest_youtube:
+            raise RuntimeError("transcript api unavailable")
+        ingested.append(path)
+        return {"written": 1, "path": path}
+
+    monkeypatch.setattr(server, "USE_DB_CHUNKS", False)
+    monkeypatch.setattr(server, "YT_DLP_AVAILABLE", False)
+    monkeypatch.setattr(server, "CAPTIONS_DIR", captions_dir)
+    monkeypatch.setattr(server, "_run_yt_dlp", fake_run_yt_dlp)
+    monkeypatch.setattr(server, "_run_legacy_ingest", fake_run_legacy_ingest)
+
+    url_req = server.IngestURLRequest(urls="https://youtu.be/vid456", language="en")
+    result = asyncio.run(server._ingest_youtube_url("https://youtu.be/vid456", "tester", "ws-1", None, url_req))
+
+    assert result["mode"] == "auto_captions"
+    assert ingested == [str(captions_dir / "vid456.en-GB.vtt")]
+    assert [p.name for p in captions_dir.iterdir()] == ["vid456.en-GB.vtt"]
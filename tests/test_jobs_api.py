@@ -1,4 +1,5 @@
 import asyncio
+from pathlib import Path
 from fastapi.testclient import TestClient
 
 import server
@@ -109,6 +110,7 @@ def test_ingest_files_queued(monkeypatch, tmp_path):
     monkeypatch.setattr(server, "_resolve_auth_context", fake_resolve)
     monkeypatch.setattr(server, "_require_billing_active", fake_billing)
     monkeypatch.setattr(server, "_ingest_files_core", fake_ingest_files_core)
+    monkeypatch.setattr(server, "UPLOAD_DIR", tmp_path / "uploads")
 
     from io import BytesIO
     from starlette.datastructures import UploadFile
@@ -141,3 +143,47 @@ def test_ingest_files_queued(monkeypatch, tmp_path):
             server.BACKGROUND_QUEUE = None
         loop.close()
         asyncio.set_event_loop(None)
+
+
+def test_failed_queued_file_job_discards_staged_uploads(monkeypatch, tmp_path):
+    async def fake_resolve(request, scopes=("write",), require=True):
+        return {"user_id": "tester"}, "workspace-1", None
+
+    async def fake_billing(workspace_id):
+        return None
+
+    async def failing_ingest_files_core(user, workspace_id, api_key_principal, prepared, language, initial_results=None):
+        assert all(Path(payload["path"]).exists() for payload in prepared)
+        raise RuntimeError("ingest failed")
+
+    upload_dir = tmp_path / "uploads"
+    monkeypatch.setattr(server, "BACKGROUND_JOBS_ENABLED", True)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    server.BACKGROUND_QUEUE = BackgroundTaskQueue()
+    loop.run_until_complete(server.BACKGROUND_QUEUE.start())
+    monkeypatch.setattr(server, "_resolve_auth_context", fake_resolve)
+    monkeypatch.setattr(server, "_require_billing_active", fake_billing)
+    monkeypatch.setattr(server, "_ingest_files_core", failing_ingest_files_core)
+    monkeypatch.setattr(server, "UPLOAD_DIR", upload_dir)
+
+    try:
+        with TestClient(server.app) as client:
+            resp = client.post(
+                "/api/ingest_files",
+                data={"language": "en"},
+                files={"files": ("doc.txt", b"hello", "text/plain")},
+            )
+            assert resp.status_code == 200
+            job_id = resp.json()["job_id"]
+
+            queue = server.BACKGROUND_QUEUE
+            loop.run_until_complete(queue.wait_for_all())
+            assert queue.get_job(job_id).status == "failed"
+            assert list(upload_dir.iterdir()) == []
+    finally:
+        if server.BACKGROUND_QUEUE:
+            loop.run_until_complete(server.BACKGROUND_QUEUE.stop())
+            server.BACKGROUND_QUEUE = None
+        loop.close()
+        asyncio.set_event_loop(None)
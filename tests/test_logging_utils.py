@@ -0,0 +1,40 @@
+import json
+import logging
+
+from logging_utils import JsonFormatter
+
+import server
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_log_event_reaches_console_logger_once():
+    handler = _ListHandler()
+    rag_logger = logging.getLogger("rag")
+    rag_logger.addHandler(handler)
+    try:
+        server._log_event("unit.once", value=1)
+    finally:
+        rag_logger.removeHandler(handler)
+
+    assert [r.getMessage() for r in handler.records] == ["unit.once"]
+
+
+def test_json_formatter_merges_extras_but_not_record_internals():
+    record = logging.LogRecord("rag", logging.INFO, __file__, 1, "evt", (), None)
+    record.event = "evt"
+    record.count = 3
+
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["event"] == "evt"
+    assert payload["count"] == 3
+    assert "lineno" not in payload
+    assert "msg" not in payload
@@ -13,9 +13,12 @@ def test_metrics_endpoint_exposes_core_metrics(monkeypatch):
     server.INGEST_COUNTER.labels(source="youtube", outcome="success", status_code="200").inc()
     server.INGEST_LATENCY.labels(source="youtube", outcome="success").observe(0.4)
     server.INGEST_PROCESSED_CHUNKS.labels(source="youtube").inc(3)
-    server.WORKSPACE_QUOTA_USAGE.labels("workspace-test", "requests_today").set(42)
-    server.WORKSPACE_QUOTA_RATIO.labels("workspace-test", "requests_per_day").set(0.5)
-    server.QUOTA_EXCEEDED_COUNTER.labels("workspace-test", "requests_per_day").inc()
+    server._quota_metrics_hook(
+        "workspace-test",
+        {"request_limit_per_day": 100, "request_limit_per_minute": 10},
+        {"request_count": 50, "minute_request_count": 1},
+    )
+    server.QUOTA_EXCEEDED_COUNTER.labels("requests_per_day").inc()
     server.EXTERNAL_REQUEST_ERRORS.labels("stripe", "checkout").inc()
 
     # Exercise background job metrics by running a short-lived job.
@@ -43,8 +46,8 @@ def test_metrics_endpoint_exposes_core_metrics(monkeypatch):
             'ask_request_latency_seconds_bucket{le="0.5",outcome="success"}',
             'ingest_operations_total{outcome="success",source="youtube",status_code="200"}',
             'ingest_processed_chunks_total{source="youtube"}',
-            'workspace_quota_ratio{metric="requests_per_day",workspace_id="workspace-test"}',
-            'quota_exceeded_total{metric="requests_per_day",workspace_id="workspace-test"}',
+            'workspace_quota_ratio_bucket{le="0.5",metric="requests_per_day"}',
+            'quota_exceeded_total{metric="requests_per_day"}',
             'external_request_errors_total{operation="checkout",service="stripe"}',
             f'background_jobs_submitted_total{{name="{record.name}"}}',
             f'background_jobs_completed_total{{name="{record.name}",status="succeeded"}}',
@@ -53,6 +56,7 @@ def test_metrics_endpoint_exposes_core_metrics(monkeypatch):
 
         for snippet in expected_snippets:
             assert snippet in body
+        assert "workspace-test" not in body
     finally:
         loop.run_until_complete(queue.stop())
         server.BACKGROUND_QUEUE = None
@@ -0,0 +1,110 @@
+from fastapi.testclient import TestClient
+
+import server
+
+
+def test_livez_and_readyz_after_startup():
+    with TestClient(server.app) as client:
+        live = client.get("/livez")
+        assert live.status_code == 200
+        assert live.json() == {"status": "alive"}
+
+        ready = client.get("/readyz")
+        assert ready.status_code == 200
+        assert ready.json()["status"] == "ready"
+
+
+def test_readyz_reports_starting_until_warmup_finishes(monkeypatch):
+    import asyncio
+
+    monkeypatch.setattr(server, "READYZ_WAIT_SECONDS", 0.01)
+    with TestClient(server.app) as client:
+        monkeypatch.setattr(server, "_index_warm_event", asyncio.Event())
+        resp = client.get("/readyz")
+        assert resp.status_code == 503
+        assert resp.headers["retry-after"] == "5"
+
+
+def test_health_reports_degraded_when_db_probe_times_out(monkeypatch):
+    import asyncio
+
+    class StalledDB:
+        async def fetch_one(self, query, params=None):
+            await asyncio.sleep(10)
+
+    monkeypatch.setattr(server, "DB", StalledDB())
+    monkeypatch.setattr(server, "HEALTH_DB_TIMEOUT", 0.01)
+
+    result = asyncio.run(server.health_check())
+
+    assert result["status"] == "degraded"
+    assert result["database"] == "degraded"
+
+
+def test_health_returns_503_when_db_fails_and_caches_chunk_count(monkeypatch):
+    import asyncio
+
+    queries = []
+
+    class FakeDB:
+        fail = False
+
+        async def fetch_one(self, query, params=None):
+            if self.fail:
+                raise ConnectionError("db down")
+            queries.append(query)
+            return {"cnt": 4} if "COUNT" in query else {"?column?": 1}
+
+    db = FakeDB()
+    monkeypatch.setattr(server, "DB", db)
+    monkeypatch.setattr(server, "_health_db_chunks", None)
+
+    first = asyncio.run(server.health_check())
+    second = asyncio.run(server.health_check())
+    assert first["db_chunks"] == second["db_chunks"] == 4
+    assert sum("COUNT" in q for q in queries) == 1
+
+    db.fail = True
+    failed = asyncio.run(server.health_check())
+    assert failed.status_code == 503
+
+
+def test_startup_loads_legacy_index_off_the_event_loop(monkeypatch, tmp_path):
+    import asyncio
+    import json
+
+    chunks_path = tmp_path / "chunks.jsonl"
+    chunks_path.write_text(
+        json.dumps({"id": "c1", "content": "hello world", "source": {"id": "s1"}}) + "\n",
+        encoding="utf-8",
+    )
+    loaded_on_event_loop = []
+    real_load_chunks = server.load_chunks
+
+    def recording_load_chunks(path):
+        try:
+            asyncio.get_running_loop()
+            loaded_on_event_loop.append(True)
+        except RuntimeError:
+            loaded_on_event_loop.append(False)
+        return real_load_chunks(path)
+
+    monkeypatch.setattr(server, "USE_DB_CHUNKS", False)
+    monkeypatch.setattr(server, "CHUNKS_PATH", str(chunks_path))
+    monkeypatch.setattr(server, "INDEX", None)
+    monkeypatch.setattr(server, "CHUNKS", [])
+    monkeypatch.setattr(server, "load_chunks", recording_load_chunks)
+
+    with TestClient(server.app):
+        assert [c["id"] for c in server.CHUNKS] == ["c1"]
+        assert server.INDEX is not None
+
+    assert loaded_on_event_loop == [False]
+
+
+def test_shared_http_client_is_reused_and_closed_on_shutdown():
+    with TestClient(server.app):
+        first = server._get_http_client()
+        assert server._get_http_client() is first
+    assert first.is_closed
+    assert server._http_client is None
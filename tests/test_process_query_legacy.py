@@ -0,0 +1,59 @@
+import server
+
+
+class _FakeIndex:
+    def __init__(self, ranked):
+        self.ranked = ranked
+
+    def search(self, query, k=8, user_id=None, workspace_id=None):
+        return self.ranked[:k]
+
+
+def test_legacy_query_short_circuits_on_no_hits(monkeypatch):
+    def fail_score(*args, **kwargs):
+        raise AssertionError("score_answer should not run without hits")
+
+    monkeypatch.setattr(server, "ensure_index", lambda require=False: None)
+    monkeypatch.setattr(server, "INDEX", _FakeIndex([]))
+    monkeypatch.setattr(server, "score_answer", fail_score)
+    monkeypatch.setattr(server, "_count_lines", lambda path: 7)
+
+    result = server._process_query_legacy("anything", 5, {"user_id": "u-1"}, "ws-1")
+
+    assert result == {
+        "answer": "No relevant chunks found.",
+        "citations": [],
+        "score": 0.0,
+        "count": 7,
+        "chunks": [],
+    }
+
+
+def test_legacy_query_builds_answer_and_details_from_chunk_ids(monkeypatch):
+    chunks = {
+        f"c{i}": {
+            "id": f"c{i}",
+            "content": f" chunk {i} text ",
+            "source": {"type": "file", "path": f"doc{i}.txt"},
+            "metadata": {"chunk_index": i},
+        }
+        for i in range(5)
+    }
+    ranked = [("c3", 4.0), ("missing", 3.5), ("c0", 3.0), ("c1", 2.0), ("c4", 1.0)]
+
+    monkeypatch.setattr(server, "ensure_index", lambda require=False: None)
+    monkeypatch.setattr(server, "INDEX", _FakeIndex(ranked))
+    monkeypatch.setattr(server, "CHUNK_ID_MAP", chunks)
+    monkeypatch.setattr(server, "format_citation", lambda chunk: chunk["source"]["path"])
+    monkeypatch.setattr(server, "score_answer", lambda q, a, top: {"hits": [c["id"] for c in top]})
+    monkeypatch.setattr(server, "_count_lines", lambda path: 5)
+
+    result = server._process_query_legacy("chunk", 5, {"user_id": "u-1"})
+
+    assert result["citations"] == ["doc3.txt", "doc0.txt", "doc1.txt"]
+    assert result["answer"].startswith("chunk 3 text chunk 0 text chunk 1 text\n\nSources:")
+    assert result["score"] == {"hits": ["c3", "c0", "c1", "c4"]}
+    assert [d["index"] for d in result["chunks"]] == [1, 2, 3, 4]
+    assert [d["citation"] for d in result["chunks"]] == ["doc3.txt", "doc0.txt", "doc1.txt", "doc4.txt"]
+    assert result["chunks"][0]["score"] == 4.0
+    assert result["chunks"][0]["content"] == "chunk 3 text"
@@ -20,3 +20,44 @@ def test_security_headers_present():
         assert "default-src 'self'" in csp
         assert "frame-ancestors 'none'" in csp
         assert "object-src 'none'" in csp
+
+
+def test_static_cache_control_only_relaxes_frontend_paths():
+    assert server._static_cache_control("/assets/index-3f2a9c.js") == "public, max-age=31536000, immutable"
+    assert server._static_cache_control("/app/assets/index-3f2a9c.css") == "public, max-age=31536000, immutable"
+    assert server._static_cache_control("/app/") == "no-cache"
+    assert server._static_cache_control("/app-legacy/index.html") == "no-cache"
+    assert server._static_cache_control("/api/v1/sources") is None
+    assert server._static_cache_control("/health") is None
+
+
+def test_auth_me_and_stats_allow_short_client_caching(monkeypatch):
+    monkeypatch.setattr(server, "LOCAL_MODE", True)
+    monkeypatch.setattr(server, "_count_lines", lambda path: 42)
+    with TestClient(server.app) as client:
+        me = client.get("/auth/me")
+        assert me.headers["cache-control"] == "private, max-age=5"
+        assert me.headers["vary"].startswith("Authorization, Cookie")
+        assert "pragma" not in me.headers
+
+        resp = client.get("/api/stats")
+        assert resp.json() == {"count": 42}
+        assert resp.headers["cache-control"] == "public, max-age=30"
+        etag = resp.headers["etag"]
+
+        cached = client.get("/api/v1/stats", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+
+
+def test_oauth_session_only_on_google_handshake_routes():
+    async def echo_session(scope, receive, send):
+        has_session = "session" in scope
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"yes" if has_session else b"no"})
+
+    client = TestClient(server.OAuthSessionMiddleware(echo_session, secret_key="test-secret"))
+    assert client.get("/auth/google").text == "yes"
+    assert client.get("/auth/google/callback").text == "yes"
+    assert client.get("/auth/callback").text == "yes"
+    assert client.get("/api/sources").text == "no"
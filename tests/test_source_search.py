@@ -0,0 +1,410 @@
+import asyncio
+import gc
+import json
+import weakref
+from datetime import datetime
+
+import pytest
+
+from retrieval import _source_id, get_chunks_by_source
+
+import server
+
+
+def _chunk(chunk_id, path, content):
+    return {"id": chunk_id, "content": content, "source": {"type": "doc", "path": path}}
+
+
+def test_row_subset_search_only_ranks_those_rows():
+    chunks = [
+        _chunk("a1", "a.md", "alpha retrieval notes"),
+        _chunk("b1", "b.md", "retrieval retrieval retrieval"),
+        _chunk("a2", "a.md", "alpha ranking notes"),
+    ] + [_chunk(f"c{i}", "c.md", f"filler text {i}") for i in range(5)]
+    index = server.SimpleIndex(chunks)
+    full = dict(index.search("retrieval notes", k=3))
+    expected = index.bm25.get_batch_scores(["retrieval", "notes"], [0, 2])
+    assert list(index._row_scores(["retrieval", "notes"], [0, 2])) == pytest.approx(expected)
+
+    ranked = index.search("retrieval notes", k=3, rows=[0, 2])
+    assert [chunk_id for chunk_id, _ in ranked] == ["a1", "a2"]
+    assert all(score == full[chunk_id] for chunk_id, score in ranked)
+    assert index.search("retrieval", rows=[]) == []
+    assert [c for c, _ in index.search("alpha", user_id="u1", rows=[2])] == ["a2"]
+
+
+def test_search_source_scores_source_rows_of_global_index(monkeypatch):
+    chunks = [
+        _chunk("a1", "a.md", "alpha retrieval notes"),
+        _chunk("b1", "b.md", "beta retrieval notes"),
+        _chunk("a2", "a.md", "alpha ranking notes"),
+    ] + [_chunk(f"c{i}", "c.md", f"filler text {i}") for i in range(5)]
+    built = []
+    real_index = server.SimpleIndex
+
+    def counting_index(chunks):
+        built.append(len(chunks))
+        return real_index(chunks)
+
+    async def fake_auth(request, scopes=(), require=False):
+        return {"user_id": "u1"}, None, None
+
+    monkeypatch.setattr(server, "CHUNKS", chunks)
+    monkeypatch.setattr(server, "INDEX", real_index(chunks))
+    monkeypatch.setattr(server, "ensure_index", lambda require=False: None)
+    monkeypatch.setattr(server, "_resolve_auth_context", fake_auth)
+    monkeypatch.setattr(server, "SimpleIndex", counting_index)
+    source_a = _source_id({"type": "doc", "path": "a.md"})
+
+    result = asyncio.run(server.search_source(None, "retrieval notes", source_id=source_a))
+    assert [item["chunk"]["id"] for item in result["chunks"]] == ["a1", "a2"]
+    assert built == []
+
+    assert asyncio.run(server.search_source(None, "notes", source_id="missing")) == {"chunks": [], "scores": []}
+
+
+def test_unique_sources_are_cached_per_chunks_snapshot(monkeypatch):
+    calls = []
+    real = server.get_unique_sources
+
+    def counting(chunks, user_id=None, workspace_id=None):
+        calls.append((user_id, workspace_id))
+        return real(chunks, user_id=user_id, workspace_id=workspace_id)
+
+    chunks = [_chunk("a1", "a.md", "alpha"), _chunk("b1", "b.md", "beta")]
+    monkeypatch.setattr(server, "get_unique_sources", counting)
+    monkeypatch.setattr(server, "CHUNKS", chunks)
+    monkeypatch.setattr(server, "_sources_cache", server.OrderedDict())
+
+    first = server._cached_unique_sources("u1", "ws-1")
+    assert len(first) == 2
+    assert server._cached_unique_sources("u1", "ws-1") is first
+    server._cached_unique_sources(None, None)
+    assert calls == [("u1", "ws-1"), (None, None)]
+
+    monkeypatch.setattr(server, "CHUNKS", chunks[:1])
+    assert len(server._cached_unique_sources("u1", "ws-1")) == 1
+    assert len(calls) == 3
+
+
+def test_delete_source_records_kept_count_instead_of_rescanning(monkeypatch, tmp_path):
+    chunks_path = tmp_path / "chunks.jsonl"
+    rows = [
+        _chunk("a1", "a.md", "alpha"),
+        _chunk("a2", "a.md", "alpha two"),
+        _chunk("b1", "b.md", "beta"),
+    ]
+    chunks_path.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+    async def fake_resolve(request, scopes=("read",), require=True):
+        return {"user_id": "u-1"}, None, None
+
+    def no_rescan(path):
+        raise AssertionError("count should come from the rewrite")
+
+    monkeypatch.setattr(server, "USE_DB_CHUNKS", False)
+    monkeypatch.setattr(server, "CHUNKS_PATH", str(chunks_path))
+    monkeypatch.setattr(server, "_resolve_auth_context", fake_resolve)
+    monkeypatch.setattr(server, "_chunk_count_cache", None)
+    monkeypatch.setattr(server, "_chunk_count_stamp", None)
+    monkeypatch.setattr(server, "_count_newlines", no_rescan)
+
+    source_a = _source_id({"type": "doc", "path": "a.md"})
+    result = asyncio.run(server.delete_source(None, source_a))
+
+    assert result["deleted"] == 2
+    assert server._count_lines(str(chunks_path)) == 1
+
+
+def test_batch_delete_rewrites_chunks_file_once(monkeypatch, tmp_path):
+    chunks_path = tmp_path / "chunks.jsonl"
+    rows = [
+        _chunk("a1", "a.md", "alpha"),
+        _chunk("b1", "b.md", "beta"),
+        _chunk("c1", "c.md", "gamma"),
+        {**_chunk("a2", "a.md", "alpha other workspace"), "workspace_id": "ws-2"},
+        _chunk("b2", "b.md", "beta two"),
+    ]
+    chunks_path.write_text("".join(json.dumps(r) + "\n" for r in rows) + "not json\n", encoding="utf-8")
+    backups = []
+
+    async def fake_resolve(request, scopes=("read",), require=True):
+        return {"user_id": "u-1"}, "ws-1", None
+
+    def fake_backup(path):
+        backups.append(path)
+        return None
+
+    monkeypatch.setattr(server, "USE_DB_CHUNKS", False)
+    monkeypatch.setattr(server, "CHUNKS_PATH", str(chunks_path))
+    monkeypatch.setattr(server, "_resolve_auth_context", fake_resolve)
+    monkeypatch.setattr(server, "create_chunk_backup", fake_backup)
+    monkeypatch.setattr(server, "_chunk_write_lock", None)
+    monkeypatch.setattr(server, "_chunk_count_cache", None)
+    monkeypatch.setattr(server, "_chunk_count_stamp", None)
+
+    source_a = _source_id({"type": "doc", "path": "a.md"})
+    source_b = _source_id({"type": "doc", "path": "b.md"})
+    result = asyncio.run(server.batch_delete_sources(None, [source_a, source_b]))
+
+    assert result == {"deleted": 2, "failed": 0, "kept": 2}
+    assert backups == [str(chunks_path)]
+    remaining = [json.loads(line)["id"] for line in chunks_path.read_text(encoding="utf-8").splitlines()]
+    assert remaining == ["c1", "a2"]
+    assert server._chunk_count_cache == 2
+    assert not (tmp_path / "chunks.jsonl.tmp").exists()
+
+
+def test_admin_chunk_stats_matches_unique_sources_and_is_memoized(monkeypatch):
+    chunks = [
+        {**_chunk("a1", "a.md", "alpha"), "user_id": "u-1"},
+        {**_chunk("a2", "a.md", "alpha two"), "user_id": "u-1"},
+        {**_chunk("b1", "b.md", "beta"), "user_id": "u-2"},
+        {"id": "orphan", "content": "no source"},
+    ]
+    monkeypatch.setattr(server, "CHUNKS", chunks)
+    monkeypatch.setattr(server, "_admin_stats_cache", None)
+
+    stats = server._admin_chunk_stats()
+
+    assert stats == (4, {"u-1": 2, "u-2": 1, "legacy": 1}, len(server.get_unique_sources(chunks)))
+    assert server._admin_chunk_stats() is stats
+
+    monkeypatch.setattr(server, "CHUNKS", chunks[:1])
+    assert server._admin_chunk_stats() == (1, {"u-1": 1}, 1)
+
+
+def test_remove_rows_matches_a_fresh_index():
+    chunks = [
+        _chunk("a1", "a.md", "alpha retrieval notes"),
+        _chunk("b1", "b.md", "beta ranking notes"),
+        _chunk("a2", "a.md", "alpha ranking"),
+        _chunk("c1", "c.md", "gamma retrieval ranking notes"),
+        _chunk("c2", "c.md", "gamma only"),
+    ]
+    trimmed = server.SimpleIndex(chunks).remove_rows([0, 2])
+    fresh = server.SimpleIndex([chunks[1], chunks[3], chunks[4]])
+
+    assert trimmed.chunks == fresh.chunks
+    assert trimmed.chunk_id_map == fresh.chunk_id_map
+    for query in ("ranking notes", "gamma", "alpha"):
+        assert list(trimmed.bm25.get_scores(query.split())) == list(fresh.bm25.get_scores(query.split()))
+        assert trimmed.search(query, k=3) == fresh.search(query, k=3)
+
+
+def test_bm25_from_counts_matches_a_fresh_build():
+    from rank_bm25 import BM25Okapi
+
+    from retrieval import _bm25_from_counts
+
+    corpus = [["alpha", "notes"], ["beta", "ranking", "notes", "notes"], ["gamma"], ["alpha", "gamma", "gamma"]]
+    fresh = BM25Okapi(corpus, k1=1.2, b=0.7, epsilon=0.3)
+    rebuilt = _bm25_from_counts(fresh, list(fresh.doc_freqs), list(fresh.doc_len))
+
+    for attr in ("k1", "b", "epsilon", "corpus_size", "avgdl", "doc_len", "doc_freqs", "idf", "average_idf"):
+        assert getattr(rebuilt, attr) == getattr(fresh, attr), attr
+    for query in (["notes"], ["alpha", "gamma"], ["missing"]):
+        assert list(rebuilt.get_scores(query)) == list(fresh.get_scores(query))
+
+
+def test_delete_source_trims_loaded_index_without_reloading(monkeypatch, tmp_path):
+    chunks_path = tmp_path / "chunks.jsonl"
+    rows = [
+        _chunk("a1", "a.md", "alpha"),
+        _chunk("b1", "b.md", "beta"),
+        {**_chunk("a2", "a.md", "alpha elsewhere"), "workspace_id": "ws-2"},
+    ]
+    chunks_path.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+    async def fake_resolve(request, scopes=("read",), require=True):
+        return {"user_id": "u-1"}, "ws-1", None
+
+    def no_reload(path):
+        raise AssertionError("chunks file should not be reloaded")
+
+    monkeypatch.setattr(server, "USE_DB_CHUNKS", False)
+    monkeypatch.setattr(server, "CHUNKS_PATH", str(chunks_path))
+    monkeypatch.setattr(server, "_resolve_auth_context", fake_resolve)
+    monkeypatch.setattr(server, "RAG_PIPELINE", None)
+    monkeypatch.setattr(server, "CHUNKS", server.load_chunks(str(chunks_path)))
+    monkeypatch.setattr(server, "INDEX", server.SimpleIndex(server.CHUNKS))
+    monkeypatch.setattr(server, "CHUNK_ID_MAP", {c["id"]: c for c in server.CHUNKS})
+    monkeypatch.setattr(server, "load_chunks", no_reload)
+
+    source_a = _source_id({"type": "doc", "path": "a.md"})
+    monkeypatch.setattr(server, "delete_source_chunks", lambda path, sid, workspace_id=None: {"deleted": 1, "kept": 2})
+    asyncio.run(server.delete_source(None, source_a))
+
+    assert [c["id"] for c in server.CHUNKS] == ["b1", "a2"]
+    assert server.INDEX.chunks is server.CHUNKS
+    assert set(server.CHUNK_ID_MAP) == {"b1", "a2"}
+    trimmed = server.INDEX
+    server.ensure_index()
+    assert server.INDEX is trimmed
+
+
+def test_delete_source_rewrites_under_the_chunk_write_lock(monkeypatch):
+    calls = []
+
+    async def fake_resolve(request, scopes=("read",), require=True):
+        return {"user_id": "u-1"}, "ws-1", None
+
+    def fake_delete(path, source_id, workspace_id=None):
+        calls.append((source_id, workspace_id))
+        return {"deleted": 0, "kept": 0}
+
+    monkeypatch.setattr(server, "_resolve_auth_context", fake_resolve)
+    monkeypatch.setattr(server, "delete_source_chunks", fake_delete)
+    monkeypatch.setattr(server, "_chunk_write_lock", None)
+
+    async def run():
+        async with server._get_chunk_write_lock():
+            delete = asyncio.create_task(server.delete_source(None, "src-1"))
+            await asyncio.sleep(0.05)
+            assert calls == []
+        return await delete
+
+    assert asyncio.run(run()) == {"deleted": 0, "kept": 0}
+    assert calls == [("src-1", "ws-1")]
+
+
+def test_chunks_for_source_matches_full_scan_and_builds_map_once(monkeypatch):
+    chunks = [
+        {**_chunk("a1", "a.md", "alpha"), "user_id": "u-1"},
+        {**_chunk("b1", "b.md", "beta"), "user_id": "u-1", "workspace_id": "ws-1"},
+        {**_chunk("a2", "a.md", "alpha two"), "user_id": "u-2"},
+        {**_chunk("a3", "a.md", "alpha three"), "workspace_id": "ws-2"},
+        {"id": "loose", "content": "no source"},
+    ]
+    monkeypatch.setattr(server, "CHUNKS", chunks)
+    monkeypatch.setattr(server, "_source_rows_cache", None)
+    source_a = _source_id({"type": "doc", "path": "a.md"})
+
+    for user_id, workspace_id in [(None, None), ("u-1", None), (None, "ws-1"), ("u-2", "ws-2")]:
+        assert server._chunks_for_source(source_a, user_id, workspace_id) == get_chunks_by_source(
+            chunks, source_a, user_id=user_id, workspace_id=workspace_id
+        )
+    rows = server._source_rows()[1]
+    assert server._source_rows()[1] is rows
+    assert server._chunks_for_source("missing", None, None) == []
+
+
+def test_source_preview_counts_visible_chunks_and_keeps_first_rows(monkeypatch):
+    chunks = [
+        {**_chunk("a1", "a.md", "alpha"), "user_id": "u-1"},
+        {**_chunk("a2", "a.md", "alpha"), "user_id": "u-2"},
+        _chunk("a3", "a.md", "alpha"),
+        {**_chunk("a4", "a.md", "alpha"), "user_id": "u-1"},
+        _chunk("b1", "b.md", "beta"),
+    ]
+
+    async def fake_auth(request, scopes=(), require=False):
+        return {"user_id": "u-1"}, None, None
+
+    monkeypatch.setattr(server, "CHUNKS", chunks)
+    monkeypatch.setattr(server, "ensure_chunks_loaded", lambda require=True: None)
+    monkeypatch.setattr(server, "_resolve_auth_context", fake_auth)
+    source_a = _source_id({"type": "doc", "path": "a.md"})
+
+    result = asyncio.run(server.get_source_preview(None, source_a, limit=2))
+    assert [c["id"] for c in result["preview"]] == ["a1", "a3"]
+    assert result["total_chunks"] == 3
+
+
+def test_ensure_chunks_loaded_defers_index_build_until_search(monkeypatch, tmp_path):
+    path = tmp_path / "chunks.jsonl"
+    path.write_text("\n".join(json.dumps(_chunk(f"c{i}", "a.md", f"alpha {i}")) for i in range(3)) + "\n")
+    built = []
+    loads = []
+    real_index = server.SimpleIndex
+    real_load = server.load_chunks
+
+    def counting_index(chunks):
+        built.append(len(chunks))
+        return real_index(chunks)
+
+    def counting_load(p):
+        loads.append(p)
+        return real_load(p)
+
+    monkeypatch.setattr(server, "USE_DB_CHUNKS", False)
+    monkeypatch.setattr(server, "CHUNKS_PATH", str(path))
+    monkeypatch.setattr(server, "INDEX", None)
+    monkeypatch.setattr(server, "CHUNKS", [])
+    monkeypatch.setattr(server, "SimpleIndex", counting_index)
+    monkeypatch.setattr(server, "load_chunks", counting_load)
+    monkeypatch.setattr(server, "_refresh_rag_pipeline_index", lambda: None)
+
+    server.ensure_chunks_loaded()
+    server.ensure_chunks_loaded()
+    assert [c["id"] for c in server.CHUNKS] == ["c0", "c1", "c2"]
+    assert server.INDEX is None
+    assert built == [] and len(loads) == 1
+
+    loaded = server.CHUNKS
+    server.ensure_index()
+    assert built == [3] and len(loads) == 1
+    assert server.INDEX.chunks is loaded
+
+
+def test_source_chunks_stream_as_one_json_document(monkeypatch):
+    chunks = [{**_chunk(f"a{i}", "a.md", "alpha " * 40), "user_id": "u-1"} for i in range(20)]
+    chunks.append({**_chunk("a20", "a.md", "alpha"), "created_at": datetime(2024, 1, 2, 3, 4, 5)})
+    monkeypatch.setattr(server, "SOURCE_CHUNKS_STREAM_BUFFER", 256)
+
+    pieces = list(server._stream_source_chunks(chunks, list(range(21))))
+    body = json.loads(b"".join(pieces))
+
+    assert len(pieces) > 1
+    assert body["count"] == 21
+    assert [c["id"] for c in body["chunks"]] == [c["id"] for c in chunks]
+    assert body["chunks"][-1]["created_at"].startswith("2024-01-02")
+
+
+def test_source_chunks_endpoint_filters_before_streaming(monkeypatch):
+    chunks = [
+        {**_chunk("a1", "a.md", "alpha"), "user_id": "u-1"},
+        {**_chunk("a2", "a.md", "alpha"), "user_id": "u-2"},
+        _chunk("b1", "b.md", "beta"),
+    ]
+
+    async def fake_auth(request, scopes=(), require=False):
+        return {"user_id": "u-1"}, None, None
+
+    monkeypatch.setattr(server, "CHUNKS", chunks)
+    monkeypatch.setattr(server, "ensure_chunks_loaded", lambda require=True: None)
+    monkeypatch.setattr(server, "_resolve_auth_context", fake_auth)
+    source_a = _source_id({"type": "doc", "path": "a.md"})
+
+    response = asyncio.run(server.get_source_chunks(None, source_a))
+
+    async def collect():
+        return b"".join([piece async for piece in response.body_iterator])
+
+    assert json.loads(asyncio.run(collect())) == {"chunks": [chunks[0]], "count": 1}
+    assert asyncio.run(server.get_source_chunks(None, "missing")) == {"chunks": [], "count": 0}
+
+
+def test_snapshot_caches_do_not_keep_replaced_chunks_alive(monkeypatch):
+    class Corpus(list):
+        pass
+
+    old = Corpus([{**_chunk("a1", "a.md", "alpha"), "user_id": "u-1"}])
+    monkeypatch.setattr(server, "CHUNKS", old)
+    monkeypatch.setattr(server, "_sources_cache", server.OrderedDict())
+    monkeypatch.setattr(server, "_admin_stats_cache", None)
+    monkeypatch.setattr(server, "_source_rows_cache", None)
+    server._cached_unique_sources("u-1", None)
+    server._admin_chunk_stats()
+    server._source_rows()
+
+    ref = weakref.ref(old)
+    del old
+    # Assigned directly: a second monkeypatch.setattr would keep ``old`` for its undo.
+    server.CHUNKS = [_chunk("b1", "b.md", "beta")]
+    server._chunks_replaced()
+    gc.collect()
+
+    assert ref() is None
+    assert [s["path"] for s in server._cached_unique_sources("u-1", None)] == ["b.md"]
+    assert server._admin_chunk_stats()[0] == 1
@@ -0,0 +1,121 @@
+import json
+
+import server
+
+
+def _reference_count(path, workspace_id):
+    count = 0
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                payload = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if payload.get("workspace_id") == workspace_id:
+                count += 1
+    return count
+
+
+def test_scan_workspace_chunks_matches_full_parse(tmp_path):
+    path = tmp_path / "chunks.jsonl"
+    rows = [
+        {"id": "1", "content": "plain", "workspace_id": "ws-1"},
+        {"id": "2", "content": "other", "workspace_id": "ws-2"},
+        {"id": "3", "content": 'quoted "workspace_id": "ws-1" in text', "workspace_id": "ws-2"},
+        {"id": "4", "metadata": {"workspace_id": "ws-1"}, "workspace_id": "ws-3"},
+        {"id": "5", "metadata": {"workspace_id": "ws-1"}},
+        {"id": "6", "content": "prefix", "workspace_id": "ws-10"},
+        {"id": "7", "content": "unicode", "workspace_id": "wś-1"},
+        {"id": "8", "content": "last", "workspace_id": "ws-1"},
+        {"id": "9", "metadata": {"workspace_id": "ws-1"}},
+        {"workspace_id": "ws-1", "id": "10", "source": {"type": "doc"}},
+    ]
+    lines = [json.dumps(row, ensure_ascii=False) for row in rows]
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+    for workspace_id in ("ws-1", "ws-2", "ws-3", "ws-10", "wś-1", "missing"):
+        assert server._scan_workspace_chunks(str(path), workspace_id) == _reference_count(path, workspace_id)
+
+
+def test_scan_workspace_chunks_handles_empty_and_missing_files(tmp_path):
+    empty = tmp_path / "empty.jsonl"
+    empty.write_text("")
+    assert server._scan_workspace_chunks(str(empty), "ws-1") == 0
+    assert server._scan_workspace_chunks(str(tmp_path / "missing.jsonl"), "ws-1") == 0
+
+
+def test_workspace_counts_are_cached_and_carried_across_legacy_appends(monkeypatch, tmp_path):
+    import asyncio
+
+    path = tmp_path / "chunks.jsonl"
+    path.write_text(json.dumps({"id": "1", "workspace_id": "ws-1"}) + "\n", encoding="utf-8")
+
+    scans = []
+    real_scan = server._scan_workspace_chunks
+
+    def counting_scan(scan_path, workspace_id):
+        scans.append(workspace_id)
+        return real_scan(scan_path, workspace_id)
+
+    def fake_ingest(source, out_jsonl, workspace_id=None, **kwargs):
+        with open(out_jsonl, "a", encoding="utf-8") as handle:
+            for idx in range(2):
+                handle.write(json.dumps({"id": f"{source}-{idx}", "workspace_id": workspace_id}) + "\n")
+        return {"written": 2}
+
+    monkeypatch.setattr(server, "USE_DB_CHUNKS", False)
+    monkeypatch.setattr(server, "CHUNKS_PATH", str(path))
+    monkeypatch.setattr(server, "INGEST_POOL", None)
+    monkeypatch.setattr(server, "_chunk_write_lock", None)
+    monkeypatch.setattr(server, "_scan_workspace_chunks", counting_scan)
+    monkeypatch.setattr(server, "_workspace_chunk_counts", server.OrderedDict())
+    monkeypatch.setattr(server, "_workspace_counts_stamp", None)
+
+    async def run():
+        first = await server._count_workspace_chunks("ws-1")
+        again = await server._count_workspace_chunks("ws-1")
+        await server._run_legacy_ingest(fake_ingest, "doc", out_jsonl=str(path), workspace_id="ws-1")
+        after = await server._count_workspace_chunks("ws-1")
+        return first, again, after
+
+    assert asyncio.run(run()) == (1, 1, 3)
+    assert scans == ["ws-1"]
+    assert server._scan_workspace_chunks(str(path), "ws-1") == 3
+
+
+def test_workspace_count_cache_is_bounded(monkeypatch, tmp_path):
+    path = tmp_path / "chunks.jsonl"
+    path.write_text("", encoding="utf-8")
+    stamp = path.stat().st_mtime_ns
+
+    monkeypatch.setattr(server, "CHUNKS_PATH", str(path))
+    monkeypatch.setattr(server, "WORKSPACE_COUNT_CACHE_SIZE", 2)
+    monkeypatch.setattr(server, "_workspace_chunk_counts", server.OrderedDict())
+    monkeypatch.setattr(server, "_workspace_counts_stamp", None)
+
+    for workspace_id in ("ws-1", "ws-2", "ws-3"):
+        server._store_workspace_count(workspace_id, 0, stamp)
+
+    assert list(server._workspace_chunk_counts) == ["ws-2", "ws-3"]
+
+
+def test_workspace_count_uses_sql_when_chunks_live_in_db(monkeypatch):
+    import asyncio
+
+    queries = []
+
+    class FakeDB:
+        async def fetch_one(self, query, params=None):
+            queries.append((query, params))
+            return {"cnt": 7}
+
+    def no_scan(path, workspace_id):
+        raise AssertionError("JSONL should not be scanned in DB mode")
+
+    monkeypatch.setattr(server, "USE_DB_CHUNKS", True)
+    monkeypatch.setattr(server, "DB", FakeDB())
+    monkeypatch.setattr(server, "_scan_workspace_chunks", no_scan)
+
+    assert asyncio.run(server._count_workspace_chunks("ws-1")) == 7
+    assert queries[0][1] == ("ws-1",)
+    assert "WHERE workspace_id = $1" in queries[0][0]
@@ -0,0 +1,39 @@
+import asyncio
+
+import server
+
+
+class _CountingDB:
+    def __init__(self):
+        self.calls = 0
+
+    async def fetch_one(self, query, params=None):
+        self.calls += 1
+        return {"organization_id": f"org-for-{params[0]}"}
+
+
+def test_organization_lookup_is_cached_until_ttl(monkeypatch):
+    db = _CountingDB()
+    clock = [1000.0]
+    monkeypatch.setattr(server, "DB", db)
+    monkeypatch.setattr(server, "_workspace_org_cache", server.OrderedDict())
+    monkeypatch.setattr(server, "WORKSPACE_ORG_CACHE_TTL", 300.0)
+    monkeypatch.setattr(server.time, "monotonic", lambda: clock[0])
+
+    assert asyncio.run(server._get_organization_id_for_workspace("ws-1")) == "org-for-ws-1"
+    assert asyncio.run(server._get_organization_id_for_workspace("ws-1")) == "org-for-ws-1"
+    assert db.calls == 1
+
+    clock[0] += 301
+    asyncio.run(server._get_organization_id_for_workspace("ws-1"))
+    assert db.calls == 2
+
+
+def test_organization_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(server, "_workspace_org_cache", server.OrderedDict())
+    monkeypatch.setattr(server, "WORKSPACE_ORG_CACHE_SIZE", 2)
+
+    for workspace_id in ("ws-1", "ws-2", "ws-3"):
+        server._remember_workspace_org(workspace_id, "org-1")
+
+    assert list(server._workspace_org_cache) == ["ws-2", "ws-3"]
@@ -0,0 +1,53 @@
+import raglite
+
+
+class FakeDiskCache:
+    def __init__(self):
+        self.items = {}
+
+    def get(self, key):
+        return self.items.get(key)
+
+    def set(self, key, value, expire=None):
+        self.items[key] = value
+
+    def clear(self):
+        removed = len(self.items)
+        self.items.clear()
+        return removed
+
+
+def _count_remote_fetches(monkeypatch, result):
+    calls = []
+
+    def fake_remote(video_id, lang="en"):
+        calls.append((video_id, lang))
+        return result
+
+    monkeypatch.setattr(raglite, "_fetch_youtube_transcript_remote", fake_remote)
+    return calls
+
+
+def test_purge_makes_next_transcript_fetch_miss(monkeypatch):
+    cache = FakeDiskCache()
+    monkeypatch.setattr(raglite, "_get_yt_cache", lambda: cache)
+    calls = _count_remote_fetches(monkeypatch, [{"text": "hi", "start": 0.0, "duration": 1.0}])
+
+    first = raglite.fetch_youtube_transcript("vid123", lang="en")
+    assert raglite.fetch_youtube_transcript("vid123", lang="en") == first
+    assert len(calls) == 1
+
+    assert raglite.clear_youtube_cache() == 1
+    raglite.fetch_youtube_transcript("vid123", lang="en")
+    assert len(calls) == 2
+
+
+def test_missing_transcripts_are_not_cached(monkeypatch):
+    cache = FakeDiskCache()
+    monkeypatch.setattr(raglite, "_get_yt_cache", lambda: cache)
+    calls = _count_remote_fetches(monkeypatch, None)
+
+    assert raglite.fetch_youtube_transcript("vid123") is None
+    assert raglite.fetch_youtube_transcript("vid123") is None
+    assert len(calls) == 2
+    assert cache.items == {}